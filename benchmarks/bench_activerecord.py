@@ -0,0 +1,507 @@
+# -*- coding: utf-8 -*-
+u"""Benchmarks of the hot paths of ``DatabaseObject`` (with ``Bicycle``).
+
+For each table size (1k, 100k and 1M rows by default), the ``bicycles`` table
+is filled with ``save_many()`` and these operations are measured:
+
+- ``find_all``: loads the whole table.
+- ``find_by_id``: one record by ID.
+- ``hydrate``: ``_hydrate()`` of the rows of a result set, 1000 at a time
+  (no database). This is how ``find_by_sql()`` creates the objects, so the
+  ``rows_per_second`` of the result is the object creation rate of the
+  finders.
+- ``instantiate``: ``_instantiate()`` from a dictionary (no database), the
+  slower path used before ``_hydrate()``, for comparison.
+- ``save_create`` and ``save_update``: ``save()`` of one new or changed
+  object.
+- ``delete``: ``delete()`` of one object.
+- ``validate``: ``_validate()`` of one object (no database).
+
+Each result has the throughput (operations per second, measured over the
+time spent inside the operations), the p50 and p99 latency and the peak
+memory of the benchmark (``tracemalloc``, Python 3 only). Python 2 has no
+``tracemalloc``, so the table shows the peak of the whole process so far
+instead (``ru_maxrss``, "proc peak"), which never goes down from one benchmark
+to the next. ``--output`` writes them to a JSON file and
+``--compare`` shows the change from an earlier file, so every change to
+``database_object.py`` can be measured before and after.
+
+The database is SQLite in memory by default (see ``backends``). ``--mysql``
+uses a server (``host:port``) and ``--fake-server`` starts
+``fake_mysql_server.py`` in another process, with ``--latency`` and
+``--bandwidth``.
+
+Example:
+    From the project root::
+
+        python benchmarks/bench_activerecord.py --sizes 1000,100000 \\
+            --output before.json
+
+        python benchmarks/bench_activerecord.py --sizes 1000,100000 \\
+            --compare before.json
+
+        python benchmarks/bench_activerecord.py --fake-server --latency 0.02
+
+Warning:
+    ``db_credentials.py`` must exist (see ``db_credentials_example.py``). The
+    benchmark deletes every row of the ``bicycles`` table.
+
+"""
+
+__all__ = []
+__copyright__ = u"Copyright (C) 2022 Leonardo Pinheiro"
+__author__ = u"Leonardo Pinheiro <info@leonardopinheiro.net>"
+__link__ = u"https://www.leonardopinheiro.net"
+
+import argparse
+import datetime
+import decimal
+import gc
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+import timeit
+
+# Peak memory: tracemalloc (Python 3, per benchmark) and the maximum resident
+# set size (of the whole process).
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+try:
+    import resource
+except ImportError:
+    resource = None
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCHMARKS_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "src"))
+
+DEFAULT_SIZES = (1000, 100000, 1000000)
+SQL_FILES = (
+    os.path.join(ROOT_DIR, "resources", "sql", "chain_gang.sql"),
+    os.path.join(ROOT_DIR, "resources", "sql", "admin.sql")
+)
+
+
+def configure(arguments):
+    u"""Chooses the database before the models are used.
+
+    Args:
+        arguments (argparse.Namespace): The command line arguments.
+
+    Returns:
+        subprocess.Popen: The fake server process (or None).
+    """
+
+    from activerecord import db_credentials
+
+    server = None
+    if arguments.fake_server:
+        server, port = start_fake_server(arguments.latency, arguments.bandwidth)
+        arguments.mysql = "127.0.0.1:{port}".format(port=port)
+
+    if arguments.mysql:
+        host, _, port = arguments.mysql.partition(":")
+        db_credentials.DB_BACKEND = 'mysql'
+        db_credentials.DB_SERVER = host
+        db_credentials.DB_PORT = int(port or 3306)
+    else:
+        db_credentials.DB_BACKEND = 'sqlite'
+        db_credentials.DB_SQLITE_PATH = arguments.sqlite_path
+    db_credentials.DB_POOL_SIZE = 0
+    db_credentials.DB_SLOW_QUERY_LOG = None
+
+    from activerecord import database_functions
+    from activerecord.connection_db import ConnectionDB
+    from activerecord.database_object import DatabaseObject
+
+    if not arguments.mysql:
+        for sql_file in SQL_FILES:
+            database_functions.get_backend().execute_script(sql_file)
+
+    # The connection created on import read the previous settings.
+    DatabaseObject._database = ConnectionDB()
+
+    return server
+
+
+def start_fake_server(latency, bandwidth):
+    u"""Starts ``fake_mysql_server.py`` in another process (the C extension of
+    ``mysql.connector`` would block a server thread in this one).
+
+    Args:
+        latency (float): Seconds added to every response.
+        bandwidth (float): Bytes per second (or None).
+
+    Returns:
+        tuple: ``(process, port)``.
+    """
+
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+
+    command = [sys.executable,
+               os.path.join(BENCHMARKS_DIR, "fake_mysql_server.py"),
+               "--port", str(port), "--latency", str(latency)]
+    if bandwidth:
+        command += ["--bandwidth", str(bandwidth)]
+    process = subprocess.Popen(command)
+
+    # Waits until the server accepts connections.
+    deadline = time.time() + 30
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), 1).close()
+            return (process, port)
+        except socket.error:
+            if time.time() > deadline or process.poll() is not None:
+                process.kill()
+                raise RuntimeError("The fake server did not start.")
+            time.sleep(0.1)
+
+
+def new_bicycle(index):
+    u"""Creates a valid, unsaved bicycle.
+
+    Args:
+        index (int): Makes the values differ.
+
+    Returns:
+        Bicycle: The bicycle.
+    """
+
+    from appclasses.access_database import Bicycle
+
+    return Bicycle(brand="Brand {index}".format(index=index % 97),
+                   model="Model {index}".format(index=index),
+                   year=1990 + index % 30, category='Road', gender='Unisex',
+                   color='black', price=decimal.Decimal('1495.00'),
+                   weight_kg=decimal.Decimal('1.5'), condition_id=5,
+                   description="Benchmark bicycle.")
+
+
+class Measurement(object):
+    u"""Times the operations of one benchmark and tracks the peak memory.
+
+    Args:
+        name (str): The benchmark name.
+        size (int): The number of rows in the table.
+    """
+
+    def __init__(self, name, size):
+        self.name = name
+        self.size = size
+        self.latencies = []
+        self.rows = 0
+        self.peak_memory = None
+        self.process_peak_memory = None
+        self._started = None
+
+    def __enter__(self):
+        gc.collect()
+        if tracemalloc is not None:
+            tracemalloc.start()
+        self._started = timeit.default_timer()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.total_time = timeit.default_timer() - self._started
+        if tracemalloc is not None:
+            self.peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        if resource is not None:
+            # The peak of the whole process so far, not of this benchmark.
+            # Kilobytes on Linux, bytes on macOS.
+            self.process_peak_memory = resource.getrusage(
+                resource.RUSAGE_SELF).ru_maxrss
+            if sys.platform != 'darwin':
+                self.process_peak_memory *= 1024
+
+    def time(self, func, *args):
+        u"""Calls a function and records how long it took.
+
+        Args:
+            func (callable): The operation.
+            *args: The arguments of the operation.
+
+        Returns:
+            obj: The result of the operation.
+        """
+
+        started = timeit.default_timer()
+        result = func(*args)
+        self.latencies.append(timeit.default_timer() - started)
+        return result
+
+    def result(self):
+        u"""Summarizes the measurement.
+
+        Returns:
+            dict: The result, ready to be written as JSON.
+        """
+
+        latencies = sorted(self.latencies)
+        ops = len(latencies)
+        # The time of the operations only (not of preparing them).
+        busy_time = sum(latencies)
+        return {
+            'benchmark': self.name,
+            'size': self.size,
+            'ops': ops,
+            'rows': self.rows,
+            'total_time': self.total_time,
+            'throughput': ops / busy_time if busy_time else None,
+            'rows_per_second': (self.rows / busy_time
+                                if self.rows and busy_time else None),
+            'p50': percentile(latencies, 50),
+            'p99': percentile(latencies, 99),
+            'peak_memory': self.peak_memory,
+            'process_peak_memory': self.process_peak_memory
+        }
+
+
+def percentile(values, percent):
+    u"""Returns a percentile (nearest rank) of sorted values.
+
+    Args:
+        values (list[float]): The sorted values.
+        percent (float): The percentile (0 to 100).
+
+    Returns:
+        (float | None): The value. None if there are no values.
+    """
+
+    if not values:
+        return None
+    rank = int(round(percent / 100.0 * len(values) + 0.5)) - 1
+    return values[min(max(rank, 0), len(values) - 1)]
+
+
+def run_size(size, max_ops, find_all_runs):
+    u"""Fills the table with ``size`` rows and runs every benchmark.
+
+    Args:
+        size (int): The number of rows.
+        max_ops (int): The maximum number of operations of the benchmarks
+            that access one record.
+        find_all_runs (int): How many times the whole table is loaded.
+
+    Returns:
+        list[dict]: The results.
+    """
+
+    from appclasses.access_database import Bicycle
+
+    Bicycle._database.query("DELETE FROM bicycles")
+    ops = min(size, max_ops)
+    results = []
+
+    with Measurement('save_many', size) as measurement:
+        for start in range(0, size, 10000):
+            batch = [new_bicycle(index) for index in
+                     range(start, min(start + 10000, size))]
+            measurement.time(Bicycle.save_many, batch)
+            measurement.rows += len(batch)
+    results.append(measurement.result())
+    ids = Bicycle.pluck('id')
+
+    with Measurement('find_all', size) as measurement:
+        for _ in range(find_all_runs):
+            objects = measurement.time(Bicycle.find_all)
+            measurement.rows += len(objects)
+            del objects
+    results.append(measurement.result())
+
+    sample = random.Random(size).sample(ids, ops)
+    with Measurement('find_by_id', size) as measurement:
+        for id in sample:
+            measurement.time(Bicycle.find_by_id, id)
+    results.append(measurement.result())
+
+    column_names, rows = Bicycle._database.select(
+        "SELECT * FROM bicycles LIMIT 1000")
+    with Measurement('hydrate', size) as measurement:
+        for _ in range(max(size // len(rows), 1)):
+            measurement.time(Bicycle._hydrate, column_names, rows)
+            measurement.rows += len(rows)
+    results.append(measurement.result())
+
+    record = Bicycle.find_by_id(ids[0]).__dict__
+    record = dict((column, record[column]) for column in Bicycle._db_columns)
+    with Measurement('instantiate', size) as measurement:
+        for _ in range(size):
+            measurement.time(Bicycle._instantiate, record)
+    results.append(measurement.result())
+
+    # Reused, so a million objects are not kept in memory.
+    objects = [new_bicycle(index) for index in range(min(size, 1000))]
+    with Measurement('validate', size) as measurement:
+        for index in range(size):
+            measurement.time(objects[index % len(objects)]._validate)
+    results.append(measurement.result())
+
+    created = [new_bicycle(index) for index in range(ops)]
+    with Measurement('save_create', size) as measurement:
+        for obj in created:
+            measurement.time(obj.save)
+    results.append(measurement.result())
+
+    loaded = [Bicycle.find_by_id(id) for id in sample]
+    for obj in loaded:
+        obj.color = 'blue'
+    with Measurement('save_update', size) as measurement:
+        for obj in loaded:
+            measurement.time(obj.save)
+    results.append(measurement.result())
+
+    with Measurement('delete', size) as measurement:
+        for obj in created:
+            measurement.time(obj.delete)
+    results.append(measurement.result())
+
+    return results
+
+
+def environment(arguments):
+    u"""Describes where the benchmark ran.
+
+    Args:
+        arguments (argparse.Namespace): The command line arguments.
+
+    Returns:
+        dict: The environment.
+    """
+
+    from activerecord import database_functions
+
+    backend = database_functions.get_backend()
+    return {
+        'time': datetime.datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'backend': backend.name,
+        'server': arguments.mysql,
+        'latency': arguments.latency if arguments.fake_server else None,
+        'bandwidth': arguments.bandwidth if arguments.fake_server else None,
+        'peak_memory': 'tracemalloc' if tracemalloc is not None
+                       else 'ru_maxrss'
+    }
+
+
+def print_results(results, baseline=None):
+    u"""Prints a table with the results (and the change from the baseline).
+
+    Args:
+        results (list[dict]): The results.
+        baseline (list[dict], optional): The results of an earlier run.
+    """
+
+    previous = {}
+    for result in baseline or []:
+        previous[(result['benchmark'], result['size'])] = result
+
+    # Without tracemalloc (Python 2), only the peak of the process is known.
+    per_benchmark = any(result.get('peak_memory') is not None
+                        for result in results)
+    memory_key = 'peak_memory' if per_benchmark else 'process_peak_memory'
+
+    header = "{0:<12} {1:>9} {2:>8} {3:>12} {4:>10} {5:>10} {6:>15}".format(
+        "benchmark", "size", "ops", "ops/s", "p50 (ms)", "p99 (ms)",
+        "peak (MB)" if per_benchmark else "proc peak (MB)")
+    if baseline is not None:
+        header += " {0:>9}".format("ops/s %")
+    print(header)
+
+    for result in results:
+        line = ("{benchmark:<12} {size:>9} {ops:>8} {throughput:>12.1f} "
+                "{p50:>10.3f} {p99:>10.3f} {peak:>15.1f}").format(
+                    benchmark=result['benchmark'], size=result['size'],
+                    ops=result['ops'], throughput=result['throughput'] or 0,
+                    p50=(result['p50'] or 0) * 1000,
+                    p99=(result['p99'] or 0) * 1000,
+                    peak=(result.get(memory_key) or 0) / 1048576.0)
+
+        old = previous.get((result['benchmark'], result['size']))
+        if old is not None and old['throughput'] and result['throughput']:
+            line += " {0:>+8.1f}%".format(
+                (result['throughput'] / old['throughput'] - 1) * 100)
+        print(line)
+
+    if not per_benchmark:
+        print("proc peak: the maximum resident set size of the whole process "
+              "so far. It never goes down, so it is not the memory of each "
+              "benchmark.")
+
+
+def main():
+    u"""Runs the benchmarks from the command line.
+    """
+
+    parser = argparse.ArgumentParser(
+        description="Benchmarks of the activerecord hot paths.")
+    parser.add_argument("--sizes", default=",".join(
+        str(size) for size in DEFAULT_SIZES),
+        help="Table sizes, separated by commas (default: %(default)s).")
+    parser.add_argument("--max-ops", type=int, default=10000,
+                        help="Maximum operations of the one-record "
+                             "benchmarks (default: %(default)s).")
+    parser.add_argument("--find-all-runs", type=int, default=3,
+                        help="Times the whole table is loaded (default: "
+                             "%(default)s).")
+    parser.add_argument("--sqlite-path", default=":memory:",
+                        help="The SQLite database (default: %(default)s).")
+    parser.add_argument("--mysql", default=None, metavar="HOST:PORT",
+                        help="Uses a MySQL server (with the credentials in "
+                             "db_credentials.py) instead of SQLite.")
+    parser.add_argument("--fake-server", action="store_true",
+                        help="Starts fake_mysql_server.py and uses it.")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Latency of the fake server, in seconds.")
+    parser.add_argument("--bandwidth", type=float, default=None,
+                        help="Bandwidth of the fake server, in bytes per "
+                             "second.")
+    parser.add_argument("--output", default=None,
+                        help="Writes the results to this JSON file.")
+    parser.add_argument("--compare", default=None,
+                        help="Shows the change from the results in this JSON "
+                             "file.")
+    arguments = parser.parse_args()
+
+    sizes = [int(size) for size in arguments.sizes.split(",") if size]
+
+    baseline = None
+    if arguments.compare:
+        with open(arguments.compare) as baseline_file:
+            baseline = json.load(baseline_file)['results']
+
+    server = configure(arguments)
+    try:
+        results = []
+        for size in sizes:
+            size_results = run_size(size, arguments.max_ops,
+                                    arguments.find_all_runs)
+            print_results(size_results, baseline)
+            results += size_results
+
+        if arguments.output:
+            with open(arguments.output, 'w') as output_file:
+                json.dump({'environment': environment(arguments),
+                           'results': results},
+                          output_file, indent=1, sort_keys=True)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == '__main__':
+    main()
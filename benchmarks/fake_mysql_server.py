@@ -0,0 +1,1031 @@
+# -*- coding: utf-8 -*-
+u"""A local stand-in for a MySQL server, to benchmark ``ConnectionDB`` without
+a real server.
+
+It speaks enough of the MySQL client/server protocol for ``mysql.connector``
+(both the pure Python and the C extension implementations) to connect, run
+text queries, prepare and execute statements and fetch the results. The data
+lives in a SQLite database in the temporary directory, created from the
+scripts in ``resources/sql`` and accessed through ``SQLiteBackend`` (see
+``src/activerecord/backends.py``), so the MySQL statements written by
+``DatabaseObject`` are translated the same way.
+
+The network can be made slower on purpose:
+
+- ``latency``: seconds added to every response (one round trip per command,
+  like the distance between a studio and a datacenter).
+- ``bandwidth``: bytes per second, in both directions.
+
+Example:
+    From the command line (then set ``DB_SERVER = '127.0.0.1'`` and
+    ``DB_PORT = 3307`` in ``db_credentials.py``)::
+
+        python benchmarks/fake_mysql_server.py --port 3307 --latency 0.02
+
+    From Python::
+
+        server = FakeMySQLServer(latency=0.02)
+        server.start()
+        connection = mysql.connector.connect(host='127.0.0.1',
+                                             port=server.port, user='any',
+                                             password='', database='any')
+        ...
+        server.stop()
+
+Warning:
+    Only the commands used by ``mysql.connector`` and ``ConnectionDB`` are
+    implemented. There is no TLS, no compression and no authentication
+    (unless ``password`` is given).
+
+    The C extension of ``mysql.connector`` (the default when it is installed)
+    does not release the GIL while it waits for the server, so a server
+    started with ``start()`` in the same process never answers. Run it in
+    another process (the command line) or connect with ``use_pure=True``.
+
+References:
+    `MySQL Client/Server Protocol`_
+
+.. _MySQL Client/Server Protocol:
+   https://dev.mysql.com/doc/dev/mysql-server/latest/PAGE_PROTOCOL.html
+
+"""
+
+__all__ = ['FakeMySQLServer']
+__copyright__ = u"Copyright (C) 2022 Leonardo Pinheiro"
+__author__ = u"Leonardo Pinheiro <info@leonardopinheiro.net>"
+__link__ = u"https://www.leonardopinheiro.net"
+
+import argparse
+import datetime
+import decimal
+import hashlib
+import os
+import random
+import re
+import socket
+import struct
+import sys
+import tempfile
+import threading
+import time
+
+# If Python 3:
+try:
+    import socketserver
+# If Python 2:
+except ImportError:
+    import SocketServer as socketserver
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "src", "activerecord"))
+from backends import SQLiteBackend  # noqa: E402
+
+# If Python 3:
+try:
+    TEXT_TYPES = (unicode, )
+    BINARY_TYPES = (bytearray, buffer, memoryview)
+# If Python 2:
+except NameError:
+    TEXT_TYPES = (str, )
+    BINARY_TYPES = (bytes, bytearray, memoryview)
+
+# Executed in this order: chain_gang.sql drops the admins table.
+DEFAULT_SQL_FILES = (
+    os.path.join(ROOT_DIR, "resources", "sql", "chain_gang.sql"),
+    os.path.join(ROOT_DIR, "resources", "sql", "admin.sql")
+)
+
+SERVER_VERSION = b"8.0.22-fake"
+AUTH_PLUGIN = b"mysql_native_password"
+MAX_PAYLOAD = 0xffffff
+
+# Capability flags.
+CLIENT_LONG_PASSWORD = 0x00000001
+CLIENT_FOUND_ROWS = 0x00000002
+CLIENT_LONG_FLAG = 0x00000004
+CLIENT_CONNECT_WITH_DB = 0x00000008
+CLIENT_PROTOCOL_41 = 0x00000200
+CLIENT_TRANSACTIONS = 0x00002000
+CLIENT_SECURE_CONNECTION = 0x00008000
+CLIENT_MULTI_RESULTS = 0x00020000
+CLIENT_PS_MULTI_RESULTS = 0x00040000
+CLIENT_PLUGIN_AUTH = 0x00080000
+CLIENT_CONNECT_ATTRS = 0x00100000
+CLIENT_PLUGIN_AUTH_LENENC_CLIENT_DATA = 0x00200000
+CAPABILITIES = (CLIENT_LONG_PASSWORD | CLIENT_FOUND_ROWS | CLIENT_LONG_FLAG |
+                CLIENT_CONNECT_WITH_DB | CLIENT_PROTOCOL_41 |
+                CLIENT_TRANSACTIONS | CLIENT_SECURE_CONNECTION |
+                CLIENT_MULTI_RESULTS | CLIENT_PS_MULTI_RESULTS |
+                CLIENT_PLUGIN_AUTH | CLIENT_CONNECT_ATTRS |
+                CLIENT_PLUGIN_AUTH_LENENC_CLIENT_DATA)
+
+# Server status flags.
+SERVER_STATUS_IN_TRANS = 0x0001
+SERVER_STATUS_AUTOCOMMIT = 0x0002
+
+# Commands.
+COM_QUIT = 0x01
+COM_INIT_DB = 0x02
+COM_QUERY = 0x03
+COM_PING = 0x0e
+COM_STMT_PREPARE = 0x16
+COM_STMT_EXECUTE = 0x17
+COM_STMT_SEND_LONG_DATA = 0x18
+COM_STMT_CLOSE = 0x19
+COM_STMT_RESET = 0x1a
+COM_SET_OPTION = 0x1b
+COM_RESET_CONNECTION = 0x1f
+
+# Column types.
+TYPE_DECIMAL = 0x00
+TYPE_TINY = 0x01
+TYPE_SHORT = 0x02
+TYPE_LONG = 0x03
+TYPE_FLOAT = 0x04
+TYPE_DOUBLE = 0x05
+TYPE_NULL = 0x06
+TYPE_TIMESTAMP = 0x07
+TYPE_LONGLONG = 0x08
+TYPE_INT24 = 0x09
+TYPE_DATE = 0x0a
+TYPE_TIME = 0x0b
+TYPE_DATETIME = 0x0c
+TYPE_YEAR = 0x0d
+TYPE_NEWDECIMAL = 0xf6
+TYPE_BLOB = 0xfc
+TYPE_VAR_STRING = 0xfd
+
+# Column flags and character sets.
+BINARY_FLAG = 0x0080
+CHARSET_UTF8MB4 = 45
+CHARSET_BINARY = 63
+
+ER_UNKNOWN_COM_ERROR = 1047
+ER_ACCESS_DENIED_ERROR = 1045
+ER_UNKNOWN_STMT_HANDLER = 1243
+
+_SET_AUTOCOMMIT = re.compile(r"^\s*SET\s+(?:@@(?:SESSION\.)?)?autocommit\s*="
+                             r"\s*(\w+)\s*$", re.IGNORECASE)
+_STRING_LITERAL = re.compile(r"""(_binary\s*)?'((?:[^'\\]|\\.|'')*)'""",
+                             re.IGNORECASE | re.DOTALL)
+_MYSQL_ESCAPES = {'0': '\0', 'b': '\b', 'n': '\n', 'r': '\r', 't': '\t',
+                  'Z': '\x1a'}
+
+
+def _lenenc_int(value):
+    u"""Encodes a length-encoded integer.
+
+    Args:
+        value (int): The integer.
+
+    Returns:
+        bytes: The encoded integer.
+    """
+
+    if value < 251:
+        return struct.pack("<B", value)
+    if value < 2 ** 16:
+        return b"\xfc" + struct.pack("<H", value)
+    if value < 2 ** 24:
+        return b"\xfd" + struct.pack("<I", value)[:3]
+    return b"\xfe" + struct.pack("<Q", value)
+
+
+def _lenenc_str(value):
+    u"""Encodes a length-encoded string.
+
+    Args:
+        value (bytes): The string.
+
+    Returns:
+        bytes: The encoded string.
+    """
+
+    return _lenenc_int(len(value)) + value
+
+
+def _to_bytes(value):
+    u"""Converts a text value to UTF-8 bytes.
+
+    Args:
+        value (str | bytes): The value.
+
+    Returns:
+        bytes: The encoded value.
+    """
+
+    if isinstance(value, TEXT_TYPES):
+        return value.encode('utf-8')
+    return bytes(value)
+
+
+class _Reader(object):
+    u"""Reads the fields of a packet payload.
+
+    Args:
+        payload (bytearray): The payload.
+    """
+
+    def __init__(self, payload):
+        self.payload = payload
+        self.position = 0
+
+    def remaining(self):
+        return len(self.payload) - self.position
+
+    def read(self, size):
+        data = self.payload[self.position:self.position + size]
+        self.position += size
+        return bytes(data)
+
+    def int(self, size):
+        data = self.read(size) + b"\0" * (8 - size)
+        return struct.unpack("<Q", data)[0]
+
+    def lenenc_int(self):
+        first = self.int(1)
+        if first < 0xfb:
+            return first
+        if first == 0xfc:
+            return self.int(2)
+        if first == 0xfd:
+            return self.int(3)
+        if first == 0xfe:
+            return self.int(8)
+        return None
+
+    def lenenc_str(self):
+        return self.read(self.lenenc_int())
+
+    def null_str(self):
+        end = self.payload.find(b"\0", self.position)
+        if end < 0:
+            end = len(self.payload)
+        data = bytes(self.payload[self.position:end])
+        self.position = end + 1
+        return data
+
+
+class _Statement(object):
+    u"""A prepared statement of one session.
+
+    Args:
+        sql (str): The statement, with ``?`` placeholders.
+        param_count (int): The number of placeholders.
+        column_count (int): The number of columns in the result set.
+    """
+
+    def __init__(self, sql, param_count, column_count):
+        self.sql = sql
+        self.param_count = param_count
+        self.column_count = column_count
+        self.param_types = None
+        self.long_data = {}
+
+
+class _Session(socketserver.BaseRequestHandler):
+    u"""One client connection. Created by ``socketserver`` for each client.
+    """
+
+    def setup(self):
+        self.fake_server = self.server.fake_server
+        self.connection = self.fake_server.backend.connect()
+        self.autocommit = True
+        self.statements = {}
+        self.next_statement_id = 1
+        self.sequence = 0
+        self.output = []
+
+    def finish(self):
+        self.connection.close()
+
+    def handle(self):
+        if not self._authenticate():
+            return
+
+        while True:
+            payload = self._receive()
+            if not payload:
+                return
+
+            command = payload[0]
+            try:
+                if command == COM_QUIT:
+                    return
+                self._dispatch(command, payload)
+            except self.fake_server.backend.Error as err:
+                self._send_error(err.errno or 1105, err.msg)
+            except socket.error:
+                return
+
+            self._flush()
+
+    def _dispatch(self, command, payload):
+        u"""Executes one command.
+
+        Args:
+            command (int): The command byte.
+            payload (bytearray): The packet.
+        """
+
+        if command == COM_QUERY:
+            self._query(bytes(payload[1:]).decode('utf-8'))
+        elif command == COM_STMT_PREPARE:
+            self._prepare(bytes(payload[1:]).decode('utf-8'))
+        elif command == COM_STMT_EXECUTE:
+            self._execute_statement(_Reader(payload[1:]))
+        elif command == COM_STMT_SEND_LONG_DATA:
+            reader = _Reader(payload[1:])
+            statement = self.statements.get(reader.int(4))
+            if statement is not None:
+                index = reader.int(2)
+                statement.long_data[index] = (
+                    statement.long_data.get(index, b"") +
+                    reader.read(reader.remaining()))
+        elif command == COM_STMT_CLOSE:
+            self.statements.pop(_Reader(payload[1:]).int(4), None)
+        elif command == COM_STMT_RESET:
+            statement = self.statements.get(_Reader(payload[1:]).int(4))
+            if statement is not None:
+                statement.long_data = {}
+            self._send_ok()
+        elif command == COM_SET_OPTION:
+            self._send_eof()
+        elif command in (COM_INIT_DB, COM_PING):
+            self._send_ok()
+        elif command == COM_RESET_CONNECTION:
+            self.connection.rollback()
+            self.statements = {}
+            self._send_ok()
+        else:
+            self._send_error(ER_UNKNOWN_COM_ERROR, "Unknown command.")
+
+    # Packets
+    # --------------------------------------------------------------------------
+
+    def _receive(self):
+        u"""Reads one (possibly split) packet.
+
+        Returns:
+            (bytearray | None): The payload. None if the client disconnected.
+        """
+
+        payload = bytearray()
+        while True:
+            header = self._receive_exactly(4)
+            if header is None:
+                return None
+            length = header[0] | header[1] << 8 | header[2] << 16
+            self.sequence = (header[3] + 1) % 256
+            data = self._receive_exactly(length)
+            if data is None:
+                return None
+            payload += data
+            if length < MAX_PAYLOAD:
+                break
+
+        self.fake_server.throttle(len(payload))
+        return payload
+
+    def _receive_exactly(self, size):
+        data = bytearray()
+        while len(data) < size:
+            chunk = self.request.recv(size - len(data))
+            if not chunk:
+                return None
+            data += bytearray(chunk)
+        return data
+
+    def _write(self, payload):
+        u"""Queues a packet (split if needed). Sent by ``_flush()``.
+
+        Args:
+            payload (bytes): The payload.
+        """
+
+        while True:
+            chunk = payload[:MAX_PAYLOAD]
+            payload = payload[MAX_PAYLOAD:]
+            self.output.append(struct.pack("<I", len(chunk))[:3] +
+                               struct.pack("<B", self.sequence) + chunk)
+            self.sequence = (self.sequence + 1) % 256
+            if len(chunk) < MAX_PAYLOAD:
+                break
+
+    def _flush(self):
+        u"""Sends the queued packets, after the simulated latency and
+        bandwidth.
+        """
+
+        if not self.output:
+            return
+
+        data = b"".join(self.output)
+        self.output = []
+        self.fake_server.delay(len(data))
+        self.request.sendall(data)
+
+    def _status(self):
+        status = SERVER_STATUS_IN_TRANS if self.connection.in_transaction else 0
+        if self.autocommit:
+            status |= SERVER_STATUS_AUTOCOMMIT
+        return status
+
+    def _send_ok(self, affected_rows=0, insert_id=0):
+        self._write(b"\x00" + _lenenc_int(max(affected_rows, 0)) +
+                    _lenenc_int(insert_id or 0) +
+                    struct.pack("<HH", self._status(), 0))
+
+    def _send_eof(self):
+        self._write(b"\xfe" + struct.pack("<HH", 0, self._status()))
+
+    def _send_error(self, errno, message):
+        self._write(b"\xff" + struct.pack("<H", errno) + b"#HY000" +
+                    _to_bytes(message))
+
+    # Authentication
+    # --------------------------------------------------------------------------
+
+    def _authenticate(self):
+        u"""Sends the handshake and checks the client's answer.
+
+        Returns:
+            bool: True if the client is authenticated.
+        """
+
+        scramble = bytes(bytearray(random.randint(1, 127) for _ in range(20)))
+
+        self.sequence = 0
+        self._write(b"\x0a" + SERVER_VERSION + b"\0" +
+                    struct.pack("<I", threading.current_thread().ident % 2 ** 31) +
+                    scramble[:8] + b"\0" +
+                    struct.pack("<H", CAPABILITIES & 0xffff) +
+                    struct.pack("<B", CHARSET_UTF8MB4) +
+                    struct.pack("<H", SERVER_STATUS_AUTOCOMMIT) +
+                    struct.pack("<H", CAPABILITIES >> 16) +
+                    struct.pack("<B", len(scramble) + 1) + b"\0" * 10 +
+                    scramble[8:] + b"\0" + AUTH_PLUGIN + b"\0")
+        self._flush()
+
+        payload = self._receive()
+        if not payload:
+            return False
+
+        reader = _Reader(payload)
+        capabilities = reader.int(4)
+        reader.read(4 + 1 + 23)
+        reader.null_str()
+        if capabilities & CLIENT_PLUGIN_AUTH_LENENC_CLIENT_DATA:
+            auth_response = reader.lenenc_str()
+        else:
+            auth_response = reader.read(reader.int(1))
+        if capabilities & CLIENT_CONNECT_WITH_DB:
+            reader.null_str()
+        plugin = AUTH_PLUGIN
+        if capabilities & CLIENT_PLUGIN_AUTH and reader.remaining():
+            plugin = reader.null_str()
+
+        # The C client asks for caching_sha2_password by default.
+        if plugin != AUTH_PLUGIN:
+            self._write(b"\xfe" + AUTH_PLUGIN + b"\0" + scramble + b"\0")
+            self._flush()
+            auth_response = self._receive()
+            if auth_response is None:
+                return False
+            auth_response = bytes(auth_response)
+
+        if not self.fake_server.check_password(scramble, auth_response):
+            self._send_error(ER_ACCESS_DENIED_ERROR, "Access denied.")
+            self._flush()
+            return False
+
+        self._send_ok()
+        self._flush()
+        return True
+
+    # Text protocol
+    # --------------------------------------------------------------------------
+
+    def _query(self, sql):
+        u"""Executes a COM_QUERY statement and sends a text result set.
+
+        Args:
+            sql (str): The statement, with the values inside it.
+        """
+
+        if self._session_statement(sql):
+            return
+
+        sql, values = self._extract_literals(sql)
+        cursor = self._run(sql, values)
+
+        if cursor.with_rows:
+            rows = cursor.fetchall()
+            types = self._column_types(cursor.column_names, rows)
+            self._send_columns(cursor.column_names, types)
+            for row in rows:
+                self._write(b"".join(
+                    b"\xfb" if value is None
+                    else _lenenc_str(self._text_value(value))
+                    for value in row))
+            self._send_eof()
+        else:
+            self._send_ok(cursor.rowcount, self._insert_id(sql, cursor))
+        cursor.close()
+
+    def _session_statement(self, sql):
+        u"""Handles the statements about the session (transactions and SET).
+
+        Args:
+            sql (str): The statement.
+
+        Returns:
+            bool: True if the statement was handled.
+        """
+
+        words = sql.strip().rstrip(";").split()
+        keyword = " ".join(words[:2]).upper()
+
+        if keyword in ('BEGIN', 'START TRANSACTION', 'BEGIN WORK'):
+            # Like MySQL, an open transaction is committed first.
+            self.connection.commit()
+            self.connection.start_transaction()
+        elif keyword in ('COMMIT', 'COMMIT WORK'):
+            self.connection.commit()
+        elif keyword in ('ROLLBACK', 'ROLLBACK WORK'):
+            self.connection.rollback()
+        elif words and words[0].upper() == 'SET':
+            match = _SET_AUTOCOMMIT.match(sql)
+            if match:
+                self.autocommit = match.group(1).upper() in ('1', 'ON')
+                if self.autocommit:
+                    self.connection.commit()
+        else:
+            return False
+
+        self._send_ok()
+        return True
+
+    @staticmethod
+    def _extract_literals(sql):
+        u"""Replaces the MySQL string literals (with backslash escapes) by
+        placeholders, so SQLite receives the values unchanged.
+
+        Args:
+            sql (str): The statement.
+
+        Returns:
+            tuple: ``(sql, values)``.
+        """
+
+        values = []
+
+        def replace(match):
+            text = re.sub(r"\\(.)|''",
+                          lambda escape: _MYSQL_ESCAPES.get(
+                              escape.group(1), escape.group(1) or "'"),
+                          match.group(2), flags=re.DOTALL)
+            if match.group(1):
+                text = text.encode('utf-8')
+            values.append(text)
+            return "%s"
+
+        return (_STRING_LITERAL.sub(replace, sql), values)
+
+    @staticmethod
+    def _text_value(value):
+        if isinstance(value, (TEXT_TYPES, BINARY_TYPES)):
+            return _to_bytes(value)
+        if isinstance(value, float):
+            return repr(value).encode('ascii')
+        if isinstance(value, bool):
+            value = int(value)
+        return u"{value}".format(value=value).encode('utf-8')
+
+    # Binary protocol (prepared statements)
+    # --------------------------------------------------------------------------
+
+    def _prepare(self, sql):
+        u"""Prepares a statement (COM_STMT_PREPARE).
+
+        Args:
+            sql (str): The statement, with ``?`` placeholders.
+        """
+
+        param_count = len(re.findall(r"\?", _STRING_LITERAL.sub("", sql)))
+        sql = re.sub(r"\?", "%s", sql)
+
+        # The number of columns is needed before the first execution.
+        column_names = ()
+        if sql.lstrip()[:7].upper() in ('SELECT ', 'PRAGMA ', 'EXPLAIN'):
+            cursor = self.connection.cursor()
+            cursor.execute(sql, (None, ) * param_count)
+            column_names = cursor.column_names
+            cursor.close()
+
+        statement_id = self.next_statement_id
+        self.next_statement_id += 1
+        self.statements[statement_id] = _Statement(sql, param_count,
+                                                   len(column_names))
+
+        self._write(b"\x00" + struct.pack("<IHHBH", statement_id,
+                                          len(column_names), param_count, 0,
+                                          0))
+        if param_count:
+            self._send_columns(["?"] * param_count,
+                               [TYPE_VAR_STRING] * param_count, count=False)
+        if column_names:
+            self._send_columns(column_names,
+                               [TYPE_VAR_STRING] * len(column_names),
+                               count=False)
+
+    def _execute_statement(self, reader):
+        u"""Executes a prepared statement (COM_STMT_EXECUTE) and sends a
+        binary result set.
+
+        Args:
+            reader (_Reader): The packet, after the command byte.
+        """
+
+        statement_id = reader.int(4)
+        statement = self.statements.get(statement_id)
+        if statement is None:
+            self._send_error(ER_UNKNOWN_STMT_HANDLER,
+                             "Unknown prepared statement handler.")
+            return
+
+        reader.read(1 + 4)  # flags, iteration count
+        values = []
+        if statement.param_count:
+            null_bitmap = bytearray(reader.read(
+                (statement.param_count + 7) // 8))
+            if reader.int(1):
+                statement.param_types = [
+                    reader.int(2) for _ in range(statement.param_count)]
+            for index in range(statement.param_count):
+                if index in statement.long_data:
+                    values.append(statement.long_data[index])
+                elif null_bitmap[index // 8] & (1 << (index % 8)):
+                    values.append(None)
+                else:
+                    values.append(self._binary_param(
+                        reader, statement.param_types[index]))
+            statement.long_data = {}
+
+        cursor = self._run(statement.sql, values)
+
+        if cursor.with_rows:
+            rows = cursor.fetchall()
+            types = self._column_types(cursor.column_names, rows)
+            self._send_columns(cursor.column_names, types)
+            for row in rows:
+                null_bitmap = bytearray((len(row) + 9) // 8)
+                data = []
+                for index, value in enumerate(row):
+                    if value is None:
+                        null_bitmap[(index + 2) // 8] |= 1 << ((index + 2) % 8)
+                    else:
+                        data.append(self._binary_value(value, types[index]))
+                self._write(b"\x00" + bytes(null_bitmap) + b"".join(data))
+            self._send_eof()
+        else:
+            self._send_ok(cursor.rowcount, self._insert_id(statement.sql,
+                                                           cursor))
+        cursor.close()
+
+    @staticmethod
+    def _binary_param(reader, param_type):
+        u"""Reads one parameter value of COM_STMT_EXECUTE.
+
+        Args:
+            reader (_Reader): The packet.
+            param_type (int): The type (and the unsigned flag).
+
+        Returns:
+            obj: The value.
+        """
+
+        column_type = param_type & 0xff
+        unsigned = param_type & 0x8000
+
+        sizes = {TYPE_TINY: 1, TYPE_SHORT: 2, TYPE_YEAR: 2, TYPE_LONG: 4,
+                 TYPE_INT24: 4, TYPE_LONGLONG: 8}
+        if column_type in sizes:
+            size = sizes[column_type]
+            value = reader.int(size)
+            if not unsigned and value >= 2 ** (size * 8 - 1):
+                value -= 2 ** (size * 8)
+            return value
+        if column_type == TYPE_FLOAT:
+            return struct.unpack("<f", reader.read(4))[0]
+        if column_type == TYPE_DOUBLE:
+            return struct.unpack("<d", reader.read(8))[0]
+        if column_type in (TYPE_DATE, TYPE_DATETIME, TYPE_TIMESTAMP):
+            data = _Reader(bytearray(reader.read(reader.int(1))))
+            parts = [data.int(2), data.int(1), data.int(1)]
+            if column_type == TYPE_DATE or not data.remaining():
+                return datetime.date(*parts).isoformat()
+            parts += [data.int(1), data.int(1), data.int(1)]
+            if data.remaining():
+                parts.append(data.int(4))
+            return datetime.datetime(*parts).isoformat(" ")
+        if column_type == TYPE_TIME:
+            data = _Reader(bytearray(reader.read(reader.int(1))))
+            if not data.remaining():
+                return "00:00:00"
+            negative, days = data.int(1), data.int(4)
+            hours, minutes, seconds = data.int(1), data.int(1), data.int(1)
+            return "{sign}{hours:02d}:{minutes:02d}:{seconds:02d}".format(
+                sign="-" if negative else "", hours=days * 24 + hours,
+                minutes=minutes, seconds=seconds)
+
+        value = reader.lenenc_str()
+        if column_type in (TYPE_DECIMAL, TYPE_NEWDECIMAL):
+            return decimal.Decimal(value.decode('ascii'))
+        if column_type == TYPE_BLOB:
+            return value
+        try:
+            return value.decode('utf-8')
+        except UnicodeDecodeError:
+            return value
+
+    @staticmethod
+    def _binary_value(value, column_type):
+        if column_type == TYPE_LONGLONG:
+            return struct.pack("<q", int(value))
+        if column_type == TYPE_DOUBLE:
+            return struct.pack("<d", float(value))
+        return _lenenc_str(_Session._text_value(value))
+
+    # Both protocols
+    # --------------------------------------------------------------------------
+
+    def _run(self, sql, values):
+        u"""Executes a statement on the SQLite connection. Without autocommit
+        (the ``mysql.connector`` default), the first statement starts a
+        transaction, like in MySQL.
+
+        Args:
+            sql (str): The statement, with ``%s`` placeholders.
+            values (list): The values.
+
+        Returns:
+            SQLiteCursor: The executed cursor.
+        """
+
+        if not self.autocommit and not self.connection.in_transaction:
+            self.connection.start_transaction()
+
+        cursor = self.connection.cursor()
+        cursor.execute(sql, values)
+        return cursor
+
+    @staticmethod
+    def _insert_id(sql, cursor):
+        if sql.lstrip()[:6].upper() in ('INSERT', 'REPLAC'):
+            return cursor.lastrowid or 0
+        return 0
+
+    @staticmethod
+    def _column_types(column_names, rows):
+        u"""Chooses the type of each column from the first value that is not
+        NULL (SQLite has no column types in the result set).
+
+        Args:
+            column_names (tuple[str]): The column names.
+            rows (list[tuple]): The records.
+
+        Returns:
+            list[int]: The column types.
+        """
+
+        types = []
+        for index in range(len(column_names)):
+            column_type = TYPE_VAR_STRING
+            for row in rows:
+                value = row[index]
+                if value is None:
+                    continue
+                if isinstance(value, decimal.Decimal):
+                    column_type = TYPE_NEWDECIMAL
+                elif isinstance(value, float):
+                    column_type = TYPE_DOUBLE
+                elif (isinstance(value, (int, bool)) or
+                      type(value).__name__ == 'long'):
+                    column_type = TYPE_LONGLONG
+                elif isinstance(value, BINARY_TYPES):
+                    column_type = TYPE_BLOB
+                break
+            types.append(column_type)
+
+        return types
+
+    def _send_columns(self, column_names, types, count=True):
+        u"""Sends the column count, the column definitions and the EOF packet.
+
+        Args:
+            column_names (list[str]): The column names.
+            types (list[int]): The column types.
+            count (bool, optional): Sends the column count first. Defaults to
+                True (False for COM_STMT_PREPARE).
+        """
+
+        if count:
+            self._write(_lenenc_int(len(column_names)))
+
+        for name, column_type in zip(column_names, types):
+            name = _to_bytes(name)
+            text = column_type in (TYPE_VAR_STRING, )
+            self._write(
+                _lenenc_str(b"def") + _lenenc_str(b"") + _lenenc_str(b"") +
+                _lenenc_str(b"") + _lenenc_str(name) + _lenenc_str(name) +
+                b"\x0c" +
+                struct.pack("<HIBHB", CHARSET_UTF8MB4 if text
+                            else CHARSET_BINARY, 0xffff,
+                            column_type, 0 if text else BINARY_FLAG,
+                            0x1f if column_type == TYPE_NEWDECIMAL else 0) +
+                b"\0\0")
+        self._send_eof()
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class FakeMySQLServer(object):
+    u"""A MySQL protocol server backed by SQLite (see the module
+    documentation).
+
+    Args:
+        host (str, optional): The address to listen on. Defaults to
+            ``'127.0.0.1'``.
+        port (int, optional): The port. Defaults to 0 (any free port, see
+            ``port``).
+        sql_files (list[str], optional): The scripts that create the tables.
+            Defaults to ``DEFAULT_SQL_FILES``.
+        latency (float, optional): Seconds added to every response. Defaults
+            to 0.
+        bandwidth (float, optional): Bytes per second, in both directions.
+            Defaults to None (unlimited).
+        password (str, optional): The password every user must send.
+            Defaults to None (any password).
+        path (str, optional): The SQLite file. Defaults to a new file in the
+            temporary directory, removed by ``stop()``.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, sql_files=DEFAULT_SQL_FILES,
+                 latency=0.0, bandwidth=None, password=None, path=None):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.password = password
+
+        self._temporary = path is None
+        if path is None:
+            handle, path = tempfile.mkstemp(prefix="fake_mysql_",
+                                            suffix=".sqlite")
+            os.close(handle)
+        self.path = path
+
+        self.backend = SQLiteBackend(path)
+        connection = self.backend.connect()
+        try:
+            # Readers do not block the writer.
+            connection.raw.execute("PRAGMA journal_mode = WAL")
+        finally:
+            connection.close()
+        for sql_file in sql_files:
+            self.backend.execute_script(sql_file)
+
+        self._server = _TCPServer((host, port), _Session)
+        self._server.fake_server = self
+        self._thread = None
+
+    @property
+    def port(self):
+        u"""int: The port the server listens on."""
+        return self._server.server_address[1]
+
+    @property
+    def host(self):
+        u"""str: The address the server listens on."""
+        return self._server.server_address[0]
+
+    def start(self):
+        u"""Starts accepting clients in a background thread.
+
+        Returns:
+            FakeMySQLServer: This server.
+        """
+
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name="FakeMySQLServer")
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        u"""Accepts clients until interrupted (Ctrl+C).
+        """
+
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self):
+        u"""Stops the server and removes the temporary SQLite file.
+        """
+
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+        if self._temporary:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(self.path + suffix):
+                    os.remove(self.path + suffix)
+
+    def delay(self, size):
+        u"""Waits as long as a response of ``size`` bytes would take.
+
+        Args:
+            size (int): The size of the response, in bytes.
+        """
+
+        seconds = self.latency
+        if self.bandwidth:
+            seconds += float(size) / self.bandwidth
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def throttle(self, size):
+        u"""Waits as long as receiving ``size`` bytes would take.
+
+        Args:
+            size (int): The size of the packet, in bytes.
+        """
+
+        if self.bandwidth:
+            time.sleep(float(size) / self.bandwidth)
+
+    def check_password(self, scramble, auth_response):
+        u"""Checks a ``mysql_native_password`` answer.
+
+        Args:
+            scramble (bytes): The random data sent to the client.
+            auth_response (bytes): The client's answer.
+
+        Returns:
+            bool: True if the password matches (or no password is required).
+        """
+
+        if self.password is None:
+            return True
+        if not self.password:
+            return not auth_response
+
+        stage1 = hashlib.sha1(_to_bytes(self.password)).digest()
+        stage2 = hashlib.sha1(stage1).digest()
+        mask = hashlib.sha1(scramble + stage2).digest()
+        expected = bytes(bytearray(a ^ b for a, b in
+                                   zip(bytearray(stage1), bytearray(mask))))
+        return auth_response == expected
+
+
+def main():
+    u"""Runs the server from the command line.
+    """
+
+    parser = argparse.ArgumentParser(
+        description="A local MySQL stand-in backed by SQLite.")
+    parser.add_argument("sql_files", nargs="*",
+                        help="The scripts that create the tables (default: "
+                             "resources/sql).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3307)
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Seconds added to every response.")
+    parser.add_argument("--bandwidth", type=float, default=None,
+                        help="Bytes per second.")
+    parser.add_argument("--password", default=None,
+                        help="The password every user must send.")
+    arguments = parser.parse_args()
+
+    server = FakeMySQLServer(host=arguments.host, port=arguments.port,
+                             sql_files=arguments.sql_files or
+                             DEFAULT_SQL_FILES,
+                             latency=arguments.latency,
+                             bandwidth=arguments.bandwidth,
+                             password=arguments.password)
+    print("Listening on {host}:{port}".format(host=server.host,
+                                              port=server.port))
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
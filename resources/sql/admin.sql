@@ -10,11 +10,11 @@ DROP TABLE IF EXISTS admins;
 # Creates the admins table.
 CREATE TABLE admins (
     id              INT (11) AUTO_INCREMENT PRIMARY KEY,
-    firstName       VARCHAR (255) NOT NULL,
-    lastName        VARCHAR (255) NOT NULL,
+    first_name      VARCHAR (255) NOT NULL,
+    last_name       VARCHAR (255) NOT NULL,
     email           VARCHAR (255) NOT NULL,
     username        VARCHAR (255) NOT NULL,
-    hashedPassword  VARCHAR (255) NOT NULL
+    hashed_password VARCHAR (255) NOT NULL
 );
 
 # Adds an index to speed up searches.
@@ -4,15 +4,51 @@ u"""Package with custom modules to access databases.
 This package implements the Active Record design pattern.
 
 Exports:
+    ``backends``
+
     ``connection_db``
 
+    ``connection_pool``
+
     ``database_object``
 
+    ``identity_map``
+
+    ``instrumentation``
+
+    ``query_cache``
+
+    ``records``
+
+    ``schema_cache``
+
+    ``slow_query_log``
+
+    ``worker_pool``
+
 """
 
+from . backends import *
 from . connection_db import *
+from . connection_pool import *
 from . database_object import *
+from . identity_map import *
+from . instrumentation import *
+from . query_cache import *
+from . records import *
+from . schema_cache import *
+from . slow_query_log import *
+from . worker_pool import *
 
 
-__all__ = (connection_db.__all__ +
-           database_object.__all__)
+__all__ = (backends.__all__ +
+           connection_db.__all__ +
+           connection_pool.__all__ +
+           database_object.__all__ +
+           identity_map.__all__ +
+           instrumentation.__all__ +
+           query_cache.__all__ +
+           records.__all__ +
+           schema_cache.__all__ +
+           slow_query_log.__all__ +
+           worker_pool.__all__)
@@ -0,0 +1,803 @@
+# -*- coding: utf-8 -*-
+u"""The database servers (backends) that ``ConnectionDB`` can use.
+
+The backend is chosen by ``DB_BACKEND`` in ``db_credentials.py``:
+
+- ``'mysql'`` (the default): ``MySQLBackend``, with ``mysql.connector``.
+- ``'sqlite'``: ``SQLiteBackend``, with the ``sqlite3`` module of the standard
+  library and the file in ``DB_SQLITE_PATH`` (``':memory:'`` by default).
+
+Every backend gives ``ConnectionDB`` the same interface as
+``mysql.connector``: ``load_driver()`` returns an object with ``Error`` and
+``errorcode``, and ``connect()`` returns a connection with ``cursor()``,
+``commit()``, ``start_transaction()`` and so on. The SQL written by
+``DatabaseObject`` (the MySQL dialect) is translated by the SQLite connection,
+so the models run unchanged on a local file, without a server.
+
+Example:
+    How to create the tables of ``resources/sql`` in a SQLite database::
+
+        backend = database_functions.get_backend()
+        backend.execute_script("resources/sql/chain_gang.sql")
+
+References:
+    `sqlite3 - DB-API 2.0 interface for SQLite databases`_
+
+    `SQL As Understood By SQLite`_
+
+.. _sqlite3 - DB-API 2.0 interface for SQLite databases:
+   https://docs.python.org/2.7/library/sqlite3.html
+.. _SQL As Understood By SQLite:
+   https://www.sqlite.org/lang.html
+
+"""
+
+__all__ = [
+    'MySQLBackend',
+    'SQLiteBackend',
+    'translate_ddl',
+    'translate_sql'
+]
+__copyright__ = u"Copyright (C) 2022 Leonardo Pinheiro"
+__author__ = u"Leonardo Pinheiro <info@leonardopinheiro.net>"
+__link__ = u"https://www.leonardopinheiro.net"
+
+import decimal
+import io
+import re
+import threading
+
+
+class MySQLBackend(object):
+    u"""MySQL server, through ``mysql.connector``.
+
+    Args:
+        user (str): The username.
+        password (str): The password.
+        host (str): The address of the server.
+        database (str): The database name.
+        port (int, optional): The port of the server. Defaults to 3306.
+    """
+
+    name = 'mysql'
+
+    def __init__(self, user, password, host, database, port=3306):
+        self._credentials = {
+            'user': user,
+            'password': password,
+            'host': host,
+            'port': port,
+            'database': database
+        }
+        self._driver = None
+        self._driver_lock = threading.Lock()
+
+    def load_driver(self):
+        u"""Imports ``mysql.connector`` the first time it is called.
+
+        Returns:
+            module: The ``mysql.connector`` package (with ``errorcode``
+            loaded).
+        """
+
+        if self._driver is None:
+            with self._driver_lock:
+                if self._driver is None:
+                    import mysql.connector
+                    from mysql.connector import errorcode
+                    self._driver = mysql.connector
+
+        return self._driver
+
+    def connect(self):
+        u"""Opens a connection.
+
+        Returns:
+            MySQLConnection: The connection.
+
+        Raises:
+            mysql.connector.Error: If the connection fails.
+        """
+
+        return self.load_driver().connect(**self._credentials)
+
+    def introspect(self, database, database_name):
+        u"""Reads the columns and indexes of every table from
+        ``INFORMATION_SCHEMA`` (two queries). Used by ``SchemaCache``.
+
+        Args:
+            database (ConnectionDB): The connection.
+            database_name (str): The database (schema) name.
+
+        Returns:
+            (dict | None): The tables (see ``SchemaCache.table()``). None if a
+            query fails.
+        """
+
+        tables = {}
+
+        sql = "SELECT TABLE_NAME, COLUMN_NAME, DATA_TYPE, COLUMN_TYPE, "
+        sql += "IS_NULLABLE, COLUMN_KEY, COLUMN_DEFAULT "
+        sql += "FROM INFORMATION_SCHEMA.COLUMNS "
+        sql += "WHERE TABLE_SCHEMA = %s "
+        sql += "ORDER BY TABLE_NAME, ORDINAL_POSITION"
+
+        result = database.select(sql, (database_name, ))
+        if result is False:
+            return None
+        rows = result[1]
+        for (table_name, name, data_type, column_type, nullable, key,
+             default) in rows:
+            table = tables.setdefault(table_name,
+                                      {'columns': [], 'indexes': {}})
+            table['columns'].append({
+                'name': name,
+                'type': data_type,
+                'column_type': column_type,
+                'nullable': nullable == 'YES',
+                'key': key,
+                'default': default
+            })
+
+        sql = "SELECT TABLE_NAME, INDEX_NAME, NON_UNIQUE, COLUMN_NAME "
+        sql += "FROM INFORMATION_SCHEMA.STATISTICS "
+        sql += "WHERE TABLE_SCHEMA = %s "
+        sql += "ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX"
+
+        result = database.select(sql, (database_name, ))
+        if result is False:
+            return None
+        rows = result[1]
+        for table_name, index_name, non_unique, column_name in rows:
+            table = tables.get(table_name)
+            if table is None:
+                continue
+            index = table['indexes'].setdefault(
+                index_name, {'unique': not int(non_unique), 'columns': []})
+            index['columns'].append(column_name)
+
+        return tables
+
+
+class SQLiteError(Exception):
+    u"""An error raised by the SQLite connection, with the MySQL error code
+    of the closest MySQL error (so ``ConnectionDB`` handles both the same
+    way).
+
+    Args:
+        msg (str): The message of the ``sqlite3`` error.
+        errno (int, optional): The MySQL error code. Defaults to None.
+    """
+
+    def __init__(self, msg, errno=None):
+        super(SQLiteError, self).__init__(msg)
+        self.msg = msg
+        self.errno = errno
+
+    def __str__(self):
+        if self.errno is None:
+            return self.msg
+        return "{errno}: {msg}".format(errno=self.errno, msg=self.msg)
+
+
+class _ErrorCode(object):
+    u"""The MySQL error codes used by ``ConnectionDB`` (the same names as
+    ``mysql.connector.errorcode``)."""
+
+    ER_ACCESS_DENIED_ERROR = 1045
+    ER_BAD_FIELD_ERROR = 1054
+    ER_DBACCESS_DENIED_ERROR = 1044
+    ER_DUP_ENTRY = 1062
+    ER_LOCK_DEADLOCK = 1213
+    ER_LOCK_WAIT_TIMEOUT = 1205
+    ER_NO_SUCH_TABLE = 1146
+
+
+# A part of each SQLite message and the MySQL error code.
+_SQLITE_ERRORS = (
+    ('no such table', _ErrorCode.ER_NO_SUCH_TABLE),
+    ('no such column', _ErrorCode.ER_BAD_FIELD_ERROR),
+    ('has no column named', _ErrorCode.ER_BAD_FIELD_ERROR),
+    ('unique constraint failed', _ErrorCode.ER_DUP_ENTRY),
+    ('database is locked', _ErrorCode.ER_LOCK_WAIT_TIMEOUT),
+    ('database table is locked', _ErrorCode.ER_LOCK_WAIT_TIMEOUT)
+)
+
+_PLACEHOLDER = re.compile(r"%s")
+_LIMIT = re.compile(r"\s+LIMIT\s+\d+\s*$", re.IGNORECASE)
+_FOR_UPDATE = re.compile(r"\s+FOR\s+UPDATE\s*$", re.IGNORECASE)
+_DUPLICATE_KEY = re.compile(r"\s+ON\s+DUPLICATE\s+KEY\s+UPDATE\s+",
+                            re.IGNORECASE)
+_VALUES_FUNCTION = re.compile(r"\bVALUES\((\w+)\)", re.IGNORECASE)
+_EXPLAIN = re.compile(r"^\s*EXPLAIN\s+(?!QUERY\s+PLAN)", re.IGNORECASE)
+_SERVER_VARIABLE = re.compile(r"^\s*SELECT\s+@@(\w+)\s+AS\s+(\w+)\s*$",
+                              re.IGNORECASE)
+_MULTI_ROW_INSERT = re.compile(r"^\s*INSERT\s+INTO\s+`?(\w+)`?.*\)\s*,\s*\(",
+                               re.IGNORECASE | re.DOTALL)
+
+_translations = {}
+_MAX_TRANSLATIONS = 5000
+
+
+def translate_sql(sql):
+    u"""Translates a statement written for MySQL (as ``DatabaseObject``
+    writes them) to SQLite.
+
+    - The ``%s`` placeholders become ``?``.
+    - ``LIMIT`` is removed from UPDATE and DELETE statements (the IDs are
+      unique anyway).
+    - ``FOR UPDATE`` is removed (SQLite locks the whole database on write).
+    - ``ON DUPLICATE KEY UPDATE col=VALUES(col)`` becomes
+      ``ON CONFLICT DO UPDATE SET col=excluded.col`` (SQLite 3.35 or newer).
+    - ``EXPLAIN`` becomes ``EXPLAIN QUERY PLAN``.
+
+    Args:
+        sql (str): The MySQL statement.
+
+    Returns:
+        str: The SQLite statement.
+
+    Example:
+        How to call this function::
+
+            translate_sql("DELETE FROM bicycles WHERE id=%s LIMIT 1")
+            # 'DELETE FROM bicycles WHERE id=?'
+    """
+
+    result = _translations.get(sql)
+    if result is not None:
+        return result
+
+    result = _PLACEHOLDER.sub("?", sql)
+
+    command = result.lstrip()[:6].upper()
+    if command in ('UPDATE', 'DELETE'):
+        result = _LIMIT.sub("", result)
+
+    result = _FOR_UPDATE.sub("", result)
+
+    parts = _DUPLICATE_KEY.split(result, 1)
+    if len(parts) == 2:
+        result = parts[0] + " ON CONFLICT DO UPDATE SET "
+        result += _VALUES_FUNCTION.sub(r"excluded.\1", parts[1])
+
+    result = _EXPLAIN.sub("EXPLAIN QUERY PLAN ", result)
+
+    # The same few statements are executed again and again.
+    if len(_translations) >= _MAX_TRANSLATIONS:
+        _translations.clear()
+    _translations[sql] = result
+
+    return result
+
+
+_COMMENT = re.compile(r"^\s*#.*$", re.MULTILINE)
+_USE = re.compile(r"^\s*USE\s+\w+\s*;\s*$", re.MULTILINE | re.IGNORECASE)
+_TABLE_OPTIONS = re.compile(r"\)\s*ENGINE\s*=[^;]*;", re.IGNORECASE)
+_ADD_INDEX = re.compile(
+    r"ALTER\s+TABLE\s+(\w+)\s+ADD\s+(UNIQUE\s+)?(?:INDEX|KEY)\s+(\w+)\s*"
+    r"\(([^)]*)\)\s*;", re.IGNORECASE)
+_CREATE_TABLE = re.compile(r"CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?"
+                           r"`?(\w+)`?\s*\((.*?)\)\s*;",
+                           re.IGNORECASE | re.DOTALL)
+_TEXT_TYPE = re.compile(r"\b(VARCHAR\s*\(\s*\d+\s*\)|CHAR\s*\(\s*\d+\s*\)|"
+                        r"TEXT)(?!\s+COLLATE)", re.IGNORECASE)
+
+
+def translate_ddl(script):
+    u"""Translates a MySQL script (like the ones in ``resources/sql``) to
+    SQLite.
+
+    - The ``#`` comments and the ``USE`` statements are removed.
+    - The ``AUTO_INCREMENT`` column becomes ``INTEGER PRIMARY KEY
+      AUTOINCREMENT``.
+    - The table options (``ENGINE``, ``CHARSET`` and so on) are removed.
+    - ``KEY`` definitions and ``ALTER TABLE ... ADD INDEX`` become
+      ``CREATE INDEX`` statements.
+    - Text columns compare ignoring case (``COLLATE NOCASE``), like the
+      default MySQL collation.
+
+    Args:
+        script (str): The MySQL script.
+
+    Returns:
+        str: The SQLite script.
+    """
+
+    script = _COMMENT.sub("", script)
+    script = _USE.sub("", script)
+    script = _TABLE_OPTIONS.sub(");", script)
+    script = _ADD_INDEX.sub(
+        lambda match: _create_index(match.group(1), match.group(3),
+                                    match.group(4), bool(match.group(2))),
+        script)
+
+    return _CREATE_TABLE.sub(_translate_create_table, script)
+
+
+def _create_index(table, name, columns, unique):
+    u"""Creates a ``CREATE INDEX`` statement for ``translate_ddl()``.
+
+    Args:
+        table (str): The table name.
+        name (str): The index name.
+        columns (str): The columns, separated by commas.
+        unique (bool): Creates a unique index.
+
+    Returns:
+        str: The statement.
+    """
+
+    return "CREATE {unique}INDEX {name} ON {table} ({columns});".format(
+        unique="UNIQUE " if unique else "", name=name, table=table,
+        columns=columns)
+
+
+def _translate_create_table(match):
+    u"""Translates one ``CREATE TABLE`` statement for ``translate_ddl()``.
+
+    Args:
+        match (re.MatchObject): The statement, with the table name and the
+            definitions.
+
+    Returns:
+        str: The ``CREATE TABLE`` statement and its ``CREATE INDEX``
+        statements.
+    """
+
+    table = match.group(1)
+
+    # Splits the definitions by the commas outside parentheses.
+    definitions = []
+    depth = 0
+    current = ""
+    for character in match.group(2):
+        if character == "," and depth == 0:
+            definitions.append(current.strip())
+            current = ""
+            continue
+        depth += {"(": 1, ")": -1}.get(character, 0)
+        current += character
+    definitions.append(current.strip())
+
+    auto_increment = None
+    columns = []
+    indexes = []
+    for definition in definitions:
+        words = definition.split()
+        keyword = words[0].upper() if words else ""
+
+        if keyword in ('KEY', 'INDEX', 'UNIQUE'):
+            index = re.match(r"(UNIQUE\s+)?(?:KEY|INDEX)?\s*`?(\w+)`?\s*"
+                             r"\(([^)]*)\)", definition, re.IGNORECASE)
+            indexes.append(_create_index(table, index.group(2),
+                                         index.group(3), bool(index.group(1))))
+        elif re.search(r"\bAUTO_INCREMENT\b", definition, re.IGNORECASE):
+            auto_increment = words[0].strip("`")
+            columns.append(auto_increment +
+                           " INTEGER PRIMARY KEY AUTOINCREMENT")
+        elif keyword == 'PRIMARY':
+            columns.append(definition)
+        else:
+            columns.append(_TEXT_TYPE.sub(r"\1 COLLATE NOCASE", definition))
+
+    # PRIMARY KEY (id) is part of the AUTOINCREMENT column.
+    if auto_increment is not None:
+        columns = [column for column in columns
+                   if not column.upper().startswith('PRIMARY')]
+
+    statement = "CREATE TABLE {table} (\n    {columns}\n);".format(
+        table=table, columns=",\n    ".join(columns))
+
+    return "\n".join([statement] + indexes)
+
+
+class SQLiteBackend(object):
+    u"""SQLite database, through the ``sqlite3`` module.
+
+    The connections translate the MySQL statements (see ``translate_sql()``)
+    and answer ``SELECT @@variable`` from ``server_variables``. The errors
+    carry MySQL error codes (see ``SQLiteError``), so transactions are retried
+    and messages are shown like with MySQL.
+
+    All the connections to ``':memory:'`` share the same database (and the
+    same ``sqlite3`` connection), so ``DB_POOL_SIZE`` should be 0.
+
+    Args:
+        path (str, optional): The database file. Defaults to ``':memory:'``.
+
+    Warning:
+        Multi-row INSERT statements need SQLite 3.32 or newer (32766
+        placeholders), and ``DatabaseObject.upsert()`` needs SQLite 3.35 or
+        newer (see ``sqlite3.sqlite_version``).
+    """
+
+    name = 'sqlite'
+
+    Error = SQLiteError
+    errorcode = _ErrorCode
+
+    def __init__(self, path=':memory:'):
+        import sqlite3
+
+        self.path = path
+        self.server_variables = {
+            'max_allowed_packet': 64 * 1024 * 1024,
+            'auto_increment_increment': 1,
+            'version': sqlite3.sqlite_version
+        }
+
+        self._sqlite3 = sqlite3
+        self._memory_connection = None
+        self._memory_lock = threading.Lock()
+
+        # Bicycle.price and Bicycle.weight_kg are DECIMAL, like in MySQL.
+        sqlite3.register_adapter(decimal.Decimal, str)
+        sqlite3.register_converter(
+            'decimal', lambda value: decimal.Decimal(value.decode('ascii')))
+
+    def load_driver(self):
+        u"""The backend is its own driver (it has ``Error`` and
+        ``errorcode``).
+
+        Returns:
+            SQLiteBackend: This backend.
+        """
+
+        return self
+
+    def connect(self):
+        u"""Opens a connection.
+
+        Returns:
+            SQLiteConnection: The connection.
+
+        Raises:
+            SQLiteError: If the file cannot be opened.
+        """
+
+        try:
+            if self.path != ':memory:':
+                return SQLiteConnection(self, self._open())
+
+            with self._memory_lock:
+                if self._memory_connection is None:
+                    self._memory_connection = self._open()
+            return SQLiteConnection(self, self._memory_connection)
+
+        except self._sqlite3.Error as err:
+            raise self.error(err)
+
+    def _open(self):
+        u"""Opens a ``sqlite3`` connection without implicit transactions
+        (see ``SQLiteConnection.start_transaction()``).
+
+        Returns:
+            sqlite3.Connection: The connection.
+        """
+
+        connection = self._sqlite3.connect(
+            self.path, timeout=30, isolation_level=None,
+            check_same_thread=False,
+            detect_types=self._sqlite3.PARSE_DECLTYPES)
+        connection.execute("PRAGMA foreign_keys = ON")
+        return connection
+
+    def error(self, err):
+        u"""Converts a ``sqlite3`` error.
+
+        Args:
+            err (sqlite3.Error): The error.
+
+        Returns:
+            SQLiteError: The error with the MySQL error code.
+        """
+
+        message = u"{err}".format(err=err)
+        lowered = message.lower()
+        for part, errno in _SQLITE_ERRORS:
+            if part in lowered:
+                return SQLiteError(message, errno)
+
+        return SQLiteError(message)
+
+    def execute_script(self, path):
+        u"""Executes a MySQL script (see ``translate_ddl()``), like the ones in
+        ``resources/sql``.
+
+        Args:
+            path (str): The script file.
+
+        Raises:
+            SQLiteError: If a statement fails.
+        """
+
+        with io.open(path, encoding='utf-8') as script_file:
+            script = translate_ddl(script_file.read())
+
+        connection = self.connect()
+        try:
+            connection.raw.executescript(script)
+        except self._sqlite3.Error as err:
+            raise self.error(err)
+        finally:
+            connection.close()
+
+    def introspect(self, database, database_name):
+        u"""Reads the columns and indexes of every table with ``PRAGMA``
+        statements. Used by ``SchemaCache``.
+
+        Args:
+            database (ConnectionDB): The connection.
+            database_name (str): Not used (a SQLite file is one database).
+
+        Returns:
+            (dict | None): The tables (see ``SchemaCache.table()``), with the
+            MySQL names for the keys (``PRI``, ``UNI`` and ``MUL``) and the
+            primary key (``PRIMARY``). None if a query fails.
+        """
+
+        tables = {}
+
+        sql = "SELECT name FROM sqlite_master "
+        sql += "WHERE type = 'table' AND name NOT LIKE 'sqlite_%' "
+        sql += "ORDER BY name"
+        result = database.select(sql)
+        if result is False:
+            return None
+        table_names = [row[0] for row in _rows(result)]
+
+        for table_name in table_names:
+            table = {'columns': [], 'indexes': {}}
+            tables[table_name] = table
+
+            result = database.select(
+                "PRAGMA table_info({table})".format(table=table_name))
+            if result is False:
+                return None
+            primary_key = []
+            for (position, name, column_type, not_null, default,
+                 key) in _rows(result):
+                if key:
+                    primary_key.append((key, name))
+                table['columns'].append({
+                    'name': name,
+                    'type': column_type.split("(")[0].strip().lower(),
+                    'column_type': column_type.lower(),
+                    'nullable': not not_null and not key,
+                    'key': 'PRI' if key else '',
+                    'default': default
+                })
+            if primary_key:
+                table['indexes']['PRIMARY'] = {
+                    'unique': True,
+                    'columns': [name for key, name in sorted(primary_key)]
+                }
+
+            result = database.select(
+                "PRAGMA index_list({table})".format(table=table_name))
+            if result is False:
+                return None
+            for row in _rows(result):
+                index_name, unique, origin = row[1], row[2], row[3]
+                if origin == 'pk':
+                    continue
+
+                index_result = database.select(
+                    "PRAGMA index_info({index})".format(index=index_name))
+                if index_result is False:
+                    return None
+                index_columns = [info[2] for info in _rows(index_result)]
+                table['indexes'][index_name] = {
+                    'unique': bool(unique),
+                    'columns': index_columns
+                }
+
+                # Like COLUMN_KEY: the first column of the index.
+                for column in table['columns']:
+                    if index_columns and column['name'] == index_columns[0]:
+                        if not column['key']:
+                            column['key'] = 'UNI' if unique else 'MUL'
+
+        return tables
+
+
+def _rows(result):
+    u"""Returns the records of a ``ConnectionDB.select()`` result.
+
+    Args:
+        result (tuple | bool): The result. A ``PRAGMA`` statement without
+            records returns True.
+
+    Returns:
+        list[tuple]: The records.
+    """
+
+    return result[1] if isinstance(result, tuple) else []
+
+
+class SQLiteConnection(object):
+    u"""A ``sqlite3`` connection with the interface of ``MySQLConnection``
+    used by ``ConnectionDB``.
+
+    Outside ``start_transaction()``, each statement is committed on its own
+    (like ``ConnectionDB.query()`` does with MySQL).
+
+    Args:
+        backend (SQLiteBackend): The backend.
+        raw (sqlite3.Connection): The ``sqlite3`` connection.
+    """
+
+    unread_result = False
+
+    def __init__(self, backend, raw):
+        self.backend = backend
+        self.raw = raw
+        self.in_transaction = False
+
+    def cursor(self, dictionary=False, prepared=False, buffered=None):
+        u"""Creates a cursor. ``sqlite3`` already reuses the compiled
+        statements, so ``prepared`` and ``buffered`` are ignored.
+
+        Args:
+            dictionary (bool, optional): The rows are dictionaries. Defaults
+                to False (tuples).
+            prepared (bool, optional): Ignored.
+            buffered (bool, optional): Ignored.
+
+        Returns:
+            SQLiteCursor: The cursor.
+        """
+
+        return SQLiteCursor(self, dictionary)
+
+    def start_transaction(self):
+        self._execute("BEGIN")
+        self.in_transaction = True
+
+    def commit(self):
+        if self.in_transaction:
+            self.in_transaction = False
+            self._execute("COMMIT")
+
+    def rollback(self):
+        if self.in_transaction:
+            self.in_transaction = False
+            self._execute("ROLLBACK")
+
+    def _execute(self, sql):
+        try:
+            self.raw.execute(sql)
+        except self.backend._sqlite3.Error as err:
+            raise self.backend.error(err)
+
+    def ping(self, reconnect=False, attempts=1, delay=0):
+        pass
+
+    def is_connected(self):
+        return True
+
+    def consume_results(self):
+        pass
+
+    def close(self):
+        self.rollback()
+        # The memory database lives as long as the backend.
+        if self.raw is not self.backend._memory_connection:
+            self.raw.close()
+
+
+class SQLiteCursor(object):
+    u"""A ``sqlite3`` cursor with the interface of ``MySQLCursor`` used by
+    ``ConnectionDB``.
+
+    Args:
+        connection (SQLiteConnection): The connection.
+        dictionary (bool): The rows are dictionaries.
+    """
+
+    def __init__(self, connection, dictionary):
+        self._connection = connection
+        self._dictionary = dictionary
+        self._cursor = connection.raw.cursor()
+        self._rows = None
+
+        self.rowcount = -1
+        self.lastrowid = None
+        self.column_names = ()
+        self.with_rows = False
+
+    def execute(self, sql, values=None):
+        u"""Translates (see ``translate_sql()``) and executes a statement.
+
+        Args:
+            sql (str): The MySQL statement.
+            values (tuple, optional): The values of the placeholders.
+
+        Raises:
+            SQLiteError: If the statement fails.
+        """
+
+        values = tuple(values or ())
+        self._rows = None
+
+        variable = _SERVER_VARIABLE.match(sql)
+        if variable:
+            # SELECT @@max_allowed_packet AS value, for example.
+            self.column_names = (variable.group(2), )
+            self.with_rows = True
+            self._rows = [(self._connection.backend.server_variables.get(
+                variable.group(1)), )]
+            return
+
+        # MySQL reports the first ID generated by a multi-row INSERT, SQLite
+        # the last one.
+        first_id = None
+        multi_row = _MULTI_ROW_INSERT.match(sql)
+        if multi_row:
+            first_id = self._next_rowid(multi_row.group(1))
+
+        backend = self._connection.backend
+        try:
+            self._cursor.execute(translate_sql(sql), values)
+        except backend._sqlite3.Error as err:
+            raise backend.error(err)
+
+        description = self._cursor.description
+        self.with_rows = description is not None
+        self.column_names = tuple(column[0] for column in description or ())
+        self.rowcount = self._cursor.rowcount
+
+        self.lastrowid = self._cursor.lastrowid
+        if first_id is not None and self.lastrowid >= first_id:
+            self.lastrowid = first_id
+
+    def _next_rowid(self, table):
+        u"""Finds the ID that the next generated row of a table will get.
+
+        Args:
+            table (str): The table name.
+
+        Returns:
+            (int | None): The ID. None if the table does not exist.
+        """
+
+        cursor = self._connection.raw.cursor()
+        try:
+            # AUTOINCREMENT tables (see translate_ddl()) never reuse IDs.
+            cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = ?",
+                           (table, ))
+            row = cursor.fetchone()
+            if row is None:
+                cursor.execute("SELECT MAX(rowid) FROM " + table)
+                row = cursor.fetchone()
+        except self._connection.backend._sqlite3.Error:
+            return None
+        finally:
+            cursor.close()
+
+        return (row[0] or 0) + 1
+
+    def _convert(self, rows):
+        if self._dictionary:
+            return [dict(zip(self.column_names, row)) for row in rows]
+        return [tuple(row) for row in rows]
+
+    def fetchall(self):
+        if self._rows is not None:
+            rows, self._rows = self._rows, []
+            return self._convert(rows)
+        return self._convert(self._cursor.fetchall())
+
+    def fetchmany(self, size=1):
+        if self._rows is not None:
+            rows, self._rows = self._rows[:size], self._rows[size:]
+            return self._convert(rows)
+        return self._convert(self._cursor.fetchmany(size))
+
+    def fetchone(self):
+        rows = self.fetchmany(1)
+        return rows[0] if rows else None
+
+    def close(self):
+        self._cursor.close()
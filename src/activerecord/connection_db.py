@@ -1,22 +1,52 @@
 # -*- coding: utf-8 -*-
 
-__all__ = ['ConnectionDB']
+__all__ = ['ConnectionDB', 'QueryError']
 __copyright__ = u"Copyright (C) 2022 Leonardo Pinheiro"
 __author__ = u"Leonardo Pinheiro <info@leonardopinheiro.net>"
 __link__ = u"https://www.leonardopinheiro.net"
 
+import collections
+import contextlib
+import functools
+import random
+import threading
+import time
+import timeit
+import weakref
+
 import shared
 shared.add_site_packages_to_sys_path(__file__)
 import database_functions
+import instrumentation
+from connection_pool import ConnectionPool
+from slow_query_log import SlowQueryLog
+from worker_pool import WorkerPool
+
+
+class QueryError(Exception):
+    u"""Raised when the database reports an error while executing a query.
+
+    Outside a transaction, ``ConnectionDB.query()`` shows the error and returns
+    False instead. Inside a transaction (see ``ConnectionDB.transaction()``),
+    the error reaches the caller, so the transaction is rolled back.
+
+    Args:
+        message (str): The description of the error.
+        errno (int, optional): The MySQL error code. Defaults to None.
+    """
+
+    def __init__(self, message, errno=None):
+        super(QueryError, self).__init__(message)
+        self.errno = errno
 
-import mysql.connector
-from mysql.connector import errorcode
 
 class ConnectionDB(object):
     u"""Mimics (loosely and in a very crud way) the mysqli (PHP) class.
 
     This class was built to access MySQL databases and depends on
     ``mysql.connector`` (mysql-connector-python==8.0.22) to execute queries.
+    With ``DB_BACKEND = 'sqlite'`` in ``db_credentials.py``, it uses a local
+    SQLite database instead (see ``backends``).
 
     Warning:
         It is very important to **use a virtual environment.**
@@ -47,20 +77,591 @@ class ConnectionDB(object):
 
     """
 
-    affected_rows = 0
-    insert_id = 0
-
     def __init__(self):
-        # There is error checking inside the db_connect() function.
-        self.connection_db = database_functions.db_connect()
+        # Values that belong to the thread executing the queries
+        # (affected_rows, insert_id and the connection held by the thread).
+        self._local = threading.local()
+
+        # Server variables that do not change during the session.
+        self._server_variables = {}
+
+        # Prepared statements of each connection.
+        self._statements = weakref.WeakKeyDictionary()
+        self._statements_lock = threading.Lock()
+        self._max_statements = database_functions.db_setting(
+            'DB_PREPARED_STATEMENTS', 64)
+
+        pool_size = database_functions.db_setting('DB_POOL_SIZE', 0)
+        self._checkout_mode = database_functions.db_setting(
+            'DB_POOL_CHECKOUT', 'call')
+
+        if pool_size > 0:
+            key = (database_functions.db_setting('DB_SERVER'),
+                   database_functions.db_setting('DB_USER'),
+                   database_functions.db_setting('DB_NAME'))
+            self._pool = ConnectionPool.shared(
+                key, size=pool_size,
+                timeout=database_functions.db_setting('DB_POOL_TIMEOUT', 30),
+                ping_interval=database_functions.db_setting(
+                    'DB_POOL_PING_INTERVAL', 60))
+        else:
+            self._pool = None
+
+        # The connection is opened by the first query (see connection_db).
+        self._connection = None
+        self._connect_lock = threading.Lock()
+
+        # The threads of run_async(), created on first use.
+        self._workers = None
+        self._workers_lock = threading.Lock()
+
+        # Replaced (never changed) by add_listener() and remove_listener(),
+        # so it can be read without a lock.
+        self._listeners = ()
+
+        slow_query_log = database_functions.db_setting('DB_SLOW_QUERY_LOG')
+        if slow_query_log:
+            self.add_listener(SlowQueryLog(
+                slow_query_log,
+                threshold=database_functions.db_setting(
+                    'DB_SLOW_QUERY_THRESHOLD', 0.5)))
+
+        if database_functions.db_setting('DB_WARM_UP', False):
+            self.warm_up()
+
+    @property
+    def _driver(self):
+        u"""module: The ``mysql.connector`` package (or the SQLite backend, see
+        ``database_functions.get_backend()``), imported on first use."""
+        return database_functions.load_driver()
+
+    @property
+    def connection_db(self):
+        u"""MySQLConnection: The connection shared by all queries when the pool
+        is disabled. It is opened the first time it is needed. None if the pool
+        is enabled."""
+
+        if self._pool is not None:
+            return None
+
+        if self._connection is None:
+            with self._connect_lock:
+                if self._connection is None:
+                    # There is error checking inside the db_connect() function.
+                    self._connection = database_functions.db_connect()
+
+        return self._connection
+
+    def warm_up(self, background=True):
+        u"""Imports the driver and opens a connection before the first query
+        needs it.
+
+        Args:
+            background (bool, optional): Does the work in a daemon thread, so
+                the caller (a Maya window being opened, for example) is not
+                blocked. Defaults to True.
+
+        Returns:
+            (threading.Thread | None): The thread doing the work. None if
+            ``background`` is False.
+
+        Example:
+            How to call this method::
+
+                Bicycle._database.warm_up()
+        """
+
+        if not background:
+            self._warm_up()
+            return None
+
+        thread = threading.Thread(target=self._warm_up,
+                                  name='ConnectionDB.warm_up')
+        thread.daemon = True
+        thread.start()
+        return thread
+
+    def _warm_up(self):
+        u"""Does the work of ``warm_up()``. The errors are already shown by
+        ``db_connect()``, so they are not raised again.
+        """
+
+        try:
+            connection = self._acquire()
+            self._release(connection)
+            # With DB_POOL_CHECKOUT = 'thread', this thread is holding it.
+            self.release()
+        except Exception:
+            pass
+
+    @property
+    def affected_rows(self):
+        u"""int: The number of rows affected by the last query of the current
+        thread."""
+        return getattr(self._local, 'affected_rows', 0)
+
+    @affected_rows.setter
+    def affected_rows(self, value):
+        self._local.affected_rows = value
+
+    @property
+    def insert_id(self):
+        u"""int: The ID generated by the last INSERT of the current thread."""
+        return getattr(self._local, 'insert_id', 0)
+
+    @insert_id.setter
+    def insert_id(self, value):
+        self._local.insert_id = value
+
+    def _acquire(self):
+        u"""Gets the connection to be used by the current query.
+
+        Without the pool, it is always the same connection. With the pool, it
+        is the connection held by the current thread or, if there is none, one
+        taken from the pool.
+
+        Returns:
+            MySQLConnection: The connection.
+        """
+
+        if self._pool is None:
+            return self.connection_db
+
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            return connection
+
+        connection = self._pool.checkout()
+        if self._checkout_mode == 'thread':
+            self._local.connection = connection
+
+        return connection
+
+    def _release(self, connection, discard=False):
+        u"""Gives the connection back to the pool, unless it is held by the
+        current thread.
+
+        Args:
+            connection (MySQLConnection): The connection returned by
+                ``_acquire()``.
+            discard (bool, optional): The connection may be broken (see
+                ``_is_connection_error()``). It is closed instead of going
+                back to the idle connections. Inside a transaction, it is
+                released by ``transaction()``. Defaults to False.
+        """
+
+        if self._pool is None:
+            return
+
+        if getattr(self._local, 'connection', None) is connection:
+            if not discard or self.in_transaction:
+                return
+            # DB_POOL_CHECKOUT = 'thread': the thread stops holding it.
+            self._local.connection = None
+
+        self._pool.checkin(connection, discard=discard)
+
+    def _is_connection_error(self, err):
+        u"""Tells if an error may have left the connection unusable.
+
+        The errors reported by the server about the statement (error codes
+        below 2000, like a missing table or a duplicate key) do not affect the
+        connection. Client errors (2000 and above, like a lost connection) and
+        errors without a code may.
+
+        Args:
+            err (Exception): The error raised while executing a query.
+
+        Returns:
+            bool: True if the connection should be discarded.
+
+        References:
+            `B.2 Error Information Interfaces`_
+
+        .. _B.2 Error Information Interfaces:
+           https://dev.mysql.com/doc/refman/8.0/en/error-interfaces.html
+        """
+
+        errno = getattr(err, 'errno', None)
+        return not (isinstance(err, self._driver.Error) and
+                    errno is not None and 0 < errno < 2000)
+
+    def release(self):
+        u"""Gives the connection held by the current thread back to the pool.
+
+        Only necessary with ``DB_POOL_CHECKOUT = 'thread'``. Worker threads
+        should call it before finishing.
+        """
+
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            self._local.connection = None
+            self._pool.checkin(connection)
+
+    @property
+    def in_transaction(self):
+        u"""bool: True if the current thread is inside ``transaction()``."""
+        return getattr(self._local, 'transaction_depth', 0) > 0
+
+    @contextlib.contextmanager
+    def transaction(self):
+        u"""Executes the queries inside the ``with`` block as one transaction.
+
+        The writes are not committed one by one. They are committed together
+        at the end of the block, or rolled back if the block raises an error
+        (including the errors of the queries, which are raised as
+        ``QueryError`` inside a transaction).
+
+        A ``with`` block cannot be executed again, so deadlocks are not retried
+        here. Use ``run_in_transaction()`` for that.
+
+        Transactions can be nested. The inner ones join the outermost one,
+        which is the only one that commits.
+
+        Yields:
+            ConnectionDB: This object.
+
+        Raises:
+            QueryError: If a query or the commit fails.
+
+        Warning:
+            Without the pool, all threads share the same connection. Another
+            thread writing during the transaction would commit it. Use the pool
+            (``DB_POOL_SIZE``) when transactions run in several threads.
+
+        Example:
+            How to call this method::
+
+                with Bicycle._database.transaction():
+                    for bike in bikes:
+                        bike.save()
+
+        References:
+            `10.2.35 MySQLConnection.start_transaction() Method`_
+
+            `contextlib.contextmanager`_
+
+        .. _10.2.35 MySQLConnection.start_transaction() Method:
+           https://dev.mysql.com/doc/connector-python/en/connector-python-api-mysqlconnection-start-transaction.html
+        .. _contextlib.contextmanager:
+           https://docs.python.org/2.7/library/contextlib.html#contextlib.contextmanager
+        """
+
+        depth = getattr(self._local, 'transaction_depth', 0)
+        if depth:
+            self._local.transaction_depth = depth + 1
+            try:
+                yield self
+            finally:
+                self._local.transaction_depth = depth
+            return
+
+        # Every query of the block must use the same connection.
+        connection = self._acquire()
+        pinned = (self._pool is not None and
+                  getattr(self._local, 'connection', None) is None)
+        if pinned:
+            self._local.connection = connection
+
+        # The connection is closed, instead of going back to the pool, if it
+        # may be broken.
+        discard = False
+
+        try:
+            try:
+                # Autocommit is off, so a previous SELECT may have left a
+                # transaction open.
+                if connection.in_transaction:
+                    connection.commit()
+                connection.start_transaction()
+            except self._driver.Error as err:
+                discard = self._is_connection_error(err)
+                self._raise_query_error(err)
+
+            self._local.transaction_depth = 1
+            try:
+                yield self
+            except BaseException:
+                self._local.transaction_depth = 0
+                discard = not self._rollback(connection)
+                raise
+
+            self._local.transaction_depth = 0
+            try:
+                connection.commit()
+            except self._driver.Error as err:
+                discard = not self._rollback(connection)
+                self._raise_query_error(err)
+
+        finally:
+            self._local.transaction_depth = 0
+            if pinned:
+                self._local.connection = None
+                self._release(connection, discard)
+
+    def run_in_transaction(self, func, *args, **kwargs):
+        u"""Calls the function inside ``transaction()`` and calls it again if
+        the transaction fails with a deadlock or a lock wait timeout.
+
+        Between the attempts, it waits a random time that doubles after each
+        attempt (exponential backoff with jitter).
+
+        Inside another transaction, the function is only called (the outermost
+        transaction decides what happens on errors).
+
+        Args:
+            func (function): The function to be called. It must be safe to call
+                it again after a rollback.
+            *args: The positional arguments of the function.
+            **kwargs: The keyword arguments of the function, plus:
+
+                - ``retries`` (int): How many times the function is called
+                  again. Defaults to 3.
+                - ``backoff`` (float): The first wait, in seconds. Defaults to
+                  0.05.
+
+        Returns:
+            obj: The return value of the function.
+
+        Raises:
+            QueryError: If the last attempt fails, or on other errors.
+
+        Example:
+            How to call this method::
+
+                def reprice(bikes):
+                    for bike in bikes:
+                        bike.price = bike.price * 0.9
+                        bike.save()
+
+                Bicycle._database.run_in_transaction(reprice, bikes)
+
+        References:
+            `15.7.5 Deadlocks in InnoDB`_
+
+            `Exponential Backoff And Jitter`_
+
+        .. _15.7.5 Deadlocks in InnoDB:
+           https://dev.mysql.com/doc/refman/8.0/en/innodb-deadlocks.html
+        .. _Exponential Backoff And Jitter:
+           https://aws.amazon.com/blogs/architecture/exponential-backoff-and-jitter/
+        """
+
+        retries = kwargs.pop('retries', 3)
+        backoff = kwargs.pop('backoff', 0.05)
+
+        if self.in_transaction:
+            return func(*args, **kwargs)
+
+        errorcode = self._driver.errorcode
+        retry_errors = (errorcode.ER_LOCK_DEADLOCK,
+                        errorcode.ER_LOCK_WAIT_TIMEOUT)
+
+        attempt = 0
+        while True:
+            try:
+                with self.transaction():
+                    return func(*args, **kwargs)
+            except QueryError as err:
+                if err.errno not in retry_errors or attempt >= retries:
+                    raise
+
+            time.sleep(random.uniform(0, backoff * 2 ** attempt))
+            attempt += 1
+
+    def _rollback(self, connection):
+        u"""Rolls back the transaction, ignoring errors (the connection may be
+        lost already).
+
+        Args:
+            connection (MySQLConnection): The connection of the transaction.
+
+        Returns:
+            bool: False if the rollback failed.
+        """
+
+        try:
+            connection.rollback()
+        except self._driver.Error as err:
+            shared.print_error_message(err)
+            return False
+
+        return True
+
+    def run_async(self, func, *args, **kwargs):
+        u"""Calls the function in a worker thread and returns at once, with an
+        object that receives its result.
+
+        The pool is required (``DB_POOL_SIZE`` above zero), so the workers and
+        the caller's thread never share a connection. The number of worker
+        threads is the size of the pool, so the workers never wait for a
+        connection.
+
+        Args:
+            func (function): The blocking function to be called.
+            *args: The positional arguments of the function.
+            **kwargs: The keyword arguments of the function.
+
+        Returns:
+            activerecord.worker_pool.AsyncResult: The result (or the error) of
+            the function.
+
+        Raises:
+            Exception: If the pool is disabled. The single connection cannot be
+                used by two threads at the same time.
+
+        Warning:
+            The function runs in another thread, so it is not part of a
+            transaction started by the caller (see ``transaction()``).
+
+        Example:
+            How to call this method::
+
+                result = Bicycle._database.run_async(Bicycle.find_all)
+                result.add_done_callback(
+                    lambda result: maya.utils.executeDeferred(
+                        fill_list, result.result()))
+        """
+
+        if self._pool is None:
+            message = "Asynchronous queries need the connection pool "
+            message += "(DB_POOL_SIZE must be greater than 0)."
+            shared.print_error_message(message)
+            raise Exception(message)
+
+        return self._get_workers().submit(
+            self._run_in_worker, functools.partial(func, *args, **kwargs))
+
+    def _run_in_worker(self, func):
+        u"""Calls the function inside a worker thread of ``run_async()``.
+
+        With ``DB_POOL_CHECKOUT = 'thread'``, the connection held by the worker
+        goes back to the pool afterwards, so idle workers do not hold
+        connections other threads need.
+
+        Args:
+            func (function): The function, without arguments.
+
+        Returns:
+            obj: The return value of the function.
+        """
+
+        try:
+            return func()
+        finally:
+            self.release()
+
+    def _get_workers(self):
+        u"""Creates (only once) the worker threads of ``run_async()``.
+
+        Returns:
+            activerecord.worker_pool.WorkerPool: The worker threads.
+        """
+
+        if self._workers is None:
+            with self._workers_lock:
+                if self._workers is None:
+                    self._workers = WorkerPool(self._pool.size,
+                                               name='ConnectionDB.run_async')
+
+        return self._workers
+
+    def add_listener(self, listener):
+        u"""Registers a function that is called after every query.
+
+        Without listeners, the queries are not timed at all.
+
+        Args:
+            listener (function): Receives an
+                ``activerecord.instrumentation.QueryEvent``. It runs in the
+                thread that executed the query, so it must be quick and
+                thread-safe (see ``activerecord.instrumentation.QueryStats``).
+
+        Example:
+            How to call this method::
+
+                stats = QueryStats()
+                Bicycle._database.add_listener(stats)
+        """
+
+        self._listeners = self._listeners + (listener, )
+
+    def remove_listener(self, listener):
+        u"""Unregisters a function added by ``add_listener()``.
+
+        Args:
+            listener (function): The function.
+        """
+
+        # Compared with ==, because a bound method is a new object every time
+        # it is read.
+        self._listeners = tuple(item for item in self._listeners
+                                if item != listener)
+
+    def _notify(self, listeners, sql, values, started, rows=None,
+                row_count=0, bytes_fetched=None, error=None):
+        u"""Sends a ``QueryEvent`` to the listeners.
 
-    def query(self, sql, values=None):
+        Args:
+            listeners (tuple[function]): The listeners.
+            sql (str): The statement.
+            values (tuple): The values of the placeholders (or None).
+            started (float): ``timeit.default_timer()`` before the execution.
+            rows (list, optional): The records (None for writes). Defaults to
+                None.
+            row_count (int, optional): The number of records, when ``rows`` is
+                not given. Defaults to 0.
+            bytes_fetched (int, optional): The size of the records, when
+                ``rows`` is not given. Defaults to None (0).
+            error (Exception, optional): The error raised by the driver.
+                Defaults to None.
+        """
+
+        duration = timeit.default_timer() - started
+
+        if rows is not None:
+            row_count = len(rows)
+            bytes_fetched = instrumentation.estimate_bytes(rows)
+            rows_affected = 0
+        else:
+            rows_affected = max(self.affected_rows, 0) if error is None else 0
+
+        event = instrumentation.QueryEvent(
+            sql=sql, values=values, duration=duration,
+            rows_returned=row_count, rows_affected=rows_affected,
+            bytes_fetched=bytes_fetched or 0, error=error)
+
+        for listener in listeners:
+            # A listener must never break the query.
+            try:
+                listener(event)
+            except Exception as err:
+                shared.print_error_message(err)
+
+    def pool_stats(self):
+        u"""Returns the statistics of the connection pool.
+
+        Returns:
+            (dict | None): See ``ConnectionPool.stats()``. None if the pool is
+            disabled.
+        """
+
+        if self._pool is None:
+            return None
+        return self._pool.stats()
+
+    def query(self, sql, values=None, prepared=False):
         u"""Performs a query on the database.
 
         Args:
             sql (str): The query to be executed.
             values (tuple, optional): The values to complete the SQL statement.
                 Defaults to None.
+            prepared (bool, optional): Executes the query as a server-side
+                prepared statement, reused every time the same SQL string is
+                executed on the same connection (see
+                ``_prepared_statement()``). Only used when there are values.
+                Defaults to False.
 
         Returns:
             (list[dict] | list[] | bool): Returns False on failure. For
@@ -69,11 +670,9 @@ class ConnectionDB(object):
             records. For other successful queries, will return True.
 
         Raises:
-            ER_NO_SUCH_TABLE: Raised by the MySQLConnection object if the
-                table does not exist.
-            ER_BAD_FIELD_ERROR: Raised by the MySQLConnection object if the
-                column does not exist.
-            Error: Any other error raised by the MySQLConnection object.
+            QueryError: Only inside a transaction (see ``transaction()``).
+                Outside, the error (see ``_raise_query_error()``) is shown and
+                False is returned.
 
         References:
             `10.6.4 cursor.MySQLCursorDict Class`_
@@ -103,51 +702,139 @@ class ConnectionDB(object):
 
         """
 
+        return self._execute(sql, values, prepared, dictionary=True)
+
+    def select(self, sql, values=None, prepared=False):
+        u"""Performs a query on the database and returns the records as tuples.
+
+        It is faster and uses less memory than ``query()``, because no
+        dictionary is created for each record.
+
+        Args:
+            sql (str): The query to be executed.
+            values (tuple, optional): The values to complete the SQL statement.
+                Defaults to None.
+            prepared (bool, optional): See ``query()``. Defaults to False.
+
+        Returns:
+            (tuple | bool): Returns False on failure. For successful queries
+            which produce a result set, returns ``(column_names, records)``,
+            where ``records`` is a list of tuples in the order of
+            ``column_names``. For other successful queries, returns True.
+
+        Raises:
+            QueryError: The same as ``query()``.
+
+        References:
+            `10.5.11 MySQLCursor.column_names Property`_
+
+        .. _10.5.11 MySQLCursor.column_names Property:
+           https://dev.mysql.com/doc/connector-python/en/connector-python-api-mysqlcursor-column-names.html
+        """
+
+        return self._execute(sql, values, prepared, dictionary=False)
+
+    def _execute(self, sql, values, prepared, dictionary):
+        u"""Does the work of ``query()`` and ``select()``.
+
+        Args:
+            sql (str): The query to be executed.
+            values (tuple): The values to complete the SQL statement (or None).
+            prepared (bool): See ``query()``.
+            dictionary (bool): Returns the records as dictionaries (like
+                ``query()``) instead of ``(column_names, records)`` (like
+                ``select()``).
+
+        Returns:
+            (list[dict] | tuple | bool): See ``query()`` and ``select()``.
+        """
+
         # The default return value of this function is False.
         result = False
 
-        # If the execution got to this line, it passed the error checking in
-        # db_connect().
-        cursor = self.connection_db.cursor(dictionary=True)  # MySQLCursorDict
+        # One check only when there are no listeners.
+        listeners = self._listeners
+        if listeners:
+            started = timeit.default_timer()
+            records = None
+            error = None
+
+        prepared = prepared and bool(values)
+        connection = None
+        cursor = None
+        discard = False
 
         # https://dev.mysql.com/doc/connector-python/en/connector-python-tutorial-cursorbuffered.html
         try:
-            # CREATE, UPDATE or DELETE (CRUD)
-            if values:
-                cursor.execute(sql, values)
-                self.connection_db.commit()
-                result = True
+            # Errors here are shown by db_connect() or by the pool. There is
+            # no connection to give back.
+            connection = self._acquire()
 
-            # READ (CRUD)
+            if prepared:
+                # MySQLCursorPrepared (kept open for the next executions).
+                cursor, sql = self._prepared_statement(connection, sql)
             else:
-                # Read
-                cursor.execute(sql)
-                result = cursor.fetchall()
+                # MySQLCursorDict or MySQLCursor (tuples).
+                cursor = connection.cursor(dictionary=dictionary)
+
+            cursor.execute(sql, values)
 
-        except mysql.connector.Error as err:
+            # READ (CRUD): SELECT, SHOW, DESCRIBE or EXPLAIN.
+            if cursor.with_rows:
+                records = cursor.fetchall()
 
-            # err.errno means the error code (number).
-            if err.errno == errorcode.ER_NO_SUCH_TABLE:
-                shared.print_error_message(
-                    "Database table does not exist.")
-                raise Exception("Database table does not exist.")
+                if not dictionary:
+                    result = (cursor.column_names, records)
 
-            if err.errno == errorcode.ER_BAD_FIELD_ERROR:
-                shared.print_error_message(
-                    "Column does not exist in table.")
-                raise Exception("Column does not exist in table.")
+                # Prepared statements return tuples.
+                elif prepared:
+                    column_names = cursor.column_names
+                    result = [dict(zip(column_names, record))
+                              for record in records]
 
+                else:
+                    result = records
+
+            # CREATE, UPDATE or DELETE (CRUD)
             else:
-                shared.print_error_message(err)
-                raise Exception("There was an error executing the query.")
+                # Inside a transaction, transaction() commits at the end.
+                if not self.in_transaction:
+                    connection.commit()
+                result = True
+
+        except self._driver.Error as err:
+            if listeners:
+                error = err
+            discard = self._is_connection_error(err)
+            if prepared and connection is not None:
+                self._discard_prepared_statement(connection, sql)
+            try:
+                self._raise_query_error(err)
+            except QueryError:
+                # The error was already shown. Outside a transaction, False is
+                # returned. Inside, the transaction must be rolled back.
+                if self.in_transaction:
+                    raise
+
+        except Exception:
+            discard = True
+            raise
 
         finally:
-            # If there was no error in the execution:
-            self.affected_rows = cursor.rowcount
-            self.insert_id = cursor.lastrowid
+            if cursor is not None:
+                # If there was no error in the execution:
+                self.affected_rows = cursor.rowcount
+                self.insert_id = cursor.lastrowid
+
+                # Closes the cursor (prepared statements stay open).
+                if not prepared:
+                    cursor.close()
+            if connection is not None:
+                self._release(connection, discard)
 
-            # Closes the cursor.
-            cursor.close()
+            if listeners:
+                self._notify(listeners, sql, values, started, rows=records,
+                             error=error)
 
             # THE CONNECTION SHOULD NOT BE CLOSED.
             # Autodesk Maya executes correctly the first time, but shows an error
@@ -156,7 +843,268 @@ class ConnectionDB(object):
             # Would close the connection.
             # database_functions.db_disconnect(self.connection_db)
 
-            return result
+        return result
+
+    def query_iter(self, sql, values=None, batch_size=1000):
+        u"""Performs a query on the database and yields the result set in
+        batches, without holding all the records in memory.
+
+        An unbuffered cursor is used, so the first batch is available as soon
+        as it arrives from the server.
+
+        Args:
+            sql (str): The query to be executed (SELECT, SHOW, DESCRIBE or
+                EXPLAIN).
+            values (tuple, optional): The values to complete the SQL statement.
+                Defaults to None.
+            batch_size (int, optional): How many records are fetched at a time.
+                Defaults to 1000.
+
+        Yields:
+            list[dict]: The next batch of records.
+
+        Raises:
+            QueryError: If the query fails (see ``_raise_query_error()``).
+
+        Warning:
+            While the iteration is not finished, the connection is busy with
+            this result set. Other queries executed on the same connection
+            inside the loop will fail. With the pool in ``'call'`` mode, the
+            other queries use other connections.
+
+        References:
+            `10.5.8 MySQLCursor.fetchmany() Method`_
+
+            `10.6.1 cursor.MySQLCursorBuffered Class`_
+
+        .. _10.5.8 MySQLCursor.fetchmany() Method:
+           https://dev.mysql.com/doc/connector-python/en/connector-python-api-mysqlcursor-fetchmany.html
+        .. _10.6.1 cursor.MySQLCursorBuffered Class:
+           https://dev.mysql.com/doc/connector-python/en/connector-python-api-mysqlcursorbuffered.html
+        """
+
+        batches = self.select_iter(sql, values, batch_size)
+        try:
+            for column_names, records in batches:
+                yield [dict(zip(column_names, record)) for record in records]
+        finally:
+            batches.close()
+
+    def select_iter(self, sql, values=None, batch_size=1000):
+        u"""Same as ``query_iter()``, but the records are tuples (see
+        ``select()``).
+
+        Args:
+            sql (str): The query to be executed.
+            values (tuple, optional): The values to complete the SQL statement.
+                Defaults to None.
+            batch_size (int, optional): How many records are fetched at a time.
+                Defaults to 1000.
+
+        Yields:
+            tuple: ``(column_names, records)`` for the next batch.
+
+        Raises:
+            QueryError: If the query fails (see ``_raise_query_error()``).
+        """
+
+        # The time includes the processing of each batch by the caller (the
+        # connection is busy meanwhile).
+        listeners = self._listeners
+        if listeners:
+            started = timeit.default_timer()
+            row_count = 0
+            bytes_fetched = 0
+            error = None
+
+        connection = None
+        cursor = None
+        discard = False
+
+        try:
+            try:
+                connection = self._acquire()
+
+                # MySQLCursor, unbuffered: rows stay on the server side until
+                # fetched.
+                cursor = connection.cursor(buffered=False)
+                cursor.execute(sql, values)
+                records = cursor.fetchmany(batch_size)
+            except self._driver.Error as err:
+                if listeners:
+                    error = err
+                discard = self._is_connection_error(err)
+                self._raise_query_error(err)
+
+            column_names = cursor.column_names
+            while records:
+                if listeners:
+                    row_count += len(records)
+                    bytes_fetched += instrumentation.estimate_bytes(records)
+
+                yield (column_names, records)
+
+                try:
+                    records = cursor.fetchmany(batch_size)
+                except self._driver.Error as err:
+                    if listeners:
+                        error = err
+                    discard = self._is_connection_error(err)
+                    self._raise_query_error(err)
+
+        finally:
+            if connection is not None:
+                try:
+                    # The iteration may stop early (break, exception or
+                    # garbage collection). The rows not read yet must be
+                    # discarded before the connection can be used again.
+                    if connection.unread_result:
+                        connection.consume_results()
+                    if cursor is not None:
+                        cursor.close()
+                except self._driver.Error:
+                    discard = True
+                finally:
+                    self._release(connection, discard)
+
+            if listeners:
+                self._notify(listeners, sql, values, started,
+                             row_count=row_count, bytes_fetched=bytes_fetched,
+                             error=error)
+
+    def _prepared_statement(self, connection, sql):
+        u"""Gets the prepared statement (cursor) for the given SQL string on the
+        given connection, preparing it on the server if necessary.
+
+        Each connection keeps its own least recently used cache, limited by
+        ``DB_PREPARED_STATEMENTS`` (the server limits the total number with
+        ``max_prepared_stmt_count``). The statements that leave the cache are
+        closed on the server.
+
+        Only the public API of the driver is used. ``MySQLCursorPrepared``
+        sends a ``COM_STMT_RESET`` before each execution (one more round
+        trip), but the statement is not prepared again.
+
+        Args:
+            connection (MySQLConnection): The connection executing the query.
+            sql (str): The SQL string, with ``%s`` placeholders.
+
+        Returns:
+            tuple: ``(cursor, sql)``. The cursor only skips the preparation
+            when it receives the very same string object it received before,
+            so the returned (cached) string must be the one executed.
+
+        References:
+            `10.6.5 cursor.MySQLCursorPrepared Class`_
+
+            `13.5 Prepared Statements`_
+
+        .. _10.6.5 cursor.MySQLCursorPrepared Class:
+           https://dev.mysql.com/doc/connector-python/en/connector-python-api-mysqlcursorprepared.html
+        .. _13.5 Prepared Statements:
+           https://dev.mysql.com/doc/refman/8.0/en/sql-prepared-statements.html
+        """
+
+        with self._statements_lock:
+            statements = self._statements.get(connection)
+            if statements is None:
+                statements = collections.OrderedDict()
+                self._statements[connection] = statements
+
+        # Only the thread holding the connection gets here, so the statements
+        # of one connection do not need the lock.
+        entry = statements.pop(sql, None)
+        if entry is None:
+            while statements and len(statements) >= self._max_statements:
+                _, (old_cursor, _) = statements.popitem(last=False)
+                old_cursor.close()
+            entry = (connection.cursor(prepared=True), sql)
+
+        # Most recently used at the end.
+        statements[sql] = entry
+
+        return entry
+
+    def _discard_prepared_statement(self, connection, sql):
+        u"""Closes and forgets a prepared statement (after an error, its state
+        is unknown).
+
+        Args:
+            connection (MySQLConnection): The connection executing the query.
+            sql (str): The SQL string.
+        """
+
+        statements = self._statements.get(connection)
+        entry = statements.pop(sql, None) if statements else None
+        if entry is not None:
+            try:
+                entry[0].close()
+            except self._driver.Error:
+                pass
+
+    def _raise_query_error(self, err):
+        u"""Shows the error message and raises an error with a friendlier
+        description of the given ``mysql.connector`` error.
+
+        Args:
+            err (mysql.connector.Error): The error raised by the cursor.
+
+        Raises:
+            QueryError: With the ``errno`` of the given error.
+                ER_NO_SUCH_TABLE: Raised by the MySQLConnection object if the
+                table does not exist.
+                ER_BAD_FIELD_ERROR: Raised by the MySQLConnection object if the
+                column does not exist.
+                Any other error raised by the MySQLConnection object.
+        """
+
+        # err.errno means the error code (number).
+        if err.errno == self._driver.errorcode.ER_NO_SUCH_TABLE:
+            shared.print_error_message(
+                "Database table does not exist.")
+            raise QueryError("Database table does not exist.", err.errno)
+
+        if err.errno == self._driver.errorcode.ER_BAD_FIELD_ERROR:
+            shared.print_error_message(
+                "Column does not exist in table.")
+            raise QueryError("Column does not exist in table.", err.errno)
+
+        else:
+            shared.print_error_message(err)
+            raise QueryError("There was an error executing the query.",
+                             err.errno)
+
+    def server_variable(self, name):
+        u"""Reads (only once per session) a global variable from the server.
+
+        Args:
+            name (str): The variable name, without the ``@@`` prefix (for
+                example, ``max_allowed_packet``).
+
+        Returns:
+            (int | str | None): The value of the variable. None if the query
+            fails (the error is shown by ``query()``). The failure is not
+            remembered, so the next call asks again.
+
+        References:
+            `5.1.8 Server System Variables`_
+
+        .. _5.1.8 Server System Variables:
+           https://dev.mysql.com/doc/refman/8.0/en/server-system-variables.html
+        """
+
+        if name not in self._server_variables:
+            # The name is never user input, but it goes into the SQL string.
+            if not name.replace('_', '').isalnum():
+                raise ValueError("Invalid server variable name.")
+
+            sql = "SELECT @@{name} AS value".format(name=name)
+            result = self.query(sql)
+            if not result:
+                return None
+            self._server_variables[name] = result[0]['value']
+
+        return self._server_variables[name]
 
     def escape_string(self, string_to_escape):
         u"""**NOT NECESSARY** (see reference).
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+
+__all__ = ['ConnectionPool']
+__copyright__ = u"Copyright (C) 2022 Leonardo Pinheiro"
+__author__ = u"Leonardo Pinheiro <info@leonardopinheiro.net>"
+__link__ = u"https://www.leonardopinheiro.net"
+
+import threading
+import time
+
+import shared
+import database_functions
+
+# reload() executes the module again in the same namespace. Keeping the pools
+# in a name that already exists makes them (and their idle connections) survive
+# the reload of a Maya shelf button.
+try:
+    _pools
+except NameError:
+    _pools = {}
+
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool(object):
+    u"""A thread safe pool of connections to the MySQL database.
+
+    Connections are opened on demand (through
+    ``database_functions.db_connect()``) up to ``size``. When all of them are
+    in use, ``checkout()`` waits for one to be returned.
+
+    Instances should be obtained through ``ConnectionPool.shared()``, so the
+    same pool is reused when the modules are reloaded.
+
+    Args:
+        size (int, optional): The maximum number of open connections.
+            Defaults to 5.
+        timeout (float, optional): How many seconds ``checkout()`` waits for a
+            connection before raising an error. Defaults to 30.
+        ping_interval (float, optional): Connections idle for longer than this
+            (in seconds) are pinged, and reconnected if needed, before being
+            handed out. Defaults to 60.
+
+    References:
+        `threading - Condition Objects`_
+
+        `10.2.25 MySQLConnection.ping() Method`_
+
+    .. _threading - Condition Objects:
+       https://docs.python.org/2.7/library/threading.html#condition-objects
+    .. _10.2.25 MySQLConnection.ping() Method:
+       https://dev.mysql.com/doc/connector-python/en/connector-python-api-mysqlconnection-ping.html
+    """
+
+    def __init__(self, size=5, timeout=30.0, ping_interval=60.0):
+        self.size = size
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+
+        self._condition = threading.Condition(threading.Lock())
+
+        # Pairs of (connection, time it was returned to the pool).
+        self._idle = []
+        self._opened = 0
+        self._in_use = 0
+
+        # Statistics.
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._max_wait_time = 0.0
+
+    @classmethod
+    def shared(cls, key, size=5, timeout=30.0, ping_interval=60.0):
+        u"""Returns the pool registered under the given key, creating it if
+        necessary.
+
+        Args:
+            key (tuple): Identifies the database (server, user and name).
+            size (int, optional): See the class documentation. Defaults to 5.
+            timeout (float, optional): See the class documentation. Defaults
+                to 30.
+            ping_interval (float, optional): See the class documentation.
+                Defaults to 60.
+
+        Returns:
+            ConnectionPool: The pool.
+        """
+
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = cls(size=size, timeout=timeout,
+                           ping_interval=ping_interval)
+                _pools[key] = pool
+            else:
+                # The settings may have changed before the reload.
+                pool.size = size
+                pool.timeout = timeout
+                pool.ping_interval = ping_interval
+
+            return pool
+
+    def checkout(self):
+        u"""Takes a connection from the pool.
+
+        Returns:
+            MySQLConnection: A connection that must be given back with
+            ``checkin()``.
+
+        Raises:
+            Exception: If no connection becomes available before the timeout.
+        """
+
+        started = time.time()
+        connection = None
+        released_at = None
+
+        with self._condition:
+            waited = False
+            while not self._idle and self._opened >= self.size:
+                waited = True
+                remaining = self.timeout - (time.time() - started)
+                if remaining <= 0:
+                    shared.print_error_message(
+                        "Timed out waiting for a database connection.")
+                    raise Exception(
+                        "Timed out waiting for a database connection.")
+                self._condition.wait(remaining)
+
+            if self._idle:
+                connection, released_at = self._idle.pop()
+            else:
+                # Reserves the slot. The connection is opened outside the lock.
+                self._opened += 1
+
+            self._in_use += 1
+            self._checkouts += 1
+
+            wait_time = time.time() - started
+            if waited:
+                self._waits += 1
+            self._wait_time += wait_time
+            self._max_wait_time = max(self._max_wait_time, wait_time)
+
+        try:
+            if connection is None:
+                connection = database_functions.db_connect()
+            elif time.time() - released_at > self.ping_interval:
+                connection.ping(reconnect=True)
+        except Exception:
+            with self._condition:
+                self._opened -= 1
+                self._in_use -= 1
+                self._condition.notify()
+            raise
+
+        return connection
+
+    def checkin(self, connection, discard=False):
+        u"""Gives a connection back to the pool.
+
+        Args:
+            connection (MySQLConnection): A connection taken with
+                ``checkout()``.
+            discard (bool, optional): Closes the connection (it raised an
+                error and may be broken) instead of keeping it idle. The next
+                ``checkout()`` opens a new one. Defaults to False.
+        """
+
+        with self._condition:
+            if discard:
+                self._opened -= 1
+            else:
+                self._idle.append((connection, time.time()))
+            self._in_use -= 1
+            self._condition.notify()
+
+        if discard:
+            try:
+                database_functions.db_disconnect(connection)
+            except Exception:
+                # It is broken already.
+                pass
+
+    def stats(self):
+        u"""Returns the pool statistics.
+
+        Returns:
+            dict: ``size``, ``opened``, ``in_use``, ``idle``, ``checkouts``,
+            ``waits`` (checkouts that had to wait), ``wait_time`` (total
+            seconds), ``max_wait_time`` and ``avg_wait_time``.
+        """
+
+        with self._condition:
+            return {
+                'size': self.size,
+                'opened': self._opened,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'checkouts': self._checkouts,
+                'waits': self._waits,
+                'wait_time': self._wait_time,
+                'max_wait_time': self._max_wait_time,
+                'avg_wait_time': (self._wait_time / self._checkouts
+                                  if self._checkouts else 0.0)
+            }
+
+    def close_idle(self):
+        u"""Closes every idle connection. Connections in use are not affected.
+        """
+
+        with self._condition:
+            idle = self._idle
+            self._idle = []
+            self._opened -= len(idle)
+
+        for connection, _ in idle:
+            database_functions.db_disconnect(connection)
@@ -9,12 +9,16 @@ References:
 
 """
 
+import threading
+
 import db_credentials
 import shared
 shared.add_site_packages_to_sys_path(__file__)
+from backends import MySQLBackend, SQLiteBackend
 
-from mysql.connector import errorcode
-import mysql.connector
+# Created on first use (see get_backend()).
+_backend = None
+_backend_lock = threading.Lock()
 
 
 def confirm_db_connect(connection):
@@ -26,8 +30,76 @@ def confirm_db_connect(connection):
     pass
 
 
+def db_setting(name, default=None):
+    u"""Reads an optional setting from the ``db_credentials`` module.
+
+    Only the credentials are mandatory in that file. The other settings keep
+    working when an older copy of ``db_credentials_example.py`` is in use.
+
+    Args:
+        name (str): The name of the setting (for example, ``DB_POOL_SIZE``).
+        default (Any, optional): The value used when the setting is not in the
+            file. Defaults to None.
+
+    Returns:
+        Any: The value of the setting.
+    """
+
+    return getattr(db_credentials, name, default)
+
+
+def get_backend():
+    u"""Returns the backend chosen by ``DB_BACKEND`` (see ``backends``).
+
+    Returns:
+        (MySQLBackend | SQLiteBackend): The backend.
+
+    Raises:
+        ValueError: If ``DB_BACKEND`` is not ``'mysql'`` or ``'sqlite'``.
+    """
+
+    global _backend
+
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                name = db_setting('DB_BACKEND', 'mysql')
+                if name == 'mysql':
+                    _backend = MySQLBackend(
+                        user=db_credentials.DB_USER,
+                        password=db_credentials.DB_PASS,
+                        host=db_credentials.DB_SERVER,
+                        database=db_credentials.DB_NAME,
+                        port=db_setting('DB_PORT', 3306))
+                elif name == 'sqlite':
+                    _backend = SQLiteBackend(
+                        db_setting('DB_SQLITE_PATH', ':memory:'))
+                else:
+                    message = "Unknown database backend: {name}.".format(
+                        name=name)
+                    shared.print_error_message(message)
+                    raise ValueError(message)
+
+    return _backend
+
+
+def load_driver():
+    u"""Imports the driver (``mysql.connector``) the first time it is called.
+
+    Importing the driver takes time and most of the tools never use the
+    database, so nothing is imported until the first connection is opened.
+
+    Returns:
+        module: The ``mysql.connector`` package (with ``errorcode`` loaded),
+        or the backend itself for SQLite (see ``get_backend()``).
+    """
+
+    return get_backend().load_driver()
+
+
 def db_connect():
-    u"""Establishes the connection with the MySQL database.
+    u"""Establishes the connection with the database (MySQL, unless another
+    backend is chosen in ``DB_BACKEND``).
 
     If the connection is not successful, raises an error and shows the message.
 
@@ -63,23 +135,24 @@ def db_connect():
 
     """
 
+    backend = get_backend()
+    mysql_connector = backend.load_driver()
+
     try:
-        connection_db = mysql.connector.connect(user=db_credentials.DB_USER, password=db_credentials.DB_PASS,
-                                                host=db_credentials.DB_SERVER,
-                                                database=db_credentials.DB_NAME)
+        connection_db = backend.connect()
 
         return connection_db
 
-    except mysql.connector.Error as err:
+    except mysql_connector.Error as err:
 
         # err.errno means the error code (number).
-        if err.errno == errorcode.ER_ACCESS_DENIED_ERROR:
+        if err.errno == mysql_connector.errorcode.ER_ACCESS_DENIED_ERROR:
             shared.print_error_message(
                 "Something is wrong with your username or password.")
             raise Exception(
                 "Something is wrong with your username or password.")
 
-        elif err.errno == errorcode.ER_DBACCESS_DENIED_ERROR:
+        elif err.errno == mysql_connector.errorcode.ER_DBACCESS_DENIED_ERROR:
             shared.print_error_message("Database does not exist.")
             raise Exception("Database does not exist.")
 
@@ -14,8 +14,19 @@ try:
 except ImportError:
     from abc import ABCMeta, abstractmethod
 
+import base64
+import collections
+import copy
+import json
+import numbers
+import operator
+
 import shared
-from connection_db import ConnectionDB
+from connection_db import ConnectionDB, QueryError
+from identity_map import IdentityMap
+from query_cache import QueryCache
+from schema_cache import SchemaCache
+import records
 
 
 class DatabaseObject(object):
@@ -62,6 +73,58 @@ class DatabaseObject(object):
     _db_columns = []
     errors = []
 
+    _query_cache = QueryCache()
+    u"""activerecord.query_cache.QueryCache: The cache for the results of
+    ``find_by_sql()``, shared by all subclasses (see ``set_query_cache()``)."""
+
+    _cache_ttl = 0
+    u"""float: Opt-in. How many seconds the results of ``find_by_sql()`` stay
+    cached for this class. Zero disables the cache."""
+
+    _prepared_statements = True
+    u"""bool: Executes the finders and the single record writes as server-side
+    prepared statements (see ``ConnectionDB.query()``)."""
+
+    _identity_map_enabled = False
+    u"""bool: Opt-in. When True, ``find_by_id()`` returns the object already
+    loaded (and still referenced somewhere) instead of querying the database
+    again."""
+
+    _identity_map_miss_ttl = 5.0
+    u"""float: How many seconds ``find_by_id()`` remembers an ID that was not
+    found, when the identity map is enabled."""
+
+    _bulk_max_rows = 1000
+    u"""int: The maximum number of rows in one multi-row INSERT statement."""
+
+    _bulk_packet_ratio = 0.5
+    u"""float: The fraction of the server's ``max_allowed_packet`` that one
+    multi-row INSERT statement may use. The size of a row is only estimated, so
+    the margin protects against values that grow when escaped."""
+
+    _upsert_existing_columns = ()
+    u"""tuple[str]: Columns that ``upsert()`` reads from the existing records
+    and passes to ``_before_upsert()`` (see ``Admin``, that keeps the hashed
+    password)."""
+
+    _schema_cache = None
+    u"""activerecord.schema_cache.SchemaCache: The schema of the database,
+    shared by all subclasses (see ``schema_cache()``)."""
+
+    _delete_chunk_size = 1000
+    u"""int: The maximum number of IDs in one ``DELETE ... WHERE id IN (...)``
+    statement (see ``delete_many()``)."""
+
+    _loaded_columns = None
+    u"""frozenset[str]: The columns loaded from the database, when the object
+    was found with a column list (see ``find_all()``). None means all of them.
+    """
+
+    _original = None
+    u"""tuple: ``(columns, values)`` as they were loaded from or last saved to
+    the database (see ``changes()``). None for objects that did not come from
+    the database."""
+
     @classmethod
     def set_database(cls, database):
         u"""**Not implemented.**
@@ -88,11 +151,17 @@ class DatabaseObject(object):
         pass
 
     @classmethod
-    def find_by_sql(cls, sql):
+    def find_by_sql(cls, sql, values=None, record_class=None):
         u"""Sends the SQL query to the database and returns a list of objects.
 
         Args:
-            sql (str): The SQL string to be executed.
+            sql (str): The SQL string to be executed, with ``%s`` placeholders
+                for the values.
+            values (tuple, optional): The values to complete the SQL statement.
+                Defaults to None.
+            record_class (type, optional): Creates compact records of this
+                class (see ``record_class()``) instead of instances of this
+                class. Defaults to None.
 
         Returns:
             (list[obj] | False): List containing objects from the query result.
@@ -106,301 +175,1818 @@ class DatabaseObject(object):
 
         """
 
-        result = cls._database.query(sql)
+        # Inside a transaction, the results may include uncommitted changes
+        # and must not be shared.
+        cache = None
+        if cls._cache_ttl > 0 and not cls._database.in_transaction:
+            cache = cls._query_cache
+
+        found = False
+        if cache is not None:
+            found, result = cache.get(cls._table_name, sql, values)
+
+        if not found:
+            # (column_names, records)
+            result = cls._database.select(sql, values=values,
+                                          prepared=cls._prepared_statements)
+            # A failed query (False) is not cached, so it is retried.
+            if cache is not None and result is not False:
+                cache.set(cls._table_name, sql, values, result,
+                          cls._cache_ttl)
 
         # If the resulting list is empty:
-        if not result:
+        if not result or not result[1]:
             shared.print_error_message(
                 'Database query failed. The resulting list is empty.')
             return False
 
         # results into objects
-        object_list = []
-        for record in result:
-            object_list.append(cls._instantiate(record))
+        factory = record_class if record_class is not None else cls
+        column_names, rows = result
 
-        return object_list
+        return factory._hydrate(column_names, rows)
 
     @classmethod
-    def find_all(cls):
-        u"""Finds all records in the given database table.
+    def transaction(cls):
+        u"""Shortcut to ``ConnectionDB.transaction()``.
 
         Returns:
-            list[obj]: List containing objects.
+            contextmanager: The transaction context.
 
-        References:
-            `Class method vs static method in Python`_
+        Warning:
+            After a rollback, the objects in memory keep the values they had
+            inside the transaction (including new IDs), even though the
+            database does not.
 
-        .. _Class method vs static method in Python:
-           https://www.tutorialspoint.com/class-method-vs-static-method-in-python#
+        Example:
+            How to call this method::
+
+                with Bicycle.transaction():
+                    for bike in bikes:
+                        bike.save()
         """
 
-        sql = "SELECT * FROM " + cls._table_name
-        return cls.find_by_sql(sql)
+        return cls._database.transaction()
 
     @classmethod
-    def find_by_id(cls, id):
-        u"""Finds a record in the database, using the ID.
+    def run_in_transaction(cls, func, *args, **kwargs):
+        u"""Shortcut to ``ConnectionDB.run_in_transaction()``, which retries
+        on deadlocks.
 
         Args:
-            id (int): The ID number to be used in the query.
+            func (function): The function to be called.
+            *args: The positional arguments of the function.
+            **kwargs: The keyword arguments of the function (and ``retries``
+                and ``backoff``).
 
         Returns:
-            (obj | False): An object corresponding to the database record. False
-            if it does not find anything.
+            obj: The return value of the function.
+        """
 
-        References:
-            `How to check if a list is empty in python?`_
+        return cls._database.run_in_transaction(func, *args, **kwargs)
 
-        .. _How to check if a list is empty in python\?:
-           https://flexiple.com/check-if-list-is-empty-python/#section2
+    @classmethod
+    def schema_cache(cls):
+        u"""Returns the schema cache shared by all subclasses, creating it on
+        first use.
+
+        Returns:
+            activerecord.schema_cache.SchemaCache: The schema cache.
         """
 
-        sql = "SELECT * FROM " + cls._table_name + " "
-        sql += "WHERE id='{id}'".format(id=cls._database.escape_string(id))
-        object_list = cls.find_by_sql(sql)
+        if DatabaseObject._schema_cache is None:
+            DatabaseObject._schema_cache = SchemaCache(cls._database)
+        return DatabaseObject._schema_cache
 
-        # Checks if the list is NOT empty (does not need the "not" keyword).
-        if object_list:
-            return object_list[0]
+    @classmethod
+    def verify_columns(cls):
+        u"""Compares ``_db_columns`` with the columns of the table (see
+        ``schema_cache()``). The differences are shown.
+
+        Returns:
+            list[str]: The errors string list (empty if they match).
+
+        Example:
+            How to call this method (at startup)::
+
+                for model in (Bicycle, Admin):
+                    model.verify_columns()
+        """
+
+        errors = []
+        columns = cls.schema_cache().columns(cls._table_name)
+
+        if columns is None:
+            errors.append("Table {table} does not exist.".format(
+                table=cls._table_name))
         else:
-            return False
+            for column in cls._db_columns:
+                if column not in columns:
+                    errors.append(
+                        "Column {column} is not in table {table}.".format(
+                            column=column, table=cls._table_name))
+            for column in columns:
+                if column not in cls._db_columns:
+                    errors.append(
+                        "Column {column} of table {table} is not in "
+                        "{model}._db_columns.".format(
+                            column=column, table=cls._table_name,
+                            model=cls.__name__))
+
+        if errors:
+            shared.print_error_message(shared.display_errors(errors))
+
+        return errors
 
     @classmethod
-    def _instantiate(cls, record):
-        u"""Creates an instance of the class setting the properties with
-        the values of the object passed as argument.
-
-        Args:
-            record (dict): A dictionary representing a record (row) in the
-                result set.
+    def derive_columns(cls):
+        u"""Replaces ``_db_columns`` with the columns of the table (see
+        ``schema_cache()``).
 
         Returns:
-            obj: An instance of the subclass.
-
-        References:
-            `Protected method in python [duplicate]`_
+            list[str]: The column names.
 
-            `How to know if an object has an attribute in Python`_
+        Raises:
+            Exception: If the table does not exist.
 
-            `Object does not support item assignment error`_
+        Example:
+            How to call this method (at startup)::
 
-        .. _Protected method in python [duplicate]:
-           https://stackoverflow.com/a/11483397
-        .. _How to know if an object has an attribute in Python:
-           https://stackoverflow.com/a/610893
-        .. _Object does not support item assignment error:
-           https://stackoverflow.com/a/8542369
+                Bicycle.derive_columns()
         """
 
-        # Creates an instance of the subclass.
-        obj = cls()
+        columns = cls.schema_cache().columns(cls._table_name)
+        if columns is None:
+            message = "Table {table} does not exist.".format(
+                table=cls._table_name)
+            shared.print_error_message(message)
+            raise Exception(message)
 
-        # Loops through the dictionary.
-        for key, value in record.items():
+        cls._db_columns = [str(column) for column in columns]
 
-            # Checks if the instance has the same attribute as the dictionary
-            # key.
-            if hasattr(obj, key):
+        # They were created from the previous columns.
+        for name in ('_hydration_plans', '_record_classes'):
+            if name in cls.__dict__:
+                delattr(cls, name)
 
-                # Sets the object attribute with the value from the key.
-                setattr(obj, key, value)
+        return cls._db_columns
 
-        return obj
+    @classmethod
+    def set_query_cache(cls, cache):
+        u"""Replaces the cache used by ``find_by_sql()``.
 
-    @abstractmethod
-    def _validate(self):
-        u"""Every class that extends this one (DatabaseObject) must implement
-        this method.
+        Setting it on ``DatabaseObject`` affects every subclass. Setting it on
+        a subclass affects only that subclass.
 
-        Returns:
-            list[str]: The errors string list.
+        Args:
+            cache (obj): A ``QueryCache`` or any object with the same
+                ``get()``, ``set()`` and ``invalidate_table()`` methods.
 
-        References:
-            `Is it possible to make abstract classes in Python?`_
+        Example:
+            How to call this method::
 
-            `Python RegEx: re.match(), re.search(), re.findall() with Example`_
+                DatabaseObject.set_query_cache(QueryCache(max_bytes=50000000))
+                Bicycle._cache_ttl = 30
 
-            `Regex match any single character (one character only)`_
+                bikes = Bicycle.find_all()  # Database.
+                bikes = Bicycle.find_all()  # Cache.
+                print(Bicycle._query_cache.stats())
+        """
 
-        .. _Is it possible to make abstract classes in Python?:
-           https://stackoverflow.com/a/13646263
-        .. _Python RegEx\: re.match(), re.search(), re.findall() with Example:
-           https://www.guru99.com/python-regular-expressions-complete-tutorial.html
-        .. _Regex match any single character (one character only):
-           https://stackoverflow.com/a/47545451
+        cls._query_cache = cache
+
+    @classmethod
+    def _invalidate_query_cache(cls):
+        u"""Removes the cached results of this class' table. Called after every
+        successful write.
         """
 
-        pass
+        cls._query_cache.invalidate_table(cls._table_name)
 
-    def _create(self):
-        u"""Creates a record in the database with the properties' values of the
-        current instance in memory.
+    @classmethod
+    def record_class(cls, read_only=False):
+        u"""Returns the compact record class generated from ``_db_columns``.
+
+        Records keep only the column values, in ``__slots__``, and use a
+        fraction of the memory of the model instances. ``Record`` instances
+        can still be validated, saved and deleted. ``ReadOnlyRecord``
+        instances are meant for list views.
+
+        Args:
+            read_only (bool, optional): Returns the read-only variant.
+                Defaults to False.
 
         Returns:
-            (list[dict] | list[] | bool): The result of the **query()** method
-            executed inside this method.
+            type: A subclass of ``activerecord.records.Record`` or
+            ``activerecord.records.ReadOnlyRecord``.
 
-        References:
-            `How to Convert a List to String in Python`_
+        Example:
+            How to call this method::
 
-            `Last Key in Python Dictionary`_
+                rows = Bicycle.find_all(
+                    record_class=Bicycle.record_class(read_only=True))
 
-            `Python add item to the tuple`_
+                for row in rows:
+                    print(row.brand)
+        """
 
-            `Prepared Statements`_
+        # Looks only in this class, not in the superclasses.
+        generated = cls.__dict__.get('_record_classes')
+        if generated is None:
+            generated = {}
+            cls._record_classes = generated
 
-            `How to check if a list is empty in python?`_
+        if read_only not in generated:
+            generated[read_only] = records.record_class(cls, read_only)
 
-        .. _How to Convert a List to String in Python:
-           https://www.simplilearn.com/tutorials/python-tutorial/list-to-string-in-python#how_to_convert_a_list_to_string_in_python
-        .. _Last Key in Python Dictionary:
-           https://stackoverflow.com/a/16125237
-        .. _Python add item to the tuple:
-           https://stackoverflow.com/a/16730584
-        .. _Prepared Statements:
-           https://www.php.net/manual/en/mysqli.quickstart.prepared-statements.php
-        .. _How to check if a list is empty in python?:
-           https://flexiple.com/check-if-list-is-empty-python/
-        """
+        return generated[read_only]
 
-        self._validate()
-        if self.errors:
-            return False
+    @classmethod
+    def find_all(cls, record_class=None, columns=None):
+        u"""Finds all records in the given database table.
 
-        attributes = self._sanitized_attributes()
+        Args:
+            record_class (type, optional): See ``find_by_sql()``. Defaults to
+                None.
+            columns (list[str], optional): Loads only these columns (and ID).
+                The other columns are not sent by the server and the objects
+                cannot read or save them. Defaults to None (all columns).
 
-        # Prepared statement, stage 1: prepare
-        # ----------------------------------------------------------------------
-        temporary_list = []
-        place_holder = '' # %s
-        sql = "INSERT INTO " + self._table_name + " ("
+        Returns:
+            list[obj]: List containing objects.
 
-        # Loops through the dictionary:
-        for key in attributes:
-            place_holder += '%s'
-            sql += key
-            temporary_list.append(attributes[key])
+        Raises:
+            ValueError: If a column is not in ``_db_columns``.
 
-            # If it is the last key in the dictionary:
-            if key == attributes.keys()[-1]:
-                break
+        Example:
+            How to call this method::
 
-            place_holder += ", "
-            sql += ", "
+                bikes = Bicycle.find_all(columns=['brand', 'model', 'price'])
 
-        sql += ") VALUES (" + place_holder + ")"
+        References:
+            `Class method vs static method in Python`_
 
-        data = tuple(temporary_list)
+        .. _Class method vs static method in Python:
+           https://www.tutorialspoint.com/class-method-vs-static-method-in-python#
+        """
 
-        # Prepared statement, stage 2: bind and execute happen inside query().
-        # ----------------------------------------------------------------------
-        result = self._database.query(sql, values=data)
-        if result:
-            self.id = self._database.insert_id
+        sql = "SELECT " + cls._select_list(columns, record_class) + " "
+        sql += "FROM " + cls._table_name
+        return cls.find_by_sql(sql, record_class=record_class)
 
-        return result
+    @classmethod
+    def _select_list(cls, columns=None, record_class=None):
+        u"""Creates the column list of the SELECT statements of the finders.
 
-    def _update(self):
-        u"""Updates the database with the properties' values of the current
-        instance in memory.
+        Args:
+            columns (list[str], optional): The columns to be loaded. ID is
+                always added. Defaults to None (all columns).
+            record_class (type, optional): The record class the finder will
+                create. Defaults to None.
 
         Returns:
-            bool: The result of the query() method executed inside this
-            method. True if the update is successful. False otherwise.
-
-        References:
-            `How to Convert a List to String in Python`_
+            str: ``*`` or the column names separated by commas.
 
-        .. _How to Convert a List to String in Python:
-           https://www.simplilearn.com/tutorials/python-tutorial/list-to-string-in-python#how_to_convert_a_list_to_string_in_python
+        Raises:
+            ValueError: If a column is not in ``_db_columns``, or if only some
+                columns are loaded into a writable record class.
         """
 
-        self._validate()
-        if self.errors:
-            return False
+        if columns is None:
+            return "*"
 
-        attributes = self._sanitized_attributes()
-        key_list = []
-        value_list = []
+        unknown = [column for column in columns
+                   if column not in cls._db_columns]
+        if unknown:
+            message = "{table} has no column(s): {columns}.".format(
+                table=cls._table_name, columns=", ".join(unknown))
+            shared.print_error_message(message)
+            raise ValueError(message)
 
-        # Loops through the dictionary:
-        for key, value in attributes.items():
-            key_list.append("{key}=%s".format(key=key))
-            value_list.append(value)
+        # Records have no room to remember which columns were loaded. A
+        # writable one would save the missing columns as NULL.
+        if (record_class is not None and
+                not issubclass(record_class, records.ReadOnlyRecord)):
+            message = "Loading some columns requires a read-only record class."
+            shared.print_error_message(message)
+            raise ValueError(message)
 
-        sql = "UPDATE " + self._table_name + " SET "
-        sql += ", ".join(key_list)
-        sql += " WHERE id=%s "
-        sql += "LIMIT 1"
+        selected = ['id']
+        for column in columns:
+            if column not in selected:
+                selected.append(column)
 
-        # Appends the ID at the end of the value_list.
-        value_list.append(self.id)
-        data = tuple(value_list)
+        return ", ".join(selected)
 
-        result = self._database.query(sql, values=data)
-        return result
+    @classmethod
+    def count(cls, **where):
+        u"""Counts the records that match all the given conditions, without
+        loading them.
 
-    def save(self):
-        u"""Executes the _update() or the _create() instance methods based on the
-        presence of an ID.
+        Args:
+            **where: Column names and values (see ``_where_clause()``). None
+                counts every record.
 
         Returns:
-            (list[dict] | list[] | bool): Returns the same as the instance
-            method that was executed.
+            (int | bool): The number of records. False if the query fails.
+
+        Example:
+            How to call this method::
+
+                Bicycle.count(category='Road')
         """
 
-        if self.id > 0:
-            return self._update()
-        return self._create()
+        result = cls._select_scalars("COUNT(*)", where)
+        if result is False:
+            return False
+        return int(result[0][0])
 
-    def merge_attributes(self, **kwargs):
-        u"""Merges the attributes from the given dictionary into the object in
-        memory created from the find_by_id() method.
+    @classmethod
+    def exists(cls, **where):
+        u"""Checks if at least one record matches all the given conditions.
+
+        The server stops at the first match (``LIMIT 1``).
 
         Args:
-            **kwargs: The dictionary containing the new values to be merged and later updated.
+            **where: Column names and values (see ``_where_clause()``).
+
+        Returns:
+            bool: True if there is a match. False otherwise (or if the query
+            fails).
 
         Example:
             How to call this method::
 
-                    bike = Bicycle.find_by_id(26)
-
-                    if bike:
-                        kwargs = {
-                            "id": bike.id,
-                            "brand": bike.brand,
-                            "model": "Bob's Overdrive", # bike.model
-                            "year": bike.year,
-                            "category": bike.category,
-                            "gender": bike.gender,
-                            "color": bike.color,
-                            "weight_kg": bike.weight_kg,
-                            "condition": bike.condition,
-                            "price": bike.price
-                        }
-
-                        bike.merge_attributes(**kwargs)
-                        result = bike.update()
-                        if result:
-                            print("The bicycle was updated.")
-                        else:
-                            print("There was an error in the update process.")
-                    else:
-                        print("The ID was not found.")
+                Admin.exists(username="kskoglund")
         """
 
-        for key, value in kwargs.items():
-            if hasattr(self, key) and not shared.is_none(value):
-                setattr(self, key, value)
+        result = cls._select_scalars("1", where, " LIMIT 1")
+        return bool(result)
 
-    def attributes(self):
-        u"""Creates a dictionary that have, as properties, the database columns
-        (excluding ID) and the corresponding values from the instance object in
-        memory.
+    @classmethod
+    def pluck(cls, *columns, **where):
+        u"""Reads only the given columns of the records that match all the
+        given conditions, without creating objects.
+
+        Args:
+            *columns: The column names.
+            **where: Column names and values (see ``_where_clause()``).
 
         Returns:
-            dict: Dictionary containing the names of the columns and the
+            (list | bool): A flat list of values for one column, or a list of
+            tuples for several columns. False if the query fails.
+
+        Raises:
+            ValueError: If there are no columns or a column is not in
+                ``_db_columns``.
+
+        Example:
+            How to call this method::
+
+                brands = Bicycle.pluck('brand', category='Road')
+                pairs = Bicycle.pluck('id', 'price')
+        """
+
+        unknown = [column for column in columns
+                   if column not in cls._db_columns]
+        if not columns or unknown:
+            message = "Invalid columns to pluck: {columns}.".format(
+                columns=", ".join(unknown) or "(none)")
+            shared.print_error_message(message)
+            raise ValueError(message)
+
+        rows = cls._select_scalars(", ".join(columns), where)
+        if rows is False:
+            return False
+        if len(columns) == 1:
+            return [row[0] for row in rows]
+        return [tuple(row) for row in rows]
+
+    @classmethod
+    def _select_scalars(cls, expression, where, suffix=""):
+        u"""Executes ``SELECT expression FROM table WHERE ...`` for
+        ``count()``, ``exists()`` and ``pluck()``.
+
+        Args:
+            expression (str): What is selected.
+            where (dict): The conditions (see ``_where_clause()``).
+            suffix (str, optional): Added to the end of the statement.
+                Defaults to "".
+
+        Returns:
+            (list[tuple] | bool): The records. False if the query fails.
+        """
+
+        sql = "SELECT " + expression + " FROM " + cls._table_name
+        values = None
+        if where:
+            where_sql, values = cls._where_clause(where)
+            sql += " WHERE " + where_sql
+        sql += suffix
+
+        result = cls._database.select(sql, values=values,
+                                      prepared=cls._prepared_statements)
+        if result is False:
+            return False
+        return result[1]
+
+    @classmethod
+    def find_by_id(cls, id, columns=None):
+        u"""Finds a record in the database, using the ID.
+
+        Args:
+            id (int): The ID number to be used in the query.
+            columns (list[str], optional): See ``find_all()``. Defaults to None
+                (all columns).
+
+        Returns:
+            (obj | False): An object corresponding to the database record. False
+            if it does not find anything.
+
+        References:
+            `How to check if a list is empty in python?`_
+
+        .. _How to check if a list is empty in python\?:
+           https://flexiple.com/check-if-list-is-empty-python/#section2
+        """
+
+        identity_map = cls._identity_map()
+        if identity_map is not None:
+            key = cls._identity_key(id)
+            obj = identity_map.get(key)
+            if obj is not None:
+                return obj
+            if identity_map.is_known_miss(key):
+                return False
+
+        sql = "SELECT " + cls._select_list(columns) + " "
+        sql += "FROM " + cls._table_name + " "
+        sql += "WHERE id=%s"
+        object_list = cls.find_by_sql(sql, (id, ))
+
+        # Checks if the list is NOT empty (does not need the "not" keyword).
+        if object_list:
+            # Only complete objects are shared through the identity map.
+            if identity_map is not None and columns is None:
+                identity_map.add(key, object_list[0])
+            return object_list[0]
+        else:
+            if identity_map is not None:
+                identity_map.add_miss(key)
+            return False
+
+    @classmethod
+    def afind_all(cls, record_class=None, columns=None):
+        u"""Asynchronous version of ``find_all()``.
+
+        The query runs in a worker thread (see ``ConnectionDB.run_async()``),
+        so independent queries overlap and the caller is not blocked. The
+        connection pool must be enabled (``DB_POOL_SIZE``).
+
+        Args:
+            record_class (type, optional): See ``find_by_sql()``. Defaults to
+                None.
+            columns (list[str], optional): See ``find_all()``. Defaults to None.
+
+        Returns:
+            activerecord.worker_pool.AsyncResult: The result of
+            ``find_all()``.
+
+        Raises:
+            Exception: If the connection pool is disabled.
+
+        Example:
+            How to call this method::
+
+                bikes = Bicycle.afind_all()
+                admins = Admin.afind_all()
+                print(len(bikes.result()), len(admins.result()))
+        """
+
+        return cls._database.run_async(cls.find_all, record_class=record_class,
+                                       columns=columns)
+
+    @classmethod
+    def afind_by_id(cls, id, columns=None):
+        u"""Asynchronous version of ``find_by_id()``.
+
+        Args:
+            id (int): The ID number to be used in the query.
+            columns (list[str], optional): See ``find_all()``. Defaults to None.
+
+        Returns:
+            activerecord.worker_pool.AsyncResult: The result of
+            ``find_by_id()``.
+        """
+
+        return cls._database.run_async(cls.find_by_id, id, columns=columns)
+
+    def asave(self):
+        u"""Asynchronous version of ``save()``.
+
+        The object must not be changed until the result is available.
+
+        Returns:
+            activerecord.worker_pool.AsyncResult: The result of ``save()``.
+        """
+
+        return self._database.run_async(self.save)
+
+    @classmethod
+    def _identity_map(cls):
+        u"""Returns the identity map of this class (each subclass has its own).
+
+        Returns:
+            (IdentityMap | None): The identity map. None if it is not enabled
+            (see ``_identity_map_enabled``).
+        """
+
+        if not cls._identity_map_enabled:
+            return None
+
+        # Looks only in this class, not in the superclasses.
+        identity_map = cls.__dict__.get('_identity_map_instance')
+        if identity_map is None:
+            identity_map = IdentityMap(miss_ttl=cls._identity_map_miss_ttl)
+            cls._identity_map_instance = identity_map
+
+        return identity_map
+
+    @classmethod
+    def _identity_key(cls, id):
+        u"""Creates the identity map key for the given ID.
+
+        Args:
+            id (int | str): The ID. ``find_by_id('2')`` and ``find_by_id(2)``
+                share the same key.
+
+        Returns:
+            tuple: ``(table, id)``.
+        """
+
+        try:
+            id = int(id)
+        except (TypeError, ValueError):
+            pass
+
+        return (cls._table_name, id)
+
+    def _remember_identity(self):
+        u"""Adds this object to the identity map of its class, if enabled.
+        """
+
+        identity_map = self._identity_map()
+        if (identity_map is not None and self.id > 0 and
+                self._loaded_columns is None):
+            identity_map.add(self._identity_key(self.id), self)
+
+    @classmethod
+    def page_after(cls, after=None, limit=50, order_by='id',
+                   descending=False, record_class=None, columns=None):
+        u"""Finds one page of records, using keyset (seek) pagination.
+
+        Instead of ``LIMIT``/``OFFSET``, which reads and discards every record
+        before the page, the next page starts right after the last record of
+        the previous one (``WHERE order_by > last value``). With an index on
+        ``order_by``, every page costs the same.
+
+        Records are ordered by ``order_by`` and then by ID, so records with the
+        same value are neither repeated nor skipped.
+
+        Args:
+            after (str | int, optional): The token returned with the previous
+                page. When ordering by ID, the last ID seen is also accepted.
+                Defaults to None (first page).
+            limit (int, optional): The number of records per page. Defaults to
+                50.
+            order_by (str, optional): The column the records are ordered by. It
+                should be indexed. Defaults to ``'id'``.
+            descending (bool, optional): Orders from the highest to the lowest
+                value. Defaults to False.
+            record_class (type, optional): See ``find_by_sql()``. Defaults to
+                None.
+            columns (list[str], optional): See ``find_all()``. ``order_by`` is
+                always loaded. Defaults to None (all columns).
+
+        Returns:
+            tuple: ``(object_list, token)``. ``token`` is the ``after``
+            argument for the next page. None when there are no more records.
+
+        Raises:
+            ValueError: If ``limit`` is less than 1, ``order_by`` is not in
+                ``_db_columns`` or the token was created with other ordering.
+
+        Warning:
+            Records with NULL in ``order_by`` are never returned.
+
+        Example:
+            How to call this method::
+
+                bikes, token = Bicycle.page_after(limit=20, order_by='price')
+                while token:
+                    bikes, token = Bicycle.page_after(token, limit=20,
+                                                      order_by='price')
+
+        References:
+            `Pagination done the Postgres way`_
+
+            `8.2.1.22 Row Constructor Expression Optimization`_
+
+        .. _Pagination done the Postgres way:
+           https://use-the-index-luke.com/no-offset
+        .. _8.2.1.22 Row Constructor Expression Optimization:
+           https://dev.mysql.com/doc/refman/8.0/en/row-constructor-optimization.html
+        """
+
+        if limit < 1:
+            message = "The page limit must be at least 1: {limit}.".format(
+                limit=limit)
+            shared.print_error_message(message)
+            raise ValueError(message)
+
+        if order_by not in cls._db_columns:
+            message = "{table} has no column: {column}.".format(
+                table=cls._table_name, column=order_by)
+            shared.print_error_message(message)
+            raise ValueError(message)
+
+        if columns is not None and order_by not in columns:
+            columns = list(columns) + [order_by]
+
+        operator_ = "<" if descending else ">"
+        direction = " DESC" if descending else ""
+
+        sql = "SELECT " + cls._select_list(columns, record_class) + " "
+        sql += "FROM " + cls._table_name + " "
+        values = ()
+
+        if after is not None:
+            last_value, last_id = cls._decode_page_token(after, order_by,
+                                                         descending)
+            if order_by == 'id':
+                sql += "WHERE id " + operator_ + " %s "
+                values = (last_id, )
+            else:
+                # The OR form (instead of a row constructor) lets older
+                # servers use the index on order_by.
+                sql += "WHERE (" + order_by + " " + operator_ + " %s OR ("
+                sql += order_by + " = %s AND id " + operator_ + " %s)) "
+                values = (last_value, last_value, last_id)
+        elif order_by != 'id':
+            sql += "WHERE " + order_by + " IS NOT NULL "
+
+        sql += "ORDER BY " + order_by + direction
+        if order_by != 'id':
+            sql += ", id" + direction
+        # One more record tells if there is a next page.
+        sql += " LIMIT " + str(int(limit) + 1)
+
+        result = cls._database.select(sql, values=values or None,
+                                      prepared=cls._prepared_statements)
+        if not result or not result[1]:
+            return ([], None)
+
+        column_names, rows = result
+        factory = record_class if record_class is not None else cls
+        object_list = factory._hydrate(column_names, rows[:limit])
+
+        token = None
+        if len(rows) > limit:
+            last = object_list[-1]
+            token = cls._encode_page_token(getattr(last, order_by), last.id,
+                                           order_by, descending)
+
+        return (object_list, token)
+
+    @staticmethod
+    def _encode_page_token(last_value, last_id, order_by, descending):
+        u"""Creates the continuation token of ``page_after()``.
+
+        Args:
+            last_value (obj): The ``order_by`` value of the last record.
+            last_id (int): The ID of the last record.
+            order_by (str): The column the records are ordered by.
+            descending (bool): The direction of the ordering.
+
+        Returns:
+            str: An opaque, URL-safe string.
+        """
+
+        # Decimal and dates become strings, which MySQL compares correctly.
+        data = json.dumps([order_by, descending, last_value, last_id],
+                          default=str, separators=(',', ':'))
+        return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def _decode_page_token(token, order_by, descending):
+        u"""Reads the continuation token of ``page_after()``.
+
+        Args:
+            token (str | int): The token, or the last ID seen when ordering by
+                ID.
+            order_by (str): The column the records are ordered by.
+            descending (bool): The direction of the ordering.
+
+        Returns:
+            tuple: ``(last_value, last_id)``.
+
+        Raises:
+            ValueError: If the token is invalid or was created with other
+                ordering.
+        """
+
+        if isinstance(token, numbers.Integral) and order_by == 'id':
+            return (token, token)
+
+        try:
+            data = json.loads(base64.urlsafe_b64decode(
+                str(token)).decode('utf-8'))
+            token_order_by, token_descending, last_value, last_id = data
+        except (TypeError, ValueError):
+            token_order_by = None
+
+        if token_order_by != order_by or token_descending != descending:
+            message = "Invalid page token for ORDER BY {column}{direction}.".format(
+                column=order_by, direction=" DESC" if descending else "")
+            shared.print_error_message(message)
+            raise ValueError(message)
+
+        return (last_value, last_id)
+
+    @classmethod
+    def find_in_batches(cls, batch_size=1000, record_class=None,
+                        columns=None):
+        u"""Finds all records in the given database table, a batch at a time.
+
+        Unlike ``find_all()``, the records are streamed from the server, so the
+        memory used stays the same however big the table is.
+
+        Args:
+            batch_size (int, optional): How many objects each batch has.
+                Defaults to 1000.
+            record_class (type, optional): See ``find_by_sql()``. Defaults to
+                None.
+            columns (list[str], optional): See ``find_all()``. Defaults to None
+                (all columns).
+
+        Yields:
+            list[obj]: The next list of objects.
+
+        Warning:
+            The connection is busy until the iteration finishes. Saving or
+            deleting objects inside the loop will fail; collect the changes and
+            apply them after the loop.
+
+        Example:
+            How to call this method::
+
+                for bikes in Bicycle.find_in_batches(batch_size=500):
+                    print(len(bikes))
+        """
+
+        factory = record_class if record_class is not None else cls
+
+        sql = "SELECT " + cls._select_list(columns, record_class) + " "
+        sql += "FROM " + cls._table_name
+        for column_names, rows in cls._database.select_iter(
+                sql, batch_size=batch_size):
+            yield factory._hydrate(column_names, rows)
+
+    @classmethod
+    def find_each(cls, batch_size=1000, record_class=None, columns=None):
+        u"""Finds all records in the given database table, one object at a
+        time.
+
+        The records are streamed from the server in batches (see
+        ``find_in_batches()``). The first objects are available before the
+        whole result set arrives.
+
+        Args:
+            batch_size (int, optional): How many records are fetched from the
+                server at a time. Defaults to 1000.
+            record_class (type, optional): See ``find_by_sql()``. Defaults to
+                None.
+            columns (list[str], optional): See ``find_all()``. Defaults to None
+                (all columns).
+
+        Yields:
+            obj: The next object.
+
+        Example:
+            How to call this method::
+
+                for bike in Bicycle.find_each():
+                    print(bike.name())
+        """
+
+        for object_list in cls.find_in_batches(batch_size=batch_size,
+                                               record_class=record_class,
+                                               columns=columns):
+            for obj in object_list:
+                yield obj
+
+    @classmethod
+    def _instantiate(cls, record):
+        u"""Creates an instance of the class setting the properties with
+        the values of the object passed as argument.
+
+        Args:
+            record (dict): A dictionary representing a record (row) in the
+                result set.
+
+        Returns:
+            obj: An instance of the subclass.
+
+        References:
+            `Protected method in python [duplicate]`_
+
+            `How to know if an object has an attribute in Python`_
+
+            `Object does not support item assignment error`_
+
+        .. _Protected method in python [duplicate]:
+           https://stackoverflow.com/a/11483397
+        .. _How to know if an object has an attribute in Python:
+           https://stackoverflow.com/a/610893
+        .. _Object does not support item assignment error:
+           https://stackoverflow.com/a/8542369
+        """
+
+        # Creates an instance of the subclass.
+        obj = cls()
+
+        # Loops through the dictionary.
+        for key, value in record.items():
+
+            # Checks if the instance has the same attribute as the dictionary
+            # key.
+            if hasattr(obj, key):
+
+                # Sets the object attribute with the value from the key.
+                setattr(obj, key, value)
+
+        obj._snapshot()
+
+        return obj
+
+    @classmethod
+    def _hydrate(cls, column_names, rows):
+        u"""Creates instances of the class from the records of a result set.
+
+        It does the same as ``_instantiate()`` for each record, much faster:
+        ``__init__()`` is not called and the columns are matched to the
+        attributes once per result set (see ``_hydration_plan()``), not once
+        per record.
+
+        Args:
+            column_names (tuple[str]): The column names of the result set.
+            rows (list[tuple]): The records, as returned by
+                ``ConnectionDB.select()``.
+
+        Returns:
+            list[obj]: The instances of the subclass.
+
+        References:
+            `object.__new__`_
+
+        .. _object.__new__:
+           https://docs.python.org/2.7/reference/datamodel.html#object.__new__
+        """
+
+        attributes, getter, defaults, mutable = cls._hydration_plan(
+            tuple(column_names))
+
+        new = cls.__new__
+        object_list = []
+        for row in rows:
+            values = getter(row)
+
+            state = defaults.copy()
+            for key in mutable:
+                state[key] = copy.copy(state[key])
+            state.update(zip(attributes, values))
+
+            # The loaded values, to find the changed columns later. The tuple
+            # is shared, not copied.
+            state['_original'] = (attributes, values)
+
+            obj = new(cls)
+            obj.__dict__ = state
+            object_list.append(obj)
+
+        return object_list
+
+    @classmethod
+    def _hydration_plan(cls, column_names):
+        u"""Matches the columns of a result set to the attributes of the class.
+
+        An instance created by ``__init__()`` (without arguments) is the
+        prototype. Its attributes are the defaults of the hydrated instances
+        and only the columns it has are copied (like ``_instantiate()``
+        does). The plan is computed once per class and list of columns.
+
+        When some of the ``_db_columns`` are not in the result set, they are
+        left out of the instances and ``_loaded_columns`` lists the ones that
+        are.
+
+        Args:
+            column_names (tuple[str]): The column names of the result set.
+
+        Returns:
+            tuple: ``(attributes, getter, defaults, mutable)``. ``getter``
+            picks, from a record, the values of ``attributes`` (in the same
+            order). ``mutable`` lists the defaults that must be copied for
+            each instance (lists, for example).
+
+        References:
+            `operator.itemgetter`_
+
+        .. _operator.itemgetter:
+           https://docs.python.org/2.7/library/operator.html#operator.itemgetter
+        """
+
+        # Looks only in this class, not in the superclasses.
+        plans = cls.__dict__.get('_hydration_plans')
+        if plans is None:
+            plans = {}
+            cls._hydration_plans = plans
+
+        plan = plans.get(column_names)
+        if plan is not None:
+            return plan
+
+        prototype = cls()
+
+        # When a column name repeats, the last one wins (like a dictionary).
+        positions = {}
+        for position, column in enumerate(column_names):
+            if hasattr(prototype, column):
+                positions[str(column)] = position
+
+        attributes = tuple(sorted(positions, key=positions.get))
+        indexes = [positions[attribute] for attribute in attributes]
+
+        if indexes == list(range(len(column_names))):
+            # Every column is used, in order (SELECT *, usually).
+            getter = tuple
+        elif not indexes:
+            getter = lambda row: ()
+        elif len(indexes) == 1:
+            # itemgetter() with one index does not return a tuple.
+            index = indexes[0]
+            getter = lambda row: (row[index], )
+        else:
+            getter = operator.itemgetter(*indexes)
+
+        defaults = dict((key, value)
+                        for key, value in vars(prototype).items()
+                        if key not in positions)
+
+        loaded = [column for column in cls._db_columns if column in positions]
+        if len(loaded) < len(cls._db_columns):
+            for column in cls._db_columns:
+                defaults.pop(column, None)
+            defaults['_loaded_columns'] = frozenset(loaded)
+        mutable = tuple(key for key, value in defaults.items()
+                        if isinstance(value, (list, dict, set)))
+
+        plan = (attributes, getter, defaults, mutable)
+        plans[column_names] = plan
+
+        return plan
+
+    def __getattr__(self, name):
+        u"""Explains why a column cannot be read. Only called when the
+        attribute is not found.
+
+        Args:
+            name (str): The attribute name.
+
+        Raises:
+            AttributeError: Always.
+        """
+
+        if (name in self._db_columns and
+                self.__dict__.get('_loaded_columns') is not None):
+            raise AttributeError(
+                "{cls}.{name} was not loaded. Add it to the columns argument "
+                "of the finder.".format(cls=type(self).__name__, name=name))
+
+        raise AttributeError(
+            "'{cls}' object has no attribute '{name}'".format(
+                cls=type(self).__name__, name=name))
+
+    @abstractmethod
+    def _validate(self):
+        u"""Every class that extends this one (DatabaseObject) must implement
+        this method.
+
+        Returns:
+            list[str]: The errors string list.
+
+        References:
+            `Is it possible to make abstract classes in Python?`_
+
+            `Python RegEx: re.match(), re.search(), re.findall() with Example`_
+
+            `Regex match any single character (one character only)`_
+
+        .. _Is it possible to make abstract classes in Python?:
+           https://stackoverflow.com/a/13646263
+        .. _Python RegEx\: re.match(), re.search(), re.findall() with Example:
+           https://www.guru99.com/python-regular-expressions-complete-tutorial.html
+        .. _Regex match any single character (one character only):
+           https://stackoverflow.com/a/47545451
+        """
+
+        pass
+
+    @classmethod
+    def _validate_value(cls, column, value, id=0):
+        u"""Validates the value of one column. Subclasses override it and use it
+        inside ``_validate()``, so the same rules apply to the objects and to
+        ``update_all()`` and ``patch_by_id()``.
+
+        Args:
+            column (str): The column name.
+            value (obj): The value to be validated.
+            id (int, optional): The ID of the record that will receive the
+                value (for uniqueness checks). Defaults to 0 (none).
+
+        Returns:
+            list[str]: The errors string list (empty if the value is valid).
+        """
+
+        return []
+
+    @classmethod
+    def validate_values(cls, values, id=0):
+        u"""Validates the given column values with ``_validate_value()``.
+
+        Args:
+            values (dict): Column names and values.
+            id (int, optional): See ``_validate_value()``. Defaults to 0.
+
+        Returns:
+            list[str]: The errors string list (empty if all values are valid).
+        """
+
+        errors = []
+        for column in cls._db_columns:
+            if column in values:
+                errors += cls._validate_value(column, values[column], id)
+
+        return errors
+
+    def _create(self):
+        u"""Creates a record in the database with the properties' values of the
+        current instance in memory.
+
+        Returns:
+            (list[dict] | list[] | bool): The result of the **query()** method
+            executed inside this method.
+
+        References:
+            `How to Convert a List to String in Python`_
+
+            `Last Key in Python Dictionary`_
+
+            `Python add item to the tuple`_
+
+            `Prepared Statements`_
+
+            `How to check if a list is empty in python?`_
+
+        .. _How to Convert a List to String in Python:
+           https://www.simplilearn.com/tutorials/python-tutorial/list-to-string-in-python#how_to_convert_a_list_to_string_in_python
+        .. _Last Key in Python Dictionary:
+           https://stackoverflow.com/a/16125237
+        .. _Python add item to the tuple:
+           https://stackoverflow.com/a/16730584
+        .. _Prepared Statements:
+           https://www.php.net/manual/en/mysqli.quickstart.prepared-statements.php
+        .. _How to check if a list is empty in python?:
+           https://flexiple.com/check-if-list-is-empty-python/
+        """
+
+        self._before_create()
+
+        self._validate()
+        if self.errors:
+            return False
+
+        attributes = self._sanitized_attributes()
+
+        # Prepared statement, stage 1: prepare
+        # ----------------------------------------------------------------------
+        temporary_list = []
+        place_holder = '' # %s
+        sql = "INSERT INTO " + self._table_name + " ("
+
+        # Loops through the dictionary:
+        for key in attributes:
+            place_holder += '%s'
+            sql += key
+            temporary_list.append(attributes[key])
+
+            # If it is the last key in the dictionary:
+            if key == attributes.keys()[-1]:
+                break
+
+            place_holder += ", "
+            sql += ", "
+
+        sql += ") VALUES (" + place_holder + ")"
+
+        data = tuple(temporary_list)
+
+        # Prepared statement, stage 2: bind and execute happen inside query().
+        # ----------------------------------------------------------------------
+        result = self._database.query(
+            sql, values=data, prepared=self._prepared_statements)
+        if result:
+            self.id = self._database.insert_id
+            self._invalidate_query_cache()
+            self._snapshot()
+
+        return result
+
+    def _update(self):
+        u"""Updates the database with the properties' values of the current
+        instance in memory.
+
+        Returns:
+            bool: The result of the query() method executed inside this
+            method. True if the update is successful. False otherwise.
+
+        References:
+            `How to Convert a List to String in Python`_
+
+        .. _How to Convert a List to String in Python:
+           https://www.simplilearn.com/tutorials/python-tutorial/list-to-string-in-python#how_to_convert_a_list_to_string_in_python
+        """
+
+        # Nothing changed since the object was loaded (or saved).
+        changed = self.changed_columns()
+        if not changed:
+            self.errors = []
+            return True
+
+        if self._loaded_columns is None:
+            self._validate()
+        else:
+            self._validate_partial()
+        if self.errors:
+            return False
+
+        attributes = self._sanitized_attributes()
+        key_list = []
+        value_list = []
+
+        # Only the changed columns are written.
+        for key in changed:
+            key_list.append("{key}=%s".format(key=key))
+            value_list.append(attributes[key])
+
+        sql = "UPDATE " + self._table_name + " SET "
+        sql += ", ".join(key_list)
+        sql += " WHERE id=%s "
+        sql += "LIMIT 1"
+
+        # Appends the ID at the end of the value_list.
+        value_list.append(self.id)
+        data = tuple(value_list)
+
+        result = self._database.query(
+            sql, values=data, prepared=self._prepared_statements)
+        if result:
+            self._invalidate_query_cache()
+            self._snapshot()
+
+        return result
+
+    def changes(self):
+        u"""Lists the columns changed since the object was loaded from (or last
+        saved to) the database.
+
+        Returns:
+            dict: ``{column: (old value, new value)}``, excluding ID. For an
+            object that did not come from the database, every column is
+            changed and the old values are None.
+
+        Example:
+            How to call this method::
+
+                bike = Bicycle.find_by_id(2)
+                bike.merge_attributes(price=150)
+                print(bike.changes())  # {'price': (100, 150)}
+        """
+
+        state = vars(self)
+        original = {}
+        if self._original is not None:
+            original = dict(zip(*self._original))
+
+        changes = {}
+        for column in self._db_columns:
+            if column == 'id' or column not in state:
+                continue
+            if column not in original or state[column] != original[column]:
+                changes[column] = (original.get(column), state[column])
+
+        return changes
+
+    def changed_columns(self):
+        u"""Lists the names of the changed columns (see ``changes()``).
+
+        Returns:
+            list[str]: The column names, in the ``_db_columns`` order.
+        """
+
+        changes = self.changes()
+        return [column for column in self._db_columns if column in changes]
+
+    def _snapshot(self):
+        u"""Remembers the current column values as the ones in the database.
+        Called after the object is loaded or saved.
+        """
+
+        state = vars(self)
+        columns = tuple(column for column in self._db_columns
+                        if column in state)
+        self._original = (columns, tuple(state[column] for column in columns))
+
+    def _validate_partial(self):
+        u"""Validates an object that was found with a column list.
+
+        The columns that were not loaded cannot be saved. Assigning one of them
+        is an error. The other ones are read from the database, only to run
+        ``_validate()`` on a copy of the object.
+
+        Returns:
+            list[str]: The errors string list (also stored in ``errors``).
+        """
+
+        state = vars(self)
+        missing = [column for column in self._db_columns
+                   if column not in self._loaded_columns]
+
+        assigned = [column for column in missing if column in state]
+        if assigned:
+            self.errors = [
+                "{column} was not loaded and cannot be saved.".format(
+                    column=column) for column in assigned]
+            return self.errors
+
+        sql = "SELECT " + ", ".join(missing) + " "
+        sql += "FROM " + self._table_name + " "
+        sql += "WHERE id=%s"
+        result = self._database.select(sql, (self.id, ),
+                                       prepared=self._prepared_statements)
+        if not result or not result[1]:
+            self.errors = ["The record does not exist anymore."]
+            return self.errors
+
+        complete = copy.copy(self)
+        vars(complete).update(zip(missing, result[1][0]))
+        del complete._loaded_columns
+
+        self.errors = complete._validate()
+        return self.errors
+
+    def save(self):
+        u"""Executes the _update() or the _create() instance methods based on the
+        presence of an ID.
+
+        Returns:
+            (list[dict] | list[] | bool): Returns the same as the instance
+            method that was executed.
+        """
+
+        if self.id > 0:
+            result = self._update()
+        else:
+            result = self._create()
+
+        if result:
+            self._remember_identity()
+
+        return result
+
+    def _before_create(self):
+        u"""Hook executed before a new record is validated and inserted, both
+        by ``_create()`` and by ``save_many()``.
+
+        Subclasses override it to prepare values that are not set directly by
+        the user (a hashed password, for example).
+        """
+        pass
+
+    def _before_upsert(self, existing):
+        u"""Hook executed by ``upsert()`` before the object is validated.
+
+        Args:
+            existing (dict | None): The ``id`` and the
+                ``_upsert_existing_columns`` of the record that already exists
+                (it will be updated). None for a new record.
+        """
+
+        if existing is None:
+            self._before_create()
+
+    @classmethod
+    def validate_many(cls, objects):
+        u"""Validates a batch of objects.
+
+        Every object gets its own ``errors`` list, the same way it happens when
+        ``save()`` is called on each one of them.
+
+        Args:
+            objects (list[obj]): The objects to be validated.
+
+        Returns:
+            bool: True if all the objects are valid. False otherwise.
+        """
+
+        is_valid = True
+        for obj in objects:
+            if obj._validate():
+                is_valid = False
+
+        return is_valid
+
+    @classmethod
+    def save_many(cls, objects):
+        u"""Creates many records with multi-row INSERT statements.
+
+        The whole batch is validated first. If any object has errors, nothing
+        is inserted and the errors are available in each object's ``errors``
+        list.
+
+        The rows are grouped into statements that stay under the server's
+        ``max_allowed_packet`` (see ``_bulk_packet_ratio``) and
+        ``_bulk_max_rows``. Each statement is committed once, instead of once
+        per row.
+
+        Args:
+            objects (list[obj]): New (not yet saved) instances of this class.
+
+        Returns:
+            bool: True if all the records were created. False otherwise.
+
+        Warning:
+            The generated IDs are assigned from the first ID of each statement
+            (``LAST_INSERT_ID()``) and ``auto_increment_increment``. That
+            requires ``innodb_autoinc_lock_mode`` 0 or 1 (see reference), or no
+            concurrent inserts into the same table. MySQL 8 defaults to 2.
+
+        Example:
+            How to call this method::
+
+                bikes = [Bicycle(**kwargs) for kwargs in rows_from_pipeline]
+
+                if Bicycle.save_many(bikes):
+                    print("{count} bicycles created.".format(count=len(bikes)))
+                else:
+                    for bike in bikes:
+                        print(shared.display_errors(bike.errors))
+
+        References:
+            `13.2.6 INSERT Statement`_
+
+            `B.3.2.8 Packet Too Large`_
+
+            `15.6.1.6 AUTO_INCREMENT Handling in InnoDB`_
+
+        .. _13.2.6 INSERT Statement:
+           https://dev.mysql.com/doc/refman/8.0/en/insert.html
+        .. _B.3.2.8 Packet Too Large:
+           https://dev.mysql.com/doc/refman/8.0/en/packet-too-large.html
+        .. _15.6.1.6 AUTO_INCREMENT Handling in InnoDB:
+           https://dev.mysql.com/doc/refman/8.0/en/innodb-auto-increment-handling.html
+        """
+
+        if not objects:
+            return True
+
+        for obj in objects:
+            obj._before_create()
+
+        if not cls.validate_many(objects):
+            return False
+
+        columns = cls._insert_columns()
+        sql_start = "INSERT INTO " + cls._table_name + " ("
+        sql_start += ", ".join(columns) + ") VALUES "
+        place_holder = "(" + ", ".join(["%s"] * len(columns)) + ")"
+
+        max_packet = cls._database.server_variable('max_allowed_packet')
+        id_step = cls._database.server_variable('auto_increment_increment')
+        if max_packet is None or id_step is None:
+            return False
+        max_bytes = int(max_packet * cls._bulk_packet_ratio) - len(sql_start)
+
+        batch = []
+        batch_bytes = 0
+        for obj in objects:
+            row_bytes = cls._estimate_row_bytes(obj, columns)
+
+            # Sends the current batch before it gets too big.
+            if batch and (batch_bytes + row_bytes > max_bytes or
+                          len(batch) >= cls._bulk_max_rows):
+                if not cls._insert_batch(batch, columns, sql_start,
+                                         place_holder, id_step):
+                    return False
+                batch = []
+                batch_bytes = 0
+
+            batch.append(obj)
+            batch_bytes += row_bytes
+
+        return cls._insert_batch(batch, columns, sql_start, place_holder,
+                                 id_step)
+
+    @classmethod
+    def _insert_batch(cls, batch, columns, sql_start, place_holder, id_step):
+        u"""Executes one multi-row INSERT statement for ``save_many()`` and
+        assigns the generated IDs.
+
+        Args:
+            batch (list[obj]): The objects to be inserted.
+            columns (list[str]): The column names, in the statement order.
+            sql_start (str): The statement up to the ``VALUES`` keyword.
+            place_holder (str): The placeholders for one row.
+            id_step (int): The server's ``auto_increment_increment``.
+
+        Returns:
+            bool: The result of the **query()** method.
+        """
+
+        values = []
+        for obj in batch:
+            attributes = obj._sanitized_attributes()
+            for column in columns:
+                values.append(attributes[column])
+
+        sql = sql_start + ", ".join([place_holder] * len(batch))
+
+        result = cls._database.query(sql, values=tuple(values))
+        if result:
+            cls._invalidate_query_cache()
+
+            first_id = cls._database.insert_id
+            for index, obj in enumerate(batch):
+                obj.id = first_id + index * id_step
+                obj._snapshot()
+                obj._remember_identity()
+
+        return result
+
+    @classmethod
+    def _insert_columns(cls):
+        u"""Lists the columns written by an INSERT statement (all the columns in
+        ``_db_columns``, excluding ID).
+
+        Returns:
+            list[str]: The column names.
+        """
+
+        return [column for column in cls._db_columns if column != 'id']
+
+    @staticmethod
+    def _estimate_row_bytes(obj, columns):
+        u"""Estimates how many bytes a row takes inside an INSERT statement.
+
+        Args:
+            obj (obj): The object that will become the row.
+            columns (list[str]): The column names.
+
+        Returns:
+            int: The estimated size, in bytes.
+        """
+
+        # Parentheses and the separator between rows.
+        size = 4
+        for column in columns:
+            value = getattr(obj, column)
+
+            # Byte strings (str in Python 2) are already encoded.
+            if not isinstance(value, bytes):
+                value = u"{value}".format(value=value).encode('utf-8')
+
+            # Quotes, comma and space around each value.
+            size += len(value) + 4
+
+        return size
+
+    @classmethod
+    def upsert(cls, objects, conflict_keys=('id', )):
+        u"""Creates or updates many records with multi-row
+        ``INSERT ... ON DUPLICATE KEY UPDATE`` statements, inside one
+        transaction.
+
+        The records that already exist are found (and locked) first by their
+        conflict keys, so each object gets its ID and is validated as a new or
+        an existing record. Then the rows are written in batches, like in
+        ``save_many()``. The existing records are updated through their IDs,
+        so with conflict keys that are not unique only one of the matching
+        records is updated. They should be the columns of a primary key or
+        unique index, which also stops other sessions from inserting
+        duplicates in the meantime.
+
+        Every column is written, so the objects must carry the whole row (they
+        cannot be found with a column list). String keys are compared ignoring
+        case, like the default collation of the server.
+
+        Args:
+            objects (list[obj]): Instances of this class.
+            conflict_keys (tuple[str], optional): The columns that identify an
+                existing record. Defaults to ``('id', )``.
+
+        Returns:
+            (dict | bool): ``{'inserted': [...], 'updated': [...]}`` with the
+            objects. False if any object has errors (see each ``errors`` list)
+            or a statement fails (then nothing is written, and the IDs and
+            other values set by ``upsert()`` are restored).
+
+        Raises:
+            ValueError: If a conflict key is not in ``_db_columns``, an object
+                was found with a column list, two objects have the same
+                conflict keys or an object's ID does not match the existing
+                record.
+
+        Warning:
+            The IDs of the inserted records are assigned like in
+            ``save_many()`` (see its warning).
+
+        Example:
+            How to call this method::
+
+                result = Admin.upsert(admins, conflict_keys=('username', ))
+                if result:
+                    print("{count} admins created.".format(
+                        count=len(result['inserted'])))
+
+        References:
+            `13.2.6.2 INSERT ... ON DUPLICATE KEY UPDATE Statement`_
+
+            `15.7.2.4 Locking Reads`_
+
+        .. _13.2.6.2 INSERT ... ON DUPLICATE KEY UPDATE Statement:
+           https://dev.mysql.com/doc/refman/8.0/en/insert-on-duplicate.html
+        .. _15.7.2.4 Locking Reads:
+           https://dev.mysql.com/doc/refman/8.0/en/innodb-locking-reads.html
+        """
+
+        conflict_keys = tuple(conflict_keys)
+        unknown = [column for column in conflict_keys
+                   if column not in cls._db_columns]
+        if not conflict_keys or unknown:
+            message = "{table} has no unique key: {columns}.".format(
+                table=cls._table_name, columns=", ".join(unknown))
+            shared.print_error_message(message)
+            raise ValueError(message)
+
+        if any(obj._loaded_columns is not None for obj in objects):
+            message = "Objects found with a column list cannot be upserted."
+            shared.print_error_message(message)
+            raise ValueError(message)
+
+        keys = [cls._conflict_key(obj, conflict_keys) for obj in objects]
+        known_keys = [key for key in keys if key is not None]
+        if len(set(known_keys)) != len(known_keys):
+            message = "Two or more objects have the same {columns}.".format(
+                columns=", ".join(conflict_keys))
+            shared.print_error_message(message)
+            raise ValueError(message)
+
+        inserted = []
+        updated = []
+        if not objects:
+            return {'inserted': inserted, 'updated': updated}
+
+        # The IDs and the values set by _before_upsert() are only kept if the
+        # rows are written.
+        states = [dict(vars(obj)) for obj in objects]
+        written = False
+        try:
+            with cls.transaction():
+                existing = cls._find_conflicts(conflict_keys,
+                                               list(set(known_keys)))
+
+                for obj, key in zip(objects, keys):
+                    record = existing.get(key)
+                    id = record['id'] if record else None
+                    if id is None:
+                        inserted.append(obj)
+                    elif obj.id and obj.id != id:
+                        message = "{table} ID {id} does not match the "
+                        message += "existing record {existing}."
+                        message = message.format(
+                            table=cls._table_name, id=obj.id, existing=id)
+                        shared.print_error_message(message)
+                        raise ValueError(message)
+                    else:
+                        obj.id = id
+                        updated.append(obj)
+                    obj._before_upsert(record)
+
+                if not cls.validate_many(objects):
+                    return False
+
+                cls._upsert_rows(objects, conflict_keys)
+
+            written = True
+
+        except QueryError:
+            if cls._database.in_transaction:
+                raise
+            return False
+
+        finally:
+            if not written:
+                for obj, state in zip(objects, states):
+                    # The validation errors are kept.
+                    errors = vars(obj).get('errors')
+                    obj.__dict__.clear()
+                    obj.__dict__.update(state)
+                    if errors is not None:
+                        obj.errors = errors
+
+        cls._invalidate_query_cache()
+        for obj in objects:
+            obj._snapshot()
+            obj._remember_identity()
+
+        return {'inserted': inserted, 'updated': updated}
+
+    @staticmethod
+    def _conflict_key(obj, conflict_keys):
+        u"""Creates the key that identifies the record of an object in
+        ``upsert()``.
+
+        Args:
+            obj (obj): The object.
+            conflict_keys (tuple[str]): The columns.
+
+        Returns:
+            (tuple | None): The values (strings in lowercase). None if the
+            object has no ID and the ID is one of the columns (a new record).
+        """
+
+        values = [getattr(obj, column) for column in conflict_keys]
+        if 'id' in conflict_keys and not obj.id:
+            return None
+
+        # Strings (str and unicode) in lowercase.
+        return tuple(value.lower() if hasattr(value, 'lower') else value
+                     for value in values)
+
+    @classmethod
+    def _find_conflicts(cls, conflict_keys, keys):
+        u"""Finds and locks (``SELECT ... FOR UPDATE``) the existing records
+        of ``upsert()``. Must be called inside a transaction.
+
+        Args:
+            conflict_keys (tuple[str]): The columns.
+            keys (list[tuple]): The keys (see ``_conflict_key()``).
+
+        Returns:
+            dict: The ``id`` and the ``_upsert_existing_columns`` of each
+            existing record, by key.
+        """
+
+        columns = ['id'] + [column for column in cls._upsert_existing_columns
+                            if column != 'id']
+        existing = {}
+        row_place_holder = "(" + ", ".join(["%s"] * len(conflict_keys)) + ")"
+        size = cls._bulk_max_rows
+        for start in range(0, len(keys), size):
+            chunk = keys[start:start + size]
+
+            sql = "SELECT " + ", ".join(columns + list(conflict_keys)) + " "
+            sql += "FROM " + cls._table_name + " "
+            if len(conflict_keys) == 1:
+                sql += "WHERE " + conflict_keys[0] + " IN ("
+                sql += ", ".join(["%s"] * len(chunk)) + ") "
+            else:
+                sql += "WHERE (" + ", ".join(conflict_keys) + ") IN ("
+                sql += ", ".join([row_place_holder] * len(chunk)) + ") "
+            sql += "FOR UPDATE"
+
+            values = tuple(value for key in chunk for value in key)
+            result = cls._database.select(sql, values=values)
+            for row in (result[1] if result else []):
+                key = tuple(value.lower() if hasattr(value, 'lower') else value
+                            for value in row[len(columns):])
+                existing[key] = dict(zip(columns, row))
+
+        return existing
+
+    @classmethod
+    def _upsert_rows(cls, objects, conflict_keys):
+        u"""Executes the ``INSERT ... ON DUPLICATE KEY UPDATE`` statements of
+        ``upsert()`` and assigns the generated IDs. Must be called inside a
+        transaction.
+
+        Args:
+            objects (list[obj]): The validated objects.
+            conflict_keys (tuple[str]): The columns (they are not updated).
+        """
+
+        columns = cls._insert_columns()
+        update_columns = [column for column in columns
+                          if column not in conflict_keys] or ['id']
+
+        sql_start = "INSERT INTO " + cls._table_name + " (id, "
+        sql_start += ", ".join(columns) + ") VALUES "
+        place_holder = "(" + ", ".join(["%s"] * (len(columns) + 1)) + ")"
+        sql_end = " ON DUPLICATE KEY UPDATE " + ", ".join(
+            "{column}=VALUES({column})".format(column=column)
+            for column in update_columns)
+
+        max_bytes = int(cls._database.server_variable('max_allowed_packet') *
+                        cls._bulk_packet_ratio)
+        max_bytes -= len(sql_start) + len(sql_end)
+        id_step = cls._database.server_variable('auto_increment_increment')
+
+        batches = [[]]
+        batch_bytes = 0
+        for obj in objects:
+            row_bytes = cls._estimate_row_bytes(obj, columns) + 12
+            if batches[-1] and (batch_bytes + row_bytes > max_bytes or
+                                len(batches[-1]) >= cls._bulk_max_rows):
+                batches.append([])
+                batch_bytes = 0
+            batches[-1].append(obj)
+            batch_bytes += row_bytes
+
+        for batch in batches:
+            values = []
+            for obj in batch:
+                # NULL makes the server generate the ID.
+                values.append(obj.id or None)
+                attributes = obj._sanitized_attributes()
+                for column in columns:
+                    values.append(attributes[column])
+
+            sql = sql_start + ", ".join([place_holder] * len(batch)) + sql_end
+
+            # Inside a transaction, a failure raises QueryError.
+            cls._database.query(sql, values=tuple(values))
+
+            new_objects = [obj for obj in batch if not obj.id]
+            first_id = cls._database.insert_id
+            for index, obj in enumerate(new_objects):
+                obj.id = first_id + index * id_step
+
+    def merge_attributes(self, **kwargs):
+        u"""Merges the attributes from the given dictionary into the object in
+        memory created from the find_by_id() method.
+
+        Args:
+            **kwargs: The dictionary containing the new values to be merged and later updated.
+
+        Example:
+            How to call this method::
+
+                    bike = Bicycle.find_by_id(26)
+
+                    if bike:
+                        kwargs = {
+                            "id": bike.id,
+                            "brand": bike.brand,
+                            "model": "Bob's Overdrive", # bike.model
+                            "year": bike.year,
+                            "category": bike.category,
+                            "gender": bike.gender,
+                            "color": bike.color,
+                            "weight_kg": bike.weight_kg,
+                            "condition": bike.condition,
+                            "price": bike.price
+                        }
+
+                        bike.merge_attributes(**kwargs)
+                        result = bike.update()
+                        if result:
+                            print("The bicycle was updated.")
+                        else:
+                            print("There was an error in the update process.")
+                    else:
+                        print("The ID was not found.")
+        """
+
+        for key, value in kwargs.items():
+            if hasattr(self, key) and not shared.is_none(value):
+                setattr(self, key, value)
+
+    def attributes(self):
+        u"""Creates a dictionary that have, as properties, the database columns
+        (excluding ID) and the corresponding values from the instance object in
+        memory.
+
+        Returns:
+            dict: Dictionary containing the names of the columns and the
             corresponding values from the instance object in memory.
 
         References:
@@ -418,8 +2004,14 @@ class DatabaseObject(object):
            https://stackoverflow.com/a/2425281
         """
 
+        # Objects found with a column list have only those columns.
+        columns = self._db_columns
+        if self._loaded_columns is not None:
+            columns = [column for column in columns
+                       if column in self._loaded_columns]
+
         attributes = {}
-        for column in self._db_columns:
+        for column in columns:
             if column == 'id':
                 continue
             attributes[column] = getattr(self, column)
@@ -480,8 +2072,333 @@ class DatabaseObject(object):
 
         data = (self.id, )
 
-        result = self._database.query(sql, values=data)
+        result = self._database.query(
+            sql, values=data, prepared=self._prepared_statements)
+        if result:
+            self._invalidate_query_cache()
+
+        identity_map = self._identity_map()
+        if result and identity_map is not None:
+            identity_map.evict(self._identity_key(self.id))
+
+        return result
+
+    @classmethod
+    def update_all(cls, where, **changes):
+        u"""Updates every record that matches the conditions with a single
+        ``UPDATE ... WHERE`` statement, without loading them.
+
+        The new values are validated column by column (see
+        ``validate_values()``). Rules that depend on the whole object are not
+        checked.
+
+        Args:
+            where (dict): Column names and values (see ``_where_clause()``).
+                An empty dictionary updates every record.
+            **changes: Column names and new values.
+
+        Returns:
+            (int | bool): The number of updated records (see
+            ``ConnectionDB.affected_rows``). False if a value is invalid (the
+            errors are shown) or the statement fails.
+
+        Raises:
+            ValueError: If there are no changes or a column is not in
+                ``_db_columns`` (ID cannot be changed).
+
+        Example:
+            How to call this method::
+
+                Bicycle.update_all({'category': 'BMX'}, price=99)
+        """
+
+        sql, values = cls._update_statement(changes, where or {})
+        errors = cls.validate_values(changes)
+        if errors:
+            shared.print_error_message(shared.display_errors(errors))
+            return False
+
+        if cls._database.query(sql, values=values) is False:
+            return False
+        total = cls._database.affected_rows
+
+        # The records that changed are not known.
+        cls._invalidate_query_cache()
+        identity_map = cls._identity_map()
+        if identity_map is not None:
+            identity_map.clear()
+
+        return total
+
+    @classmethod
+    def patch_by_id(cls, id, **changes):
+        u"""Updates some columns of a record without reading it first.
+
+        The new values are validated column by column (see
+        ``validate_values()``).
+
+        Args:
+            id (int): The ID of the record.
+            **changes: Column names and new values.
+
+        Returns:
+            bool: True if the statement was executed (even if there is no
+            record with the given ID). False if a value is invalid (the errors
+            are shown) or the statement fails.
+
+        Raises:
+            ValueError: If there are no changes or a column is not in
+                ``_db_columns`` (ID cannot be changed).
+
+        Example:
+            How to call this method::
+
+                Bicycle.patch_by_id(26, price=450, color='Red')
+        """
+
+        sql, values = cls._update_statement(changes, {'id': id})
+        errors = cls.validate_values(changes, id)
+        if errors:
+            shared.print_error_message(shared.display_errors(errors))
+            return False
+
+        result = cls._database.query(sql + " LIMIT 1", values=values,
+                                     prepared=cls._prepared_statements)
+        if result:
+            cls._invalidate_query_cache()
+
+            # The object in memory (if any) is out of date.
+            identity_map = cls._identity_map()
+            if identity_map is not None:
+                identity_map.evict(cls._identity_key(id))
 
         return result
 
+    @classmethod
+    def _update_statement(cls, changes, where):
+        u"""Creates the statement of ``update_all()`` and ``patch_by_id()``.
+
+        Args:
+            changes (dict): Column names and new values.
+            where (dict): The conditions (see ``_where_clause()``).
+
+        Returns:
+            tuple: ``(sql, values)``.
+
+        Raises:
+            ValueError: If there are no changes or a column is not in
+                ``_db_columns`` (ID cannot be changed).
+        """
+
+        unknown = [column for column in changes
+                   if column not in cls._db_columns or column == 'id']
+        if not changes or unknown:
+            message = "Invalid columns to update: {columns}.".format(
+                columns=", ".join(sorted(unknown)) or "(none)")
+            shared.print_error_message(message)
+            raise ValueError(message)
+
+        # Sorted, so the same changes always create the same statement.
+        columns = sorted(changes)
+        values = [cls._database.escape_string(changes[column])
+                  for column in columns]
+
+        sql = "UPDATE " + cls._table_name + " SET "
+        sql += ", ".join(column + "=%s" for column in columns)
+
+        if where:
+            where_sql, where_values = cls._where_clause(where)
+            sql += " WHERE " + where_sql
+            values.extend(where_values)
+
+        return (sql, tuple(values))
+
+    @classmethod
+    def delete_many(cls, ids):
+        u"""Deletes the records with the given IDs, with as few statements as
+        possible.
+
+        The IDs are deleted in chunks of ``_delete_chunk_size`` with
+        ``DELETE ... WHERE id IN (...)``, inside one transaction (one commit).
+        The deleted objects are removed from the identity map and the query
+        cache of the class is invalidated.
+
+        Args:
+            ids (list[int]): The IDs of the records to be deleted.
+
+        Returns:
+            (int | bool): The number of deleted records (see
+            ``ConnectionDB.affected_rows``). False if a statement fails (then
+            nothing is deleted).
+
+        Example:
+            How to call this method::
+
+                deleted = Bicycle.delete_many([3, 5, 8])
+                if deleted is not False:
+                    print("{count} bicycles deleted.".format(count=deleted))
+        """
+
+        ids = list(collections.OrderedDict.fromkeys(ids))
+        if not ids:
+            return 0
+
+        try:
+            with cls.transaction():
+                total = cls._delete_ids(ids)
+        except QueryError:
+            # The error was already shown. An outer transaction must be rolled
+            # back too.
+            if cls._database.in_transaction:
+                raise
+            return False
+
+        cls._forget_deleted(ids)
+        return total
+
+    @classmethod
+    def delete_where(cls, **conditions):
+        u"""Deletes the records that match all the given conditions.
+
+        The IDs of the matching records are read (and locked) first, then they
+        are deleted like in ``delete_many()``. That keeps each statement small
+        and tells exactly which objects must leave the identity map.
+
+        Args:
+            **conditions: Column names and values (see ``_where_clause()``).
+                At least one is required.
+
+        Returns:
+            (int | bool): The number of deleted records. False if a statement
+            fails (then nothing is deleted).
+
+        Raises:
+            ValueError: If there are no conditions or a column is not in
+                ``_db_columns``.
+
+        Example:
+            How to call this method::
+
+                Bicycle.delete_where(condition_id=1, year=[1998, 1999])
+        """
+
+        if not conditions:
+            message = "delete_where() requires at least one condition."
+            shared.print_error_message(message)
+            raise ValueError(message)
+
+        where, values = cls._where_clause(conditions)
+        sql = "SELECT id FROM " + cls._table_name + " "
+        sql += "WHERE " + where + " "
+        sql += "FOR UPDATE"
+
+        try:
+            with cls.transaction():
+                result = cls._database.select(sql, values=values or None)
+                ids = [row[0] for row in result[1]] if result else []
+                total = cls._delete_ids(ids)
+        except QueryError:
+            if cls._database.in_transaction:
+                raise
+            return False
+
+        cls._forget_deleted(ids)
+        return total
+
+    @classmethod
+    def _delete_ids(cls, ids):
+        u"""Executes the chunked DELETE statements of ``delete_many()``. Must be
+        called inside a transaction.
+
+        Args:
+            ids (list[int]): The IDs (without duplicates).
+
+        Returns:
+            int: The number of deleted records.
+        """
+
+        total = 0
+        size = cls._delete_chunk_size
+        for start in range(0, len(ids), size):
+            chunk = ids[start:start + size]
+
+            sql = "DELETE FROM " + cls._table_name + " "
+            sql += "WHERE id IN (" + ", ".join(["%s"] * len(chunk)) + ")"
+
+            # Inside a transaction, a failure raises QueryError.
+            cls._database.query(sql, values=tuple(chunk))
+            total += cls._database.affected_rows
+
+        return total
+
+    @classmethod
+    def _forget_deleted(cls, ids):
+        u"""Removes the deleted records from the identity map and the query
+        cache.
+
+        Args:
+            ids (list[int]): The IDs of the deleted records.
+        """
+
+        if not ids:
+            return
+
+        cls._invalidate_query_cache()
+
+        identity_map = cls._identity_map()
+        if identity_map is not None:
+            for id in ids:
+                identity_map.evict(cls._identity_key(id))
+
+    @classmethod
+    def _where_clause(cls, conditions):
+        u"""Creates a WHERE clause (without the keyword) from a dictionary of
+        conditions. All the conditions must match (AND).
+
+        Each value can be:
+
+        - None: ``column IS NULL``.
+        - A list, tuple or set: ``column IN (...)``. An empty one matches
+          nothing.
+        - Anything else: ``column = value``.
+
+        Args:
+            conditions (dict): Column names and values.
+
+        Returns:
+            tuple: ``(sql, values)``. ``values`` is a tuple.
+
+        Raises:
+            ValueError: If a column is not in ``_db_columns``.
+        """
+
+        unknown = [column for column in conditions
+                   if column not in cls._db_columns]
+        if unknown:
+            message = "{table} has no column(s): {columns}.".format(
+                table=cls._table_name, columns=", ".join(sorted(unknown)))
+            shared.print_error_message(message)
+            raise ValueError(message)
+
+        clauses = []
+        values = []
+        # Sorted, so the same conditions always create the same statement.
+        for column in sorted(conditions):
+            value = conditions[column]
+            if value is None:
+                clauses.append(column + " IS NULL")
+            elif isinstance(value, (list, tuple, set, frozenset)):
+                if not value:
+                    clauses.append("1 = 0")
+                    continue
+                value = list(value)
+                clauses.append(column + " IN (" +
+                               ", ".join(["%s"] * len(value)) + ")")
+                values.extend(value)
+            else:
+                clauses.append(column + "=%s")
+                values.append(value)
+
+        return (" AND ".join(clauses), tuple(values))
+
     # ----- END OF ACTIVE RECORD CODE -----
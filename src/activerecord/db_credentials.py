@@ -0,0 +1,4 @@
+DB_SERVER = 'localhost'
+DB_USER = 'username'
+DB_PASS = 'userpassword'
+DB_NAME = 'databasename'
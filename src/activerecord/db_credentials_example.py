@@ -9,9 +9,20 @@ These are the reasons to keep the credentials in a separate file:
 
 """
 
+DB_BACKEND = 'mysql'
+"""str: The database server: ``'mysql'`` or ``'sqlite'`` (a local file, see
+``DB_SQLITE_PATH``)."""
+
+DB_SQLITE_PATH = ':memory:'
+"""str: The SQLite database file, when ``DB_BACKEND`` is ``'sqlite'``.
+``':memory:'`` keeps the database in memory (use ``DB_POOL_SIZE = 0``)."""
+
 DB_SERVER = 'localhost'
 """str: The address of the database server."""
 
+DB_PORT = 3306
+"""int: The port of the database server."""
+
 DB_USER = 'username'
 """str: The username to access the database server."""
 
@@ -20,3 +31,44 @@ DB_PASS = 'userpassword'
 
 DB_NAME = 'databasename'
 """str: The database name."""
+
+DB_POOL_SIZE = 0
+"""int: The maximum number of pooled connections. Zero disables the pool and
+every query shares a single connection. The asynchronous finders
+(``afind_all()`` and so on) need the pool."""
+
+DB_POOL_CHECKOUT = 'call'
+"""str: When the pool is enabled, ``'call'`` takes a connection for each query
+and ``'thread'`` keeps one connection per thread until
+``ConnectionDB.release()`` is called."""
+
+DB_POOL_TIMEOUT = 30
+"""float: Seconds to wait for a free pooled connection."""
+
+DB_POOL_PING_INTERVAL = 60
+"""float: Pooled connections idle for longer than this (in seconds) are pinged
+before being used again."""
+
+DB_PREPARED_STATEMENTS = 64
+"""int: How many prepared statements each connection keeps open."""
+
+DB_WARM_UP = False
+"""bool: Imports the driver and opens a connection in a background thread as
+soon as the modules are imported, instead of waiting for the first query."""
+
+DB_SLOW_QUERY_LOG = None
+"""str: The JSON Lines file where the slow SELECT queries are written (with the
+output of ``EXPLAIN``). None disables the log."""
+
+DB_SLOW_QUERY_THRESHOLD = 0.5
+"""float: Queries that take this long (in seconds) or longer are written to
+``DB_SLOW_QUERY_LOG``."""
+
+DB_SCHEMA_VERSION = None
+"""str: The version of the database schema. Change it after altering the
+tables, so the schema cache (``DB_SCHEMA_CACHE``) is read from the server
+again."""
+
+DB_SCHEMA_CACHE = None
+"""str: The JSON file where the schema of the tables is cached. None uses a
+file in the temporary directory."""
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+__all__ = ['IdentityMap']
+__copyright__ = u"Copyright (C) 2022 Leonardo Pinheiro"
+__author__ = u"Leonardo Pinheiro <info@leonardopinheiro.net>"
+__link__ = u"https://www.leonardopinheiro.net"
+
+import threading
+import time
+import weakref
+
+
+class IdentityMap(object):
+    u"""Keeps (weak) references to the objects already loaded from the
+    database, keyed by ``(table, id)``.
+
+    An object stays in the map only while something else references it, so the
+    map never keeps objects alive by itself.
+
+    IDs that were not found are also remembered (negative cache) for
+    ``miss_ttl`` seconds.
+
+    Args:
+        miss_ttl (float, optional): How many seconds a missing ID is
+            remembered. Zero disables the negative cache. Defaults to 5.
+
+    References:
+        `Identity Map`_
+
+        `weakref - Weak references`_
+
+    .. _Identity Map:
+       https://martinfowler.com/eaaCatalog/identityMap.html
+    .. _weakref - Weak references:
+       https://docs.python.org/2.7/library/weakref.html#weakref.WeakValueDictionary
+    """
+
+    def __init__(self, miss_ttl=5.0):
+        self.miss_ttl = miss_ttl
+        self._objects = weakref.WeakValueDictionary()
+        self._misses = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        u"""Returns the live object for the given key.
+
+        Args:
+            key (tuple): ``(table, id)``.
+
+        Returns:
+            (obj | None): The object. None if it is not in the map.
+        """
+
+        with self._lock:
+            return self._objects.get(key)
+
+    def is_known_miss(self, key):
+        u"""Checks if the given key was recently looked up and not found.
+
+        Args:
+            key (tuple): ``(table, id)``.
+
+        Returns:
+            bool: True if the miss has not expired yet. False otherwise.
+        """
+
+        with self._lock:
+            expires_at = self._misses.get(key)
+            if expires_at is None:
+                return False
+            if expires_at > time.time():
+                return True
+            del self._misses[key]
+            return False
+
+    def add(self, key, obj):
+        u"""Adds (or replaces) the object for the given key.
+
+        Args:
+            key (tuple): ``(table, id)``.
+            obj (obj): The object.
+        """
+
+        with self._lock:
+            self._objects[key] = obj
+            self._misses.pop(key, None)
+
+    def add_miss(self, key):
+        u"""Remembers that the given key was not found in the database.
+
+        Args:
+            key (tuple): ``(table, id)``.
+        """
+
+        if self.miss_ttl <= 0:
+            return
+
+        with self._lock:
+            self._misses[key] = time.time() + self.miss_ttl
+
+    def evict(self, key):
+        u"""Removes the given key (object and negative entry) from the map.
+
+        Args:
+            key (tuple): ``(table, id)``.
+        """
+
+        with self._lock:
+            self._objects.pop(key, None)
+            self._misses.pop(key, None)
+
+    def clear(self):
+        u"""Removes everything from the map.
+        """
+
+        with self._lock:
+            self._objects.clear()
+            self._misses.clear()
+
+    def __len__(self):
+        return len(self._objects)
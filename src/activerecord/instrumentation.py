@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+u"""Instrumentation of the queries executed by ``ConnectionDB``.
+
+Every query is reported to the listeners registered with
+``ConnectionDB.add_listener()`` as a ``QueryEvent``. Without listeners, the
+queries are not timed at all.
+
+``QueryStats`` is a listener that groups the queries by fingerprint (the
+statement with the literal values replaced by ``?``) and counts calls, time,
+rows and bytes.
+
+Example:
+    How to use it::
+
+        stats = QueryStats()
+        Bicycle._database.add_listener(stats)
+
+        Bicycle.find_all()
+
+        for fingerprint, entry in stats.snapshot().items():
+            print(fingerprint, entry['calls'], entry['total_time'])
+
+References:
+    `Digests in the Performance Schema`_
+
+.. _Digests in the Performance Schema:
+   https://dev.mysql.com/doc/refman/8.0/en/performance-schema-statement-digests.html
+
+"""
+
+__all__ = [
+    'QueryEvent',
+    'QueryStats',
+    'fingerprint'
+]
+__copyright__ = u"Copyright (C) 2022 Leonardo Pinheiro"
+__author__ = u"Leonardo Pinheiro <info@leonardopinheiro.net>"
+__link__ = u"https://www.leonardopinheiro.net"
+
+import bisect
+import collections
+import re
+import threading
+
+QueryEvent = collections.namedtuple('QueryEvent', [
+    'sql', 'values', 'duration', 'rows_returned', 'rows_affected',
+    'bytes_fetched', 'error'])
+u"""One executed query.
+
+Attributes:
+    sql (str): The statement, with the ``%s`` placeholders.
+    values (tuple): The values of the placeholders (or None).
+    duration (float): The time spent, in seconds (including fetching the
+        rows).
+    rows_returned (int): The number of rows in the result set.
+    rows_affected (int): The number of rows changed by a write.
+    bytes_fetched (int): The (estimated) size of the values in the result set.
+    error (Exception): The error raised by the driver (or None).
+"""
+
+_LITERALS = re.compile(r"""
+      '(?:[^'\\]|\\.|'')*'          # 'string'
+    | "(?:[^"\\]|\\.|"")*"          # "string"
+    | \b0x[0-9a-fA-F]+\b            # hexadecimal
+    | (?<![\w.])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b  # number
+    | %s                            # placeholder
+    """, re.VERBOSE)
+_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ROWS = re.compile(r"(?:\(\?\+?\)\s*,\s*)+(\(\?\+?\))")
+_SPACES = re.compile(r"\s+")
+
+_fingerprints = {}
+_MAX_FINGERPRINTS = 5000
+
+
+def fingerprint(sql):
+    u"""Normalizes a statement, so the executions that differ only by the
+    values share the same fingerprint.
+
+    The literal values and the placeholders become ``?``. Lists of values
+    (``IN (...)``) and the rows of a multi-row INSERT become ``(?+)``.
+
+    Args:
+        sql (str): The statement.
+
+    Returns:
+        str: The fingerprint.
+
+    Example:
+        How to call this function::
+
+            fingerprint("SELECT * FROM bicycles WHERE id IN (1, 2, 3)")
+            # 'SELECT * FROM bicycles WHERE id IN (?+)'
+    """
+
+    result = _fingerprints.get(sql)
+    if result is not None:
+        return result
+
+    result = _LITERALS.sub("?", sql)
+    result = _LISTS.sub("(?+)", result)
+    result = _ROWS.sub(r"\1", result)
+    result = _SPACES.sub(" ", result).strip()
+
+    # The same few statements are executed again and again.
+    if len(_fingerprints) >= _MAX_FINGERPRINTS:
+        _fingerprints.clear()
+    _fingerprints[sql] = result
+
+    return result
+
+
+def estimate_bytes(rows):
+    u"""Estimates the size of the values in a result set, as sent by the
+    server.
+
+    Args:
+        rows (list[tuple | dict]): The records.
+
+    Returns:
+        int: The estimated size, in bytes.
+    """
+
+    size = 0
+    for row in rows:
+        values = row.values() if isinstance(row, dict) else row
+        for value in values:
+            if value is None:
+                size += 1
+            elif isinstance(value, (bytes, bytearray)):
+                size += len(value)
+            elif isinstance(value, (int, float)):
+                size += 8
+            else:
+                size += len(u"{value}".format(value=value))
+
+    return size
+
+
+class QueryStats(object):
+    u"""Listener that aggregates the queries by fingerprint (see
+    ``fingerprint()``).
+
+    Args:
+        buckets (tuple[float], optional): The upper bounds, in seconds, of the
+            latency histogram. Slower queries are counted in an extra bucket.
+            Defaults to ``DEFAULT_BUCKETS``.
+    """
+
+    DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+                       0.5, 1.0, 2.5, 5.0)
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        u"""Records one query. Called by ``ConnectionDB``.
+
+        Args:
+            event (QueryEvent): The executed query.
+        """
+
+        key = fingerprint(event.sql)
+        bucket = bisect.bisect_left(self.buckets, event.duration)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = {
+                    'calls': 0,
+                    'errors': 0,
+                    'total_time': 0.0,
+                    'min_time': event.duration,
+                    'max_time': 0.0,
+                    'histogram': [0] * (len(self.buckets) + 1),
+                    'rows_returned': 0,
+                    'rows_affected': 0,
+                    'bytes_fetched': 0
+                }
+                self._entries[key] = entry
+
+            entry['calls'] += 1
+            if event.error is not None:
+                entry['errors'] += 1
+            entry['total_time'] += event.duration
+            entry['min_time'] = min(entry['min_time'], event.duration)
+            entry['max_time'] = max(entry['max_time'], event.duration)
+            entry['histogram'][bucket] += 1
+            entry['rows_returned'] += event.rows_returned
+            entry['rows_affected'] += event.rows_affected
+            entry['bytes_fetched'] += event.bytes_fetched
+
+    def snapshot(self):
+        u"""Returns a copy of the statistics.
+
+        Returns:
+            dict: ``{fingerprint: entry}``. Each entry has ``calls``,
+            ``errors``, ``total_time``, ``min_time``, ``max_time``,
+            ``avg_time``, ``histogram``, ``rows_returned``, ``rows_affected``
+            and ``bytes_fetched``. ``histogram`` is a list of
+            ``(upper bound, count)``; the last upper bound is None.
+        """
+
+        bounds = list(self.buckets) + [None]
+
+        with self._lock:
+            snapshot = {}
+            for key, entry in self._entries.items():
+                copied = dict(entry)
+                copied['avg_time'] = entry['total_time'] / entry['calls']
+                copied['histogram'] = list(zip(bounds, entry['histogram']))
+                snapshot[key] = copied
+
+        return snapshot
+
+    def reset(self):
+        u"""Removes all the statistics.
+        """
+
+        with self._lock:
+            self._entries.clear()
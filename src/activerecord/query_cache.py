@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+
+__all__ = ['QueryCache']
+__copyright__ = u"Copyright (C) 2022 Leonardo Pinheiro"
+__author__ = u"Leonardo Pinheiro <info@leonardopinheiro.net>"
+__link__ = u"https://www.leonardopinheiro.net"
+
+import collections
+import re
+import sys
+import threading
+import time
+
+# A quoted string or identifier (kept as it is), or a run of whitespace.
+_TOKEN = re.compile(r"""('(?:[^'\\]|\\.|'')*'|"(?:[^"\\]|\\.|"")*"|`[^`]*`)"""
+                    r"|\s+", re.DOTALL)
+
+
+class QueryCache(object):
+    u"""Least recently used (LRU) cache for the results of SELECT queries.
+
+    The entries are keyed by the normalized SQL plus the values that complete
+    it. Each entry expires after the time to live (TTL) given when it is
+    stored and belongs to a table, so every entry of a table can be
+    invalidated when that table changes.
+
+    Any object with the methods ``get()``, ``set()`` and
+    ``invalidate_table()`` can replace this one (see
+    ``DatabaseObject.set_query_cache()``).
+
+    Args:
+        max_entries (int, optional): The maximum number of cached results.
+            Defaults to 1000.
+        max_bytes (int, optional): The maximum (estimated) size of all cached
+            results together. None means no limit. Defaults to None.
+
+    References:
+        `collections.OrderedDict`_
+
+        `sys.getsizeof`_
+
+    .. _collections.OrderedDict:
+       https://docs.python.org/2.7/library/collections.html#collections.OrderedDict
+    .. _sys.getsizeof:
+       https://docs.python.org/2.7/library/sys.html#sys.getsizeof
+    """
+
+    def __init__(self, max_entries=1000, max_bytes=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        # key: (table, result, expires_at, size). The order is the LRU order.
+        self._entries = collections.OrderedDict()
+        self._keys_by_table = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def normalize(sql):
+        u"""Normalizes the SQL string, so the same query written with different
+        spacing shares the same entry.
+
+        The whitespace inside quotes is part of a value, so it is kept
+        (``'A  B'`` and ``'A B'`` are different queries).
+
+        Args:
+            sql (str): The SQL string.
+
+        Returns:
+            str: The SQL string with the whitespace outside quotes collapsed.
+        """
+
+        return _TOKEN.sub(lambda match: match.group(1) or " ", sql).strip()
+
+    def _key(self, sql, values):
+        return (self.normalize(sql), tuple(values) if values else ())
+
+    def get(self, table, sql, values=None):
+        u"""Looks for a cached result.
+
+        Args:
+            table (str): The table the query reads from.
+            sql (str): The SQL string.
+            values (tuple, optional): The values that complete the SQL string.
+                Defaults to None.
+
+        Returns:
+            tuple: ``(True, result)`` on a hit. ``(False, None)`` on a miss.
+        """
+
+        key = self._key(sql, values)
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and entry[2] <= time.time():
+                self._remove(key)
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return (False, None)
+
+            # Moves the entry to the end (most recently used).
+            del self._entries[key]
+            self._entries[key] = entry
+
+            self.hits += 1
+            return (True, entry[1])
+
+    def set(self, table, sql, values, result, ttl):
+        u"""Stores a result.
+
+        The cached result is shared by everyone that reads it, so it must not
+        be changed.
+
+        Args:
+            table (str): The table the query reads from.
+            sql (str): The SQL string.
+            values (tuple): The values that complete the SQL string (or None).
+            result (list): The result of the query.
+            ttl (float): How many seconds the result is valid.
+        """
+
+        key = self._key(sql, values)
+        size = self._estimate_size(result)
+
+        # A result bigger than the whole cache is not stored.
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (table, result, time.time() + ttl, size)
+            self._keys_by_table.setdefault(table, set()).add(key)
+            self._bytes += size
+
+            # Evicts the least recently used entries.
+            while (len(self._entries) > self.max_entries or
+                   (self.max_bytes is not None and
+                    self._bytes > self.max_bytes)):
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def invalidate_table(self, table):
+        u"""Removes every entry that belongs to the given table.
+
+        Args:
+            table (str): The table that changed.
+        """
+
+        with self._lock:
+            keys = self._keys_by_table.pop(table, None)
+            if not keys:
+                return
+
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+
+    def clear(self):
+        u"""Removes every entry. The counters are kept.
+        """
+
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_table.clear()
+            self._bytes = 0
+
+    def stats(self):
+        u"""Returns the cache counters.
+
+        Returns:
+            dict: ``hits``, ``misses``, ``evictions``, ``invalidations``,
+            ``entries`` and ``bytes``.
+        """
+
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'entries': len(self._entries),
+                'bytes': self._bytes
+            }
+
+    def _remove(self, key):
+        u"""Removes one entry. Must be called with the lock held.
+
+        Args:
+            key (tuple): The entry key.
+        """
+
+        table, _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+        keys = self._keys_by_table.get(table)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_table[table]
+
+    @staticmethod
+    def _estimate_size(result, depth=3):
+        u"""Estimates the memory used by a result.
+
+        Args:
+            result (obj): The result of a query. Usually a list of records
+                (dictionaries or tuples) or ``(column_names, records)``.
+            depth (int, optional): How many levels of nested containers are
+                measured. Defaults to 3.
+
+        Returns:
+            int: The estimated size, in bytes.
+        """
+
+        size = sys.getsizeof(result)
+        if depth <= 0:
+            return size
+
+        if isinstance(result, dict):
+            items = result.values()
+        elif isinstance(result, (list, tuple)):
+            items = result
+        else:
+            return size
+
+        for item in items:
+            size += QueryCache._estimate_size(item, depth - 1)
+
+        return size
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+u"""Compact (``__slots__`` based) record classes generated from the
+``_db_columns`` of a ``DatabaseObject`` subclass.
+
+The instances of a model class carry a full ``__dict__`` and the state that is
+not stored in the database (``errors``, ``password`` and so on). When tens of
+thousands of rows are loaded for a list view, that adds up. A record keeps only
+the columns, in slots.
+
+Records are obtained with ``DatabaseObject.record_class()`` and the finders'
+``record_class`` argument.
+
+References:
+    `3.4.2.4. __slots__`_
+
+.. _3.4.2.4. __slots__:
+   https://docs.python.org/2.7/reference/datamodel.html#slots
+
+"""
+
+__all__ = [
+    'Record',
+    'ReadOnlyRecord',
+    'record_class'
+]
+__copyright__ = u"Copyright (C) 2022 Leonardo Pinheiro"
+__author__ = u"Leonardo Pinheiro <info@leonardopinheiro.net>"
+__link__ = u"https://www.leonardopinheiro.net"
+
+
+class BaseRecord(object):
+    u"""Behaviour shared by ``Record`` and ``ReadOnlyRecord``.
+    """
+
+    __slots__ = ('__weakref__', )
+
+    _model = None
+    u"""type: The ``DatabaseObject`` subclass the record was generated from."""
+
+    _columns = ()
+    u"""tuple[str]: The column names (the slots)."""
+
+    def __init__(self, **kwargs):
+        u"""Creates a record. Missing columns are set to None.
+
+        Args:
+            **kwargs: The column values.
+        """
+
+        for column in self._columns:
+            object.__setattr__(self, column, kwargs.get(column))
+
+    @classmethod
+    def _instantiate(cls, record):
+        u"""Creates a record from a row of the result set.
+
+        Args:
+            record (dict): A dictionary representing a record (row) in the
+                result set. Keys that are not columns are ignored.
+
+        Returns:
+            obj: An instance of the record class.
+        """
+
+        obj = cls.__new__(cls)
+        for column in cls._columns:
+            object.__setattr__(obj, column, record.get(column))
+
+        return obj
+
+    @classmethod
+    def _hydrate(cls, column_names, rows):
+        u"""Creates records from the records (tuples) of a result set.
+
+        Args:
+            column_names (tuple[str]): The column names of the result set.
+            rows (list[tuple]): The records, as returned by
+                ``ConnectionDB.select()``.
+
+        Returns:
+            list[obj]: Instances of the record class.
+        """
+
+        positions = dict((column, position)
+                         for position, column in enumerate(column_names))
+        setters = [(getattr(cls, column).__set__, positions.get(column))
+                   for column in cls._columns]
+
+        new = cls.__new__
+        object_list = []
+        for row in rows:
+            obj = new(cls)
+            for setter, position in setters:
+                setter(obj, None if position is None else row[position])
+            object_list.append(obj)
+
+        return object_list
+
+    def as_dict(self):
+        u"""Creates a dictionary with the column values.
+
+        Returns:
+            dict: The column names and values.
+        """
+
+        return dict((column, getattr(self, column)) for column in self._columns)
+
+    def to_model(self, **kwargs):
+        u"""Creates an instance of the model class with the values of this
+        record.
+
+        Args:
+            **kwargs: Values that are not columns (``password``, for example)
+                or that should replace the ones in the record.
+
+        Returns:
+            obj: An instance of the model class.
+        """
+
+        obj = self._model()
+        for column in self._columns:
+            setattr(obj, column, getattr(self, column))
+        for key, value in kwargs.items():
+            setattr(obj, key, value)
+
+        return obj
+
+    def __repr__(self):
+        return "<{name} id={id}>".format(name=type(self).__name__,
+                                         id=getattr(self, 'id', None))
+
+
+class Record(BaseRecord):
+    u"""A compact record that can still be validated, saved and deleted.
+
+    Those operations are delegated to a temporary instance of the model class
+    (see ``to_model()``), so the model's validation and hooks run as usual.
+    """
+
+    __slots__ = ('errors', )
+
+    def __init__(self, **kwargs):
+        super(Record, self).__init__(**kwargs)
+        self.errors = []
+
+    @classmethod
+    def _instantiate(cls, record):
+        obj = super(Record, cls)._instantiate(record)
+        obj.errors = []
+        return obj
+
+    @classmethod
+    def _hydrate(cls, column_names, rows):
+        object_list = super(Record, cls)._hydrate(column_names, rows)
+        for obj in object_list:
+            obj.errors = []
+        return object_list
+
+    def validate(self, **kwargs):
+        u"""Validates the record with the model's ``_validate()``.
+
+        Args:
+            **kwargs: See ``to_model()``.
+
+        Returns:
+            list[str]: The errors list (also stored in ``errors``).
+        """
+
+        self.errors = self.to_model(**kwargs)._validate()
+        return self.errors
+
+    def save(self, **kwargs):
+        u"""Saves the record with the model's ``save()``.
+
+        The values changed by the model (the new ID, for example) are copied
+        back to the record.
+
+        Args:
+            **kwargs: See ``to_model()``. For an ``Admin`` record, the password
+                and its confirmation.
+
+        Returns:
+            (list[dict] | list[] | bool): The result of the model's ``save()``.
+        """
+
+        obj = self.to_model(**kwargs)
+        result = obj.save()
+
+        for column in self._columns:
+            setattr(self, column, getattr(obj, column))
+        self.errors = obj.errors
+
+        return result
+
+    def delete(self):
+        u"""Deletes the record with the model's ``delete()``.
+
+        Returns:
+            (False | obj): The result of the model's ``delete()``.
+        """
+
+        return self.to_model().delete()
+
+
+class ReadOnlyRecord(BaseRecord):
+    u"""A compact record for list views. Its values cannot be changed and it
+    cannot be saved or deleted (``to_model()`` creates an instance that can).
+    """
+
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(
+            "{name} is read-only.".format(name=type(self).__name__))
+
+    def __delattr__(self, name):
+        raise AttributeError(
+            "{name} is read-only.".format(name=type(self).__name__))
+
+
+def record_class(model, read_only=False):
+    u"""Generates a record class from the ``_db_columns`` of a model class.
+
+    ``DatabaseObject.record_class()`` should be preferred, because it reuses
+    the generated classes.
+
+    Args:
+        model (type): A ``DatabaseObject`` subclass.
+        read_only (bool, optional): Generates a ``ReadOnlyRecord`` subclass
+            instead of a ``Record`` one. Defaults to False.
+
+    Returns:
+        type: The generated class (``BicycleRecord`` or
+        ``BicycleReadOnlyRecord``, for example).
+
+    Example:
+        How to call this function::
+
+            BicycleRecord = record_class(Bicycle)
+            bike = BicycleRecord(brand="Trek", model="Emonda")
+    """
+
+    base = ReadOnlyRecord if read_only else Record
+    columns = tuple(model._db_columns)
+
+    return type(model.__name__ + base.__name__, (base, ), {
+        '__slots__': columns,
+        '__module__': model.__module__,
+        '_model': model,
+        '_columns': columns
+    })
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+
+__all__ = ['SchemaCache']
+__copyright__ = u"Copyright (C) 2022 Leonardo Pinheiro"
+__author__ = u"Leonardo Pinheiro <info@leonardopinheiro.net>"
+__link__ = u"https://www.leonardopinheiro.net"
+
+import json
+import os
+import tempfile
+import threading
+
+import shared
+import database_functions
+
+
+class SchemaCache(object):
+    u"""The columns and indexes of every table in the database, read from
+    ``INFORMATION_SCHEMA`` once and kept in a local JSON file.
+
+    The file belongs to a database name and a schema version
+    (``DB_SCHEMA_VERSION`` in ``db_credentials.py``). While both match, the
+    schema is read from the file and the server is not asked again. Changing
+    the version (after a migration) makes the next read query the server and
+    rewrite the file.
+
+    Args:
+        database (ConnectionDB): The connection used to read the schema.
+        path (str, optional): The cache file. Defaults to ``DB_SCHEMA_CACHE``
+            or, if it is not set, a file in the temporary directory.
+        version (str, optional): The schema version. Defaults to
+            ``DB_SCHEMA_VERSION``.
+
+    With the SQLite backend, the schema is read with ``PRAGMA`` statements
+    instead.
+
+    References:
+        `26.3.8 The INFORMATION_SCHEMA COLUMNS Table`_
+
+        `26.3.34 The INFORMATION_SCHEMA STATISTICS Table`_
+
+    .. _26.3.8 The INFORMATION_SCHEMA COLUMNS Table:
+       https://dev.mysql.com/doc/refman/8.0/en/information-schema-columns-table.html
+    .. _26.3.34 The INFORMATION_SCHEMA STATISTICS Table:
+       https://dev.mysql.com/doc/refman/8.0/en/information-schema-statistics-table.html
+    """
+
+    def __init__(self, database, path=None, version=None):
+        self._database = database
+        self._database_name = database_functions.db_setting('DB_NAME')
+
+        if path is None:
+            path = database_functions.db_setting('DB_SCHEMA_CACHE')
+        if path is None:
+            path = os.path.join(
+                tempfile.gettempdir(),
+                "activerecord_schema_{name}.json".format(
+                    name=self._database_name))
+        self.path = path
+
+        if version is None:
+            version = database_functions.db_setting('DB_SCHEMA_VERSION')
+        self.version = version
+
+        self._tables = None
+        self._lock = threading.Lock()
+
+    def table(self, name):
+        u"""Returns the schema of a table.
+
+        Args:
+            name (str): The table name.
+
+        Returns:
+            (dict | None): ``{'columns': [...], 'indexes': {...}}``. Each
+            column is a dictionary with ``name``, ``type``, ``column_type``,
+            ``nullable``, ``key`` and ``default``, in the table order. Each
+            index maps its name to ``{'unique': bool, 'columns': [...]}``. None
+            if the table does not exist.
+        """
+
+        return self._load().get(name)
+
+    def columns(self, name):
+        u"""Returns the column names of a table, in the table order.
+
+        Args:
+            name (str): The table name.
+
+        Returns:
+            (list[str] | None): The column names. None if the table does not
+            exist.
+        """
+
+        table = self.table(name)
+        if table is None:
+            return None
+        return [column['name'] for column in table['columns']]
+
+    def refresh(self):
+        u"""Reads the schema from the server again and rewrites the file.
+
+        Returns:
+            bool: True if the schema was read. False if a query failed (then
+            the schema in memory and the file are kept).
+        """
+
+        with self._lock:
+            tables = self._introspect()
+            if tables is None:
+                return False
+            self._tables = tables
+            self._save(tables)
+
+        return True
+
+    def _load(self):
+        u"""Returns the tables from memory, from the file or from the server,
+        in that order.
+
+        Returns:
+            dict: The schema of each table, by name. Empty if the server
+            cannot be read. The failure is neither kept nor written to the
+            file, so the next call asks the server again.
+        """
+
+        if self._tables is not None:
+            return self._tables
+
+        with self._lock:
+            if self._tables is None:
+                tables = self._read_file()
+                if tables is None:
+                    tables = self._introspect()
+                    if tables is None:
+                        return {}
+                    self._save(tables)
+                self._tables = tables
+
+        return self._tables
+
+    def _read_file(self):
+        u"""Reads the cache file.
+
+        Returns:
+            (dict | None): The tables. None if the file does not exist, cannot
+            be read or belongs to another database or version.
+        """
+
+        try:
+            with open(self.path) as cache_file:
+                data = json.load(cache_file)
+        except (IOError, OSError, ValueError):
+            return None
+
+        if (data.get('database') != self._database_name or
+                data.get('version') != self.version):
+            return None
+
+        return data.get('tables')
+
+    def _save(self, tables):
+        u"""Writes the cache file. A failure is shown, but does not stop the
+        application (the schema stays in memory).
+
+        Args:
+            tables (dict): The tables.
+        """
+
+        data = {
+            'database': self._database_name,
+            'version': self.version,
+            'tables': tables
+        }
+
+        temporary_path = self.path + ".tmp"
+        try:
+            with open(temporary_path, 'w') as cache_file:
+                json.dump(data, cache_file, default=str, indent=1,
+                          sort_keys=True)
+
+            # os.rename() does not replace files on Windows.
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            os.rename(temporary_path, self.path)
+
+        except (IOError, OSError) as err:
+            shared.print_error_message(err)
+
+    def _introspect(self):
+        u"""Reads the columns and indexes of every table from the server (see
+        ``MySQLBackend.introspect()`` and ``SQLiteBackend.introspect()``).
+
+        Returns:
+            (dict | None): The tables. None if a query fails.
+        """
+
+        return database_functions.get_backend().introspect(
+            self._database, self._database_name)
@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+
+__all__ = ['SlowQueryLog']
+__copyright__ = u"Copyright (C) 2022 Leonardo Pinheiro"
+__author__ = u"Leonardo Pinheiro <info@leonardopinheiro.net>"
+__link__ = u"https://www.leonardopinheiro.net"
+
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import sys
+import threading
+
+# If Python 3:
+try:
+    import queue
+# If Python 2:
+except ImportError:
+    import Queue as queue
+
+import database_functions
+
+# The frames of these modules are skipped when looking for the caller.
+_INTERNAL_MODULES = ('connection_db', 'instrumentation', 'slow_query_log',
+                     'database_object', 'records', 'contextlib', 'threading')
+
+
+class SlowQueryLog(object):
+    u"""Listener (see ``ConnectionDB.add_listener()``) that writes the SELECT
+    statements slower than the threshold to a rotating JSON Lines file.
+
+    Each line has the time, the statement, the values, the duration, the
+    model and method (``Bicycle.find_by_sql``, for example), the caller
+    outside the ``activerecord`` package and the output of ``EXPLAIN``.
+
+    The writes (INSERT, UPDATE, DELETE) are not logged, because their values
+    include the columns being saved (``Admin.hashed_password``, for example)
+    and the file is not protected.
+
+    The caller is never blocked: the entries go to a queue and a background
+    thread runs ``EXPLAIN`` (on its own connection) and writes the file. When
+    the queue is full, the entries are dropped and counted in ``dropped``.
+
+    It is enabled by ``DB_SLOW_QUERY_LOG`` and ``DB_SLOW_QUERY_THRESHOLD`` in
+    ``db_credentials.py``.
+
+    Args:
+        path (str): The log file.
+        threshold (float, optional): The minimum duration, in seconds.
+            Defaults to 0.5.
+        max_bytes (int, optional): The size that makes the file rotate.
+            Defaults to 10 MB.
+        backup_count (int, optional): How many rotated files are kept.
+            Defaults to 5.
+        explain (bool, optional): Runs ``EXPLAIN`` for the SELECT statements.
+            Defaults to True.
+        max_pending (int, optional): The size of the queue. Defaults to 1000.
+
+    References:
+        `logging.handlers.RotatingFileHandler`_
+
+        `13.8.2 EXPLAIN Statement`_
+
+        `JSON Lines`_
+
+    .. _logging.handlers.RotatingFileHandler:
+       https://docs.python.org/2.7/library/logging.handlers.html#rotatingfilehandler
+    .. _13.8.2 EXPLAIN Statement:
+       https://dev.mysql.com/doc/refman/8.0/en/explain.html
+    .. _JSON Lines:
+       https://jsonlines.org/
+    """
+
+    def __init__(self, path, threshold=0.5, max_bytes=10 * 1024 * 1024,
+                 backup_count=5, explain=True, max_pending=1000):
+        self.path = path
+        self.threshold = threshold
+        self.explain = explain
+        self.dropped = 0
+
+        self._max_bytes = max_bytes
+        self._backup_count = backup_count
+        self._queue = queue.Queue(max_pending)
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+        # Used only by the background thread.
+        self._logger = None
+        self._connection = None
+
+    def __call__(self, event):
+        u"""Queues the query if it is a slow SELECT statement. Called by
+        ``ConnectionDB``.
+
+        Args:
+            event (QueryEvent): The executed query.
+        """
+
+        if (event.duration < self.threshold or
+                event.sql.lstrip()[:6].upper() != 'SELECT'):
+            return
+
+        model, method, caller = self._find_caller()
+        entry = {
+            'time': datetime.datetime.now().isoformat(),
+            'sql': event.sql,
+            'values': event.values,
+            'duration': round(event.duration, 6),
+            'rows_returned': event.rows_returned,
+            'rows_affected': event.rows_affected,
+            'model': model,
+            'method': method,
+            'caller': caller,
+            'error': str(event.error) if event.error is not None else None
+        }
+
+        self._start()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self):
+        u"""Waits until every queued entry is written.
+        """
+
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self):
+        u"""Writes the queued entries, stops the background thread and closes
+        the file and the connection.
+        """
+
+        with self._thread_lock:
+            if self._thread is None:
+                return
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _start(self):
+        u"""Starts (only once) the background thread.
+        """
+
+        if self._thread is None:
+            with self._thread_lock:
+                if self._thread is None:
+                    thread = threading.Thread(target=self._run,
+                                              name="SlowQueryLog")
+                    thread.daemon = True
+                    thread.start()
+                    self._thread = thread
+
+    def _run(self):
+        u"""The loop of the background thread.
+        """
+
+        while True:
+            entry = self._queue.get()
+            try:
+                if entry is None:
+                    self._shutdown()
+                    return
+                self._write(entry)
+            except Exception as err:
+                # The log must never stop the application.
+                sys.stderr.write("SlowQueryLog: {err}\n".format(err=err))
+            finally:
+                self._queue.task_done()
+
+    def _write(self, entry):
+        u"""Adds the ``EXPLAIN`` output to the entry and writes it.
+
+        Args:
+            entry (dict): The entry created by ``__call__()``.
+        """
+
+        if self.explain:
+            entry['explain'] = self._run_explain(entry['sql'], entry['values'])
+
+        if self._logger is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+
+            handler = logging.handlers.RotatingFileHandler(
+                self.path, maxBytes=self._max_bytes,
+                backupCount=self._backup_count)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+
+            # A logger of its own, so the entries do not reach the root
+            # logger (Maya's Script Editor, for example).
+            logger = logging.getLogger("activerecord.slow_query_log." +
+                                       str(id(self)))
+            logger.propagate = False
+            logger.setLevel(logging.INFO)
+            logger.addHandler(handler)
+            self._logger = logger
+
+        self._logger.info(json.dumps(entry, default=str, sort_keys=True))
+
+    def _run_explain(self, sql, values):
+        u"""Executes ``EXPLAIN`` for the statement on the connection of the
+        background thread.
+
+        Args:
+            sql (str): The statement.
+            values (tuple): The values of the placeholders (or None).
+
+        Returns:
+            (list[dict] | dict): The rows of ``EXPLAIN``, or ``{'error': ...}``.
+        """
+
+        driver = database_functions.load_driver()
+        try:
+            if self._connection is None:
+                self._connection = database_functions.db_connect()
+
+            cursor = self._connection.cursor(dictionary=True)
+            try:
+                cursor.execute("EXPLAIN " + sql, values)
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+
+        except driver.Error as err:
+            # Opens another connection next time.
+            self._connection = None
+            return {'error': str(err)}
+
+    def _shutdown(self):
+        u"""Closes the file and the connection of the background thread.
+        """
+
+        if self._logger is not None:
+            for handler in list(self._logger.handlers):
+                handler.close()
+                self._logger.removeHandler(handler)
+            self._logger = None
+
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+            self._connection = None
+
+    @staticmethod
+    def _find_caller():
+        u"""Finds, in the call stack, the outermost model method involved in
+        the query and the code that called it.
+
+        Returns:
+            tuple: ``(model, method, caller)``. ``caller`` is
+            ``"file:line in function"``. Any of them can be None.
+        """
+
+        model = method = caller = None
+
+        frame = sys._getframe(2)
+        while frame is not None:
+            owner = frame.f_locals.get('cls')
+            if owner is None and 'self' in frame.f_locals:
+                owner = type(frame.f_locals['self'])
+
+            if (isinstance(owner, type) and
+                    getattr(owner, '_table_name', None)):
+                # Bicycle.find_by_id, not the find_by_sql it calls.
+                model = owner.__name__
+                method = frame.f_code.co_name
+            else:
+                module = os.path.splitext(
+                    os.path.basename(frame.f_code.co_filename))[0]
+                if module not in _INTERNAL_MODULES:
+                    caller = "{file}:{line} in {function}".format(
+                        file=frame.f_code.co_filename, line=frame.f_lineno,
+                        function=frame.f_code.co_name)
+                    break
+
+            frame = frame.f_back
+
+        return (model, method, caller)
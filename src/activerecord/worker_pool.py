@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+
+__all__ = ['AsyncResult', 'WorkerPool']
+__copyright__ = u"Copyright (C) 2022 Leonardo Pinheiro"
+__author__ = u"Leonardo Pinheiro <info@leonardopinheiro.net>"
+__link__ = u"https://www.leonardopinheiro.net"
+
+import functools
+import threading
+
+# If Python 3:
+try:
+    import queue
+# If Python 2:
+except ImportError:
+    import Queue as queue
+
+import shared
+
+
+class AsyncResult(object):
+    u"""The result of a function called by a ``WorkerPool``.
+
+    It mimics the part of ``concurrent.futures.Future`` that is needed here,
+    because Python 2.7 (Autodesk Maya 2020 and below) has neither
+    ``concurrent.futures`` nor ``asyncio``.
+
+    Example:
+        How to use it::
+
+            bikes = Bicycle.afind_all()
+            admins = Admin.afind_all()
+
+            # Both queries are running. result() waits for each one.
+            print(len(bikes.result()), len(admins.result()))
+
+    References:
+        `concurrent.futures - Future Objects`_
+
+    .. _concurrent.futures - Future Objects:
+       https://docs.python.org/3/library/concurrent.futures.html#future-objects
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._done = False
+        self._result = None
+        self._error = None
+        self._callbacks = []
+
+    def done(self):
+        u"""Tells if the function has returned (or raised an error).
+
+        Returns:
+            bool: True if the result is available.
+        """
+
+        with self._condition:
+            return self._done
+
+    def result(self, timeout=None):
+        u"""Waits for the function and returns its return value.
+
+        Args:
+            timeout (float, optional): The maximum number of seconds to wait.
+                Defaults to None (no limit).
+
+        Returns:
+            obj: The return value of the function.
+
+        Raises:
+            Exception: If the function does not return before the timeout, or
+                the error raised by the function.
+        """
+
+        self._wait(timeout)
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+    def exception(self, timeout=None):
+        u"""Waits for the function and returns the error it raised.
+
+        Args:
+            timeout (float, optional): See ``result()``. Defaults to None.
+
+        Returns:
+            (Exception | None): The error. None if the function returned.
+
+        Raises:
+            Exception: If the function does not return before the timeout.
+        """
+
+        self._wait(timeout)
+        return self._error
+
+    def add_done_callback(self, callback):
+        u"""Registers a function that is called, with this object, when the
+        result is available.
+
+        If the result is available already, the callback is called at once.
+
+        Args:
+            callback (function): Receives this ``AsyncResult``.
+
+        Warning:
+            The callback runs in the worker thread. Autodesk Maya's user
+            interface must only be changed from the main thread, so the
+            callback should hand the work over with
+            ``maya.utils.executeDeferred()``.
+        """
+
+        with self._condition:
+            if not self._done:
+                self._callbacks.append(callback)
+                return
+
+        self._call(callback)
+
+    def _wait(self, timeout):
+        u"""Waits for the result.
+
+        Args:
+            timeout (float): The maximum number of seconds to wait (or None).
+
+        Raises:
+            Exception: If the result is not available before the timeout.
+        """
+
+        with self._condition:
+            if not self._done:
+                self._condition.wait(timeout)
+            if not self._done:
+                shared.print_error_message(
+                    "Timed out waiting for the result.")
+                raise Exception("Timed out waiting for the result.")
+
+    def _finish(self, result=None, error=None):
+        u"""Stores the result and calls the callbacks. Called by the worker
+        thread.
+
+        Args:
+            result (obj, optional): The return value of the function.
+                Defaults to None.
+            error (Exception, optional): The error raised by the function.
+                Defaults to None.
+        """
+
+        with self._condition:
+            self._result = result
+            self._error = error
+            self._done = True
+            callbacks, self._callbacks = self._callbacks, []
+            self._condition.notify_all()
+
+        for callback in callbacks:
+            self._call(callback)
+
+    def _call(self, callback):
+        u"""Calls a callback. Its errors are shown, not raised, so the worker
+        thread keeps working.
+
+        Args:
+            callback (function): See ``add_done_callback()``.
+        """
+
+        try:
+            callback(self)
+        except Exception as err:
+            shared.print_error_message(err)
+
+
+class WorkerPool(object):
+    u"""A fixed number of daemon threads that call blocking functions (the
+    queries) in the background.
+
+    The threads are started by the first ``submit()``.
+
+    Args:
+        size (int, optional): The number of threads. Defaults to 1.
+        name (str, optional): The name of the threads. Defaults to
+            ``'WorkerPool'``.
+
+    References:
+        `Queue - A synchronized queue class`_
+
+    .. _Queue - A synchronized queue class:
+       https://docs.python.org/2.7/library/queue.html
+    """
+
+    def __init__(self, size=1, name='WorkerPool'):
+        self.size = size
+        self.name = name
+
+        self._tasks = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def submit(self, func, *args, **kwargs):
+        u"""Calls the function in one of the threads.
+
+        Args:
+            func (function): The function to be called.
+            *args: The positional arguments of the function.
+            **kwargs: The keyword arguments of the function.
+
+        Returns:
+            AsyncResult: The result (or the error) of the function.
+        """
+
+        if len(self._threads) < self.size:
+            self._start_threads()
+
+        result = AsyncResult()
+        self._tasks.put((result, functools.partial(func, *args, **kwargs)))
+        return result
+
+    def _start_threads(self):
+        u"""Starts the threads that are missing.
+        """
+
+        with self._lock:
+            while len(self._threads) < self.size:
+                thread = threading.Thread(
+                    target=self._work,
+                    name="{name}-{number}".format(
+                        name=self.name, number=len(self._threads) + 1))
+                thread.daemon = True
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self):
+        u"""The loop of each thread.
+        """
+
+        while True:
+            result, func = self._tasks.get()
+            try:
+                value = func()
+            except Exception as err:
+                result._finish(error=err)
+            else:
+                result._finish(result=value)
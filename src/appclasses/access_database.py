@@ -143,14 +143,23 @@ class Bicycle(DatabaseObject):
 
         self.errors = []
 
-        if shared.is_blank(self.brand):
-            self.errors.append("Brand cannot be blank.")
-
-        if shared.is_blank(self.model):
-            self.errors.append("Model cannot be blank.")
+        for column in ('brand', 'model'):
+            self.errors += self._validate_value(column, getattr(self, column))
 
         return self.errors
 
+    @classmethod
+    def _validate_value(cls, column, value, id=0):
+        errors = []
+
+        if column == 'brand' and shared.is_blank(value):
+            errors.append("Brand cannot be blank.")
+
+        if column == 'model' and shared.is_blank(value):
+            errors.append("Model cannot be blank.")
+
+        return errors
+
 
 class Admin(DatabaseObject):
 
@@ -158,6 +167,15 @@ class Admin(DatabaseObject):
     _db_columns = ['id', 'first_name', 'last_name', 'email', 'username',
                    'hashed_password']
     _password_required = True
+    _upsert_existing_columns = ('hashed_password', )
+
+    _username_chunk_size = 1000
+    u"""int: The maximum number of usernames in one query of
+    ``validate_many()``."""
+
+    _username_owners = None
+    u"""dict: Set by ``validate_many()`` while the object is validated, so the
+    uniqueness of the username is checked without a query."""
 
     def __init__(self, **kwargs):
         u"""Creates an instance of Admin.
@@ -192,9 +210,17 @@ class Admin(DatabaseObject):
     def full_name(self):
         return "{self.first_name} {self.last_name}".format(self=self)
 
-    def _create(self):
+    def _before_create(self):
         self.set_hashed_password(self.password)
-        return super(Admin, self)._create()
+
+    def _before_upsert(self, existing):
+        # Like _update(), an existing admin keeps the password if it is blank.
+        # Every column is written, so the hash is copied from the record.
+        if existing is not None and shared.is_blank(self.password):
+            self._password_required = False
+            self.hashed_password = existing['hashed_password']
+        else:
+            self._before_create()
 
     def _update(self):
 
@@ -202,7 +228,7 @@ class Admin(DatabaseObject):
         # allow updating the record, skipping the validation.
         # If it comes from a form (like an UI) and the password field is
         # empty, the validation will be skipped.
-        if self.password != '':
+        if not shared.is_blank(self.password):
             self.set_hashed_password(self.password)
             # Validate password.
         else:
@@ -213,29 +239,10 @@ class Admin(DatabaseObject):
     def _validate(self):
         self.errors = []
 
-        if shared.is_blank(self.first_name):
-            self.errors.append('First name cannot be blank.')
-        elif not shared.has_length(self.first_name, {'min': 2, 'max': 255}):
-            self.errors.append('First name must be between 2 and 255 characters.')
-
-        if shared.is_blank(self.last_name):
-            self.errors.append('Last name cannot be blank.')
-        elif not shared.has_length(self.last_name, {'min': 2, 'max': 255}):
-            self.errors.append('Last name must be between 2 and 255 characters.')
-
-        if shared.is_blank(self.email):
-            self.errors.append('Email cannot be blank.')
-        elif not shared.has_length(self.email, {'max': 255}):
-            self.errors.append('Email must be less than 255 characters.')
-        elif not shared.has_valid_email_format(self.email):
-            self.errors.append('Email must be a valid format.')
-
-        if shared.is_blank(self.username):
-            self.errors.append('Username cannot be blank.')
-        elif not shared.has_length(self.username, {'min': 8, 'max': 255}):
-            self.errors.append('Username must be between 8 and 255 characters.')
-        elif not Admin.has_unique_username(self.username, self.id if self.id > 0 else 0):
-            self.errors.append('Username not allowed. Try another.')
+        for column in ('first_name', 'last_name', 'email', 'username'):
+            self.errors += self._validate_value(
+                column, getattr(self, column), self.id if self.id > 0 else 0,
+                username_owners=self._username_owners)
 
         if self._password_required:
             if shared.is_blank(self.password):
@@ -258,12 +265,131 @@ class Admin(DatabaseObject):
 
         return self.errors
 
+    @classmethod
+    def _validate_value(cls, column, value, id=0, username_owners=None):
+        u"""Validates the value of one column (see
+        ``DatabaseObject._validate_value()``).
+
+        Args:
+            column (str): The column name.
+            value (obj): The value to be validated.
+            id (int, optional): The ID of the record. Defaults to 0 (none).
+            username_owners (dict, optional): The IDs that own each username
+                (see ``validate_many()``). Defaults to None (the database is
+                queried).
+
+        Returns:
+            list[str]: The errors string list.
+        """
+
+        errors = []
+
+        if column == 'first_name':
+            if shared.is_blank(value):
+                errors.append('First name cannot be blank.')
+            elif not shared.has_length(value, {'min': 2, 'max': 255}):
+                errors.append('First name must be between 2 and 255 characters.')
+
+        elif column == 'last_name':
+            if shared.is_blank(value):
+                errors.append('Last name cannot be blank.')
+            elif not shared.has_length(value, {'min': 2, 'max': 255}):
+                errors.append('Last name must be between 2 and 255 characters.')
+
+        elif column == 'email':
+            if shared.is_blank(value):
+                errors.append('Email cannot be blank.')
+            elif not shared.has_length(value, {'max': 255}):
+                errors.append('Email must be less than 255 characters.')
+            elif not shared.has_valid_email_format(value):
+                errors.append('Email must be a valid format.')
+
+        elif column == 'username':
+            if shared.is_blank(value):
+                errors.append('Username cannot be blank.')
+            elif not shared.has_length(value, {'min': 8, 'max': 255}):
+                errors.append('Username must be between 8 and 255 characters.')
+            elif username_owners is not None:
+                ids = username_owners.get(value.lower(), [])
+                if not all(owner_id == id for owner_id in ids):
+                    errors.append('Username not allowed. Try another.')
+            elif not cls.has_unique_username(value, id):
+                errors.append('Username not allowed. Try another.')
+
+        return errors
+
+    @classmethod
+    def validate_many(cls, objects):
+        u"""Validates a batch of admins with a few queries.
+
+        The usernames of the whole batch are checked against the database with
+        chunked ``IN`` queries, instead of one query per admin. A username used
+        more than once inside the batch is also an error (for the second and
+        following admins). Like the database, the comparison ignores case.
+
+        Args:
+            objects (list[Admin]): The admins to be validated.
+
+        Returns:
+            bool: True if all the admins are valid. False otherwise (see each
+            ``errors`` list).
+        """
+
+        usernames = set()
+        for obj in objects:
+            if not shared.is_blank(obj.username):
+                usernames.add(obj.username)
+
+        owners = cls._find_username_owners(list(usernames))
+
+        is_valid = True
+        seen = set()
+        for obj in objects:
+            obj._username_owners = owners
+            try:
+                errors = obj._validate()
+            finally:
+                del obj._username_owners
+
+            if not shared.is_blank(obj.username):
+                key = obj.username.lower()
+                if (key in seen and
+                        'Username not allowed. Try another.' not in errors):
+                    errors.append('Username not allowed. Try another.')
+                seen.add(key)
+
+            if errors:
+                is_valid = False
+
+        return is_valid
+
+    @classmethod
+    def _find_username_owners(cls, usernames):
+        u"""Finds which admins already use the given usernames.
+
+        Args:
+            usernames (list[str]): The usernames.
+
+        Returns:
+            dict: The IDs that use each username (lowercase).
+        """
+
+        owners = {}
+        size = cls._username_chunk_size
+        for start in range(0, len(usernames), size):
+            chunk = usernames[start:start + size]
+            for owner_id, username in cls.pluck('id', 'username',
+                                                username=chunk) or []:
+                owners.setdefault(username.lower(), []).append(owner_id)
+
+        return owners
+
     @classmethod
     def find_by_username(cls, username):
 
         sql = "SELECT * FROM " + cls._table_name + " "
-        sql += "WHERE username='{username}'".format(username=cls._database.escape_string(username))
-        object_list = cls.find_by_sql(sql)
+        sql += "WHERE username=%s"
+        object_list = cls.find_by_sql(sql, (username, ))
 
         # Checks if the list is NOT empty (does not need the "not" keyword).
         if object_list:
@@ -273,8 +399,13 @@ class Admin(DatabaseObject):
 
     @classmethod
     def has_unique_username(cls, username, current_id="0"):
-        admin = cls.find_by_username(username)
-        if not admin or admin.id == current_id:
+        # Only the IDs are read, no Admin is created.
+        ids = cls.pluck('id', username=username)
+        if ids is False:
+            # The query failed (the error was shown). Like find_by_username(),
+            # nothing found means unique.
+            return True
+        if all(owner_id == current_id for owner_id in ids):
             # Is unique.
             return True
         else:
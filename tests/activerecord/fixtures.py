@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+u'''Settings and helpers shared by the tests of the ``activerecord`` package.
+
+The tests run against the SQLite backend, in memory, so they need neither a
+MySQL server nor a ``db_credentials.py`` file. This module must be imported
+before any module of the package.
+'''
+import os
+import sys
+import tempfile
+import types
+
+# Gets the src_dir.
+tests_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+root_dir = os.path.dirname(tests_dir)
+src_dir = os.path.join(root_dir, "src")
+sql_dir = os.path.join(root_dir, "resources", "sql")
+
+# Adds src_dir to sys.path if it is not already there:
+for path in sys.path:
+    if path == src_dir:
+        break
+else:
+    sys.path.append(src_dir)
+
+SETTINGS = {
+    'DB_BACKEND': 'sqlite',
+    'DB_SQLITE_PATH': ':memory:',
+    'DB_SERVER': 'localhost',
+    'DB_PORT': 3306,
+    'DB_USER': 'username',
+    'DB_PASS': 'userpassword',
+    'DB_NAME': 'chain_gang',
+    'DB_POOL_SIZE': 0,
+    'DB_POOL_CHECKOUT': 'call',
+    'DB_POOL_TIMEOUT': 30,
+    'DB_POOL_PING_INTERVAL': 60,
+    'DB_PREPARED_STATEMENTS': 64,
+    'DB_WARM_UP': False,
+    'DB_SLOW_QUERY_LOG': None,
+    'DB_SLOW_QUERY_THRESHOLD': 0.5,
+    'DB_SCHEMA_VERSION': None,
+    'DB_SCHEMA_CACHE': os.path.join(tempfile.mkdtemp(), "schema.json")
+}
+
+# db_credentials.py is not under source control. When it was imported already,
+# its values are replaced.
+credentials = sys.modules.get('activerecord.db_credentials')
+if credentials is None:
+    credentials = types.ModuleType('activerecord.db_credentials')
+    sys.modules['activerecord.db_credentials'] = credentials
+for name, value in SETTINGS.items():
+    setattr(credentials, name, value)
+
+VALID_PASSWORD = "Secret-Password1"
+
+
+def reset(**settings):
+    u"""Creates a new database (from ``resources/sql``) and a new
+    ``ConnectionDB`` for the models, with the default settings.
+
+    Args:
+        **settings: Settings that replace the defaults (``DB_POOL_SIZE=3``,
+            for example).
+
+    Returns:
+        ConnectionDB: The connection used by the models.
+    """
+
+    from activerecord import connection_pool, database_functions
+    from activerecord.connection_db import ConnectionDB
+    from activerecord.database_object import DatabaseObject
+    from activerecord.query_cache import QueryCache
+    from appclasses.access_database import Admin, Bicycle
+
+    for name, value in SETTINGS.items():
+        setattr(credentials, name, value)
+    for name, value in settings.items():
+        setattr(credentials, name, value)
+
+    # The pools keep the connections to the previous database.
+    for pool in connection_pool._pools.values():
+        pool.close_idle()
+    connection_pool._pools.clear()
+
+    database_functions._backend = None
+    backend = database_functions.get_backend()
+    for name in ("chain_gang.sql", "admin.sql"):
+        backend.execute_script(os.path.join(sql_dir, name))
+
+    if os.path.exists(credentials.DB_SCHEMA_CACHE):
+        os.remove(credentials.DB_SCHEMA_CACHE)
+
+    database = ConnectionDB()
+    DatabaseObject._database = database
+    DatabaseObject._schema_cache = None
+    DatabaseObject.set_query_cache(QueryCache())
+
+    # Created from the previous columns and objects.
+    for model in (Bicycle, Admin):
+        for name in ('_identity_map_instance', '_hydration_plans',
+                     '_record_classes'):
+            if name in model.__dict__:
+                delattr(model, name)
+
+    return database
+
+
+def new_bicycle(**kwargs):
+    u"""Creates a valid, unsaved bicycle.
+
+    Args:
+        **kwargs: The values that replace the defaults.
+
+    Returns:
+        Bicycle: The bicycle.
+    """
+
+    from appclasses.access_database import Bicycle
+
+    values = {
+        'brand': 'Brand',
+        'model': 'Model',
+        'year': 2020,
+        'category': 'Road',
+        'gender': 'Unisex',
+        'color': 'black',
+        'price': 100,
+        'weight_kg': '1.5',
+        'condition_id': 5,
+        'description': ''
+    }
+    values.update(kwargs)
+    return Bicycle(**values)
+
+
+def new_admin(**kwargs):
+    u"""Creates a valid, unsaved admin.
+
+    Args:
+        **kwargs: The values that replace the defaults.
+
+    Returns:
+        Admin: The admin.
+    """
+
+    from appclasses.access_database import Admin
+
+    values = {
+        'first_name': 'First',
+        'last_name': 'Last',
+        'email': 'admin@example.com',
+        'username': 'username000',
+        'password': VALID_PASSWORD,
+        'confirm_password': VALID_PASSWORD
+    }
+    values.update(kwargs)
+    return Admin(**values)
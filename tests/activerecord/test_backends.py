@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+u'''Tests of activerecord.backends (see fixtures.py).
+'''
+import sqlite3
+import unittest
+import mock
+
+from . import fixtures
+
+from activerecord import backends
+from activerecord.backends import (MySQLBackend, SQLiteBackend, SQLiteError,
+                                   translate_ddl, translate_sql)
+
+
+class TranslateSqlTestCase(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    # Covers translate_sql.
+    def test_translate_sql_placeholders(self):
+        self.assertEqual("SELECT * FROM bicycles WHERE id=? AND brand=?",
+                         translate_sql("SELECT * FROM bicycles "
+                                       "WHERE id=%s AND brand=%s"))
+
+    # Covers translate_sql.
+    def test_translate_sql_limit(self):
+        self.assertEqual("DELETE FROM bicycles WHERE id=?",
+                         translate_sql("DELETE FROM bicycles WHERE id=%s "
+                                       "LIMIT 1"))
+        self.assertEqual("UPDATE bicycles SET year=? WHERE id=?",
+                         translate_sql("UPDATE bicycles SET year=%s "
+                                       "WHERE id=%s LIMIT 1"))
+
+        # SELECT keeps its LIMIT.
+        self.assertEqual("SELECT * FROM bicycles LIMIT 1",
+                         translate_sql("SELECT * FROM bicycles LIMIT 1"))
+
+    # Covers translate_sql.
+    def test_translate_sql_for_update(self):
+        self.assertEqual("SELECT id FROM admins WHERE username IN (?)",
+                         translate_sql("SELECT id FROM admins "
+                                       "WHERE username IN (%s) FOR UPDATE"))
+
+    # Covers translate_sql.
+    def test_translate_sql_on_duplicate_key(self):
+        sql = "INSERT INTO bicycles (id, brand) VALUES (%s, %s) "
+        sql += "ON DUPLICATE KEY UPDATE brand=VALUES(brand)"
+
+        self.assertEqual("INSERT INTO bicycles (id, brand) VALUES (?, ?) "
+                         "ON CONFLICT DO UPDATE SET brand=excluded.brand",
+                         translate_sql(sql))
+
+    # Covers translate_sql.
+    def test_translate_sql_explain(self):
+        self.assertEqual("EXPLAIN QUERY PLAN SELECT * FROM bicycles",
+                         translate_sql("EXPLAIN SELECT * FROM bicycles"))
+        self.assertEqual("EXPLAIN QUERY PLAN SELECT 1",
+                         translate_sql("EXPLAIN QUERY PLAN SELECT 1"))
+
+    # Covers translate_sql.
+    def test_translate_sql_cache_limit(self):
+        with mock.patch.object(backends, '_MAX_TRANSLATIONS', 1):
+            translate_sql("SELECT 1")
+            translate_sql("SELECT 2")
+
+            self.assertEqual(["SELECT 2"], list(backends._translations))
+
+
+class TranslateDdlTestCase(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    # Covers translate_ddl.
+    def test_translate_ddl(self):
+        script = "# The admins.\n"
+        script += "USE chain_gang;\n"
+        script += "CREATE TABLE admins (\n"
+        script += "    id INT (11) AUTO_INCREMENT,\n"
+        script += "    username VARCHAR (255) NOT NULL,\n"
+        script += "    PRIMARY KEY (id),\n"
+        script += "    UNIQUE KEY index_username (username)\n"
+        script += ") ENGINE=InnoDB DEFAULT CHARSET=utf8;\n"
+        script += "ALTER TABLE admins ADD INDEX index_id (id, username);\n"
+
+        expected = "CREATE TABLE admins (\n"
+        expected += "    id INTEGER PRIMARY KEY AUTOINCREMENT,\n"
+        expected += "    username VARCHAR (255) COLLATE NOCASE NOT NULL\n"
+        expected += ");\n"
+        expected += "CREATE UNIQUE INDEX index_username ON admins (username);"
+        expected += "\n"
+        expected += "CREATE INDEX index_id ON admins (id, username);"
+
+        self.assertEqual(expected, translate_ddl(script).strip())
+
+    # Covers translate_ddl.
+    def test_translate_ddl_resources(self):
+        with open(fixtures.os.path.join(fixtures.sql_dir, "admin.sql")) as f:
+            script = translate_ddl(f.read())
+
+        # sqlite3 accepts the whole script.
+        connection = sqlite3.connect(':memory:')
+        connection.executescript(script)
+        rows = connection.execute("PRAGMA index_list(admins)").fetchall()
+        connection.close()
+
+        self.assertEqual(['index_username'], [row[1] for row in rows])
+
+
+class SQLiteBackendTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = SQLiteBackend()
+        self.backend.execute_script(
+            fixtures.os.path.join(fixtures.sql_dir, "chain_gang.sql"))
+        self.connection = self.backend.connect()
+
+    def tearDown(self):
+        self.connection.close()
+
+    # Covers error.
+    def test_error(self):
+        error = self.backend.error(
+            sqlite3.OperationalError("no such table: missing"))
+
+        self.assertIsInstance(error, SQLiteError)
+        self.assertEqual(self.backend.errorcode.ER_NO_SUCH_TABLE, error.errno)
+        self.assertIsNone(self.backend.error(Exception("Other.")).errno)
+
+    # Covers execute.
+    def test_execute_error(self):
+        cursor = self.connection.cursor()
+
+        with self.assertRaises(SQLiteError) as context:
+            cursor.execute("SELECT * FROM missing")
+        self.assertEqual(1146, context.exception.errno)
+
+    # Covers execute.
+    def test_execute_server_variable(self):
+        cursor = self.connection.cursor(dictionary=True)
+        cursor.execute("SELECT @@auto_increment_increment AS value")
+
+        self.assertEqual([{'value': 1}], cursor.fetchall())
+
+    # Covers execute.
+    def test_execute_multi_row_insert(self):
+        self.connection.raw.execute(
+            "CREATE TABLE parts (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "name TEXT)")
+        self.connection.raw.execute("INSERT INTO parts (name) VALUES ('a')")
+        cursor = self.connection.cursor()
+        cursor.execute("INSERT INTO parts (name) VALUES (%s), (%s)",
+                       ("Saddle", "Pedal"))
+
+        # The first generated ID, like MySQL.
+        self.assertEqual(2, cursor.lastrowid)
+        self.assertEqual(2, cursor.rowcount)
+
+    # Covers connect.
+    def test_connect_memory(self):
+        other = self.backend.connect()
+
+        # The connections to ':memory:' share the database.
+        self.assertIs(self.connection.raw, other.raw)
+        other.close()
+        self.assertEqual(2, len(self.connection.raw.execute(
+            "SELECT * FROM bicycles").fetchall()))
+
+    # Covers rollback.
+    def test_rollback(self):
+        self.connection.start_transaction()
+        self.connection.raw.execute("DELETE FROM bicycles")
+        self.connection.rollback()
+
+        self.assertFalse(self.connection.in_transaction)
+        self.assertEqual(2, len(self.connection.raw.execute(
+            "SELECT * FROM bicycles").fetchall()))
+
+
+class MySQLBackendTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = MySQLBackend("username", "userpassword", "localhost",
+                                    "chain_gang", port=3307)
+
+    def tearDown(self):
+        pass
+
+    # Covers connect.
+    def test_connect(self):
+        driver = mock.Mock()
+        with mock.patch.object(self.backend, 'load_driver',
+                               return_value=driver):
+            self.backend.connect()
+
+        driver.connect.assert_called_once_with(
+            user="username", password="userpassword", host="localhost",
+            port=3307, database="chain_gang")
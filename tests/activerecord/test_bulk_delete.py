@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+u'''Tests of DatabaseObject.delete_many() and delete_where(), with the Bicycle
+model, against the SQLite backend (see fixtures.py).
+'''
+import unittest
+import mock
+
+from . import fixtures
+
+from appclasses.access_database import Bicycle
+
+
+class BulkDeleteTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.database = fixtures.reset()
+        # IDs 3 to 5.
+        Bicycle.save_many([fixtures.new_bicycle(year=year)
+                           for year in (1998, 1999, 2000)])
+
+    def tearDown(self):
+        pass
+
+    def _ids(self):
+        return [bike.id for bike in Bicycle.find_all()]
+
+    # Covers delete_many.
+    def test_delete_many(self):
+        self.assertEqual(2, Bicycle.delete_many([3, 5, 3, 99]))
+        self.assertEqual([1, 2, 4], self._ids())
+
+    # Covers delete_many.
+    def test_delete_many_without_ids(self):
+        self.assertEqual(0, Bicycle.delete_many([]))
+
+    # Covers delete_many.
+    def test_delete_many_in_chunks(self):
+        with mock.patch.object(Bicycle, '_delete_chunk_size', 2), \
+                mock.patch.object(self.database, 'query',
+                                  wraps=self.database.query) as query:
+            self.assertEqual(5, Bicycle.delete_many([1, 2, 3, 4, 5]))
+
+        self.assertEqual(3, query.call_count)
+        # find_all() returns False when there are no records.
+        self.assertFalse(Bicycle.find_all())
+
+    # Covers delete_many.
+    def test_delete_many_error(self):
+        deletes = []
+
+        def query(sql, values=None, prepared=False):
+            deletes.append(sql)
+            if len(deletes) == 2:
+                return original(sql + " AND missing = 1", values)
+            return original(sql, values)
+
+        original = self.database.query
+        with mock.patch.object(Bicycle, '_delete_chunk_size', 2), \
+                mock.patch.object(self.database, 'query', side_effect=query):
+            self.assertFalse(Bicycle.delete_many([1, 2, 3, 4]))
+
+        # The first chunk was rolled back.
+        self.assertEqual([1, 2, 3, 4, 5], self._ids())
+
+    # Covers delete_many.
+    def test_delete_many_identity_map(self):
+        with mock.patch.object(Bicycle, '_identity_map_enabled', True):
+            bike = Bicycle.find_by_id(3)
+            Bicycle.delete_many([3])
+
+            self.assertFalse(Bicycle.find_by_id(3))
+        self.assertEqual(3, bike.id)
+
+    # Covers delete_many.
+    def test_delete_many_query_cache(self):
+        with mock.patch.object(Bicycle, '_cache_ttl', 30):
+            Bicycle.find_all()
+            Bicycle.delete_many([3])
+
+            self.assertEqual(4, len(Bicycle.find_all()))
+
+    # Covers delete_where.
+    def test_delete_where(self):
+        self.assertEqual(2, Bicycle.delete_where(year=[1998, 2000],
+                                                 brand="Brand"))
+        self.assertEqual([1, 2, 4], self._ids())
+
+    # Covers delete_where.
+    def test_delete_where_no_match(self):
+        self.assertEqual(0, Bicycle.delete_where(year=[]))
+        self.assertEqual(0, Bicycle.delete_where(description=None))
+        self.assertEqual(5, len(self._ids()))
+
+    # Covers delete_where.
+    def test_delete_where_without_conditions(self):
+        self.assertRaises(ValueError, Bicycle.delete_where)
+
+    # Covers delete_where.
+    def test_delete_where_unknown_column(self):
+        self.assertRaises(ValueError, Bicycle.delete_where, unknown=1)
+
+    # Covers _where_clause.
+    def test_where_clause(self):
+        where, values = Bicycle._where_clause(
+            {'year': (1998, 1999), 'description': None, 'brand': "Trek"})
+
+        self.assertEqual(
+            "brand=%s AND description IS NULL AND year IN (%s, %s)", where)
+        self.assertEqual(("Trek", 1998, 1999), values)
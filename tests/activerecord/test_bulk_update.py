@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+u'''Tests of DatabaseObject.update_all() and patch_by_id(), with the Bicycle
+and Admin models, against the SQLite backend (see fixtures.py).
+'''
+import unittest
+import mock
+
+from . import fixtures
+
+from appclasses.access_database import Admin, Bicycle
+
+
+class UpdateAllTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.database = fixtures.reset()
+
+    def tearDown(self):
+        pass
+
+    # Covers update_all.
+    def test_update_all(self):
+        self.assertEqual(1, Bicycle.update_all({'category': 'Road'},
+                                               price=99, color="red"))
+
+        self.assertEqual(99, Bicycle.find_by_id(2).price)
+        self.assertEqual("red", Bicycle.find_by_id(2).color)
+        self.assertEqual(1495, Bicycle.find_by_id(1).price)
+
+    # Covers update_all.
+    def test_update_all_records(self):
+        self.assertEqual(2, Bicycle.update_all({}, year=2020))
+        self.assertEqual([2020, 2020],
+                         [bike.year for bike in Bicycle.find_all()])
+
+    # Covers update_all.
+    def test_update_all_invalid_value(self):
+        self.assertFalse(Bicycle.update_all({}, brand=""))
+        self.assertEqual("Trek", Bicycle.find_by_id(1).brand)
+
+    # Covers update_all.
+    def test_update_all_invalid_columns(self):
+        self.assertRaises(ValueError, Bicycle.update_all, {})
+        self.assertRaises(ValueError, Bicycle.update_all, {}, id=5)
+        self.assertRaises(ValueError, Bicycle.update_all, {}, unknown=5)
+
+    # Covers update_all.
+    def test_update_all_identity_map(self):
+        with mock.patch.object(Bicycle, '_identity_map_enabled', True):
+            bike = Bicycle.find_by_id(1)
+            Bicycle.update_all({'id': 1}, price=99)
+
+            self.assertIsNot(bike, Bicycle.find_by_id(1))
+            self.assertEqual(99, Bicycle.find_by_id(1).price)
+
+    # Covers update_all.
+    def test_update_all_query_cache(self):
+        with mock.patch.object(Bicycle, '_cache_ttl', 30):
+            Bicycle.find_all()
+            Bicycle.update_all({}, price=99)
+
+            self.assertEqual([99, 99],
+                             [bike.price for bike in Bicycle.find_all()])
+
+
+class PatchByIdTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.database = fixtures.reset()
+
+    def tearDown(self):
+        pass
+
+    # Covers patch_by_id.
+    def test_patch_by_id(self):
+        with mock.patch.object(self.database, 'select') as select:
+            self.assertTrue(Bicycle.patch_by_id(2, price=450, color="Red"))
+        self.assertFalse(select.called)
+
+        bike = Bicycle.find_by_id(2)
+        self.assertEqual((450, "Red"), (bike.price, bike.color))
+
+    # Covers patch_by_id.
+    def test_patch_by_id_missing_record(self):
+        self.assertTrue(Bicycle.patch_by_id(99, price=450))
+        self.assertEqual(0, self.database.affected_rows)
+
+    # Covers patch_by_id.
+    def test_patch_by_id_invalid_value(self):
+        self.assertFalse(Bicycle.patch_by_id(1, model=""))
+        self.assertEqual("Emonda", Bicycle.find_by_id(1).model)
+
+    # Covers patch_by_id.
+    def test_patch_by_id_identity_map(self):
+        with mock.patch.object(Bicycle, '_identity_map_enabled', True):
+            bike = Bicycle.find_by_id(1)
+            Bicycle.patch_by_id(1, price=99)
+
+            self.assertIsNot(bike, Bicycle.find_by_id(1))
+
+    # Covers patch_by_id.
+    def test_patch_by_id_admin_username(self):
+        fixtures.new_admin().save()
+        fixtures.new_admin(username='username001').save()
+
+        # The username belongs to another admin.
+        self.assertFalse(Admin.patch_by_id(2, username='username000'))
+        # The admin keeps its own username.
+        self.assertTrue(Admin.patch_by_id(1, username='username000',
+                                          first_name="Other"))
+        self.assertEqual("Other", Admin.find_by_id(1).first_name)
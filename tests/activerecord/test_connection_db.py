@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+u'''Tests of activerecord.connection_db, against the SQLite backend (see
+fixtures.py).
+'''
+import threading
+import unittest
+import mock
+
+from . import fixtures
+
+from activerecord import database_functions
+from activerecord.backends import SQLiteConnection, SQLiteError
+from activerecord.connection_db import ConnectionDB
+
+
+class FakeConnection(object):
+    u'''Creates the prepared cursors, like MySQLConnection.cursor().
+    '''
+
+    def __init__(self):
+        self.cursors = []
+
+    def cursor(self, prepared=False):
+        cursor = FakePreparedCursor()
+        self.cursors.append(cursor)
+        return cursor
+
+
+class FakePreparedCursor(object):
+    u'''Prepares the statement when it receives a new string, like
+    MySQLCursorPrepared.execute().
+    '''
+
+    with_rows = True
+    column_names = ('id', )
+    rowcount = 1
+    lastrowid = None
+
+    def __init__(self):
+        self.operation = None
+        self.preparations = 0
+        self.executions = 0
+        self.closed = False
+
+    def execute(self, operation, params=()):
+        if operation is not self.operation:
+            self.operation = operation
+            self.preparations += 1
+        self.executions += 1
+
+    def fetchall(self):
+        return [(1, )]
+
+    def close(self):
+        self.closed = True
+
+
+class ConnectionDBTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.database = fixtures.reset()
+
+    def tearDown(self):
+        pass
+
+    # Covers query.
+    def test_query(self):
+        result = self.database.query("SELECT brand FROM bicycles WHERE id=%s",
+                                     (1, ))
+
+        self.assertEqual([{'brand': 'Trek'}], result)
+
+    # Covers query.
+    def test_query_error(self):
+        self.assertFalse(self.database.query("SELECT * FROM missing"))
+
+    # Covers select.
+    def test_select(self):
+        column_names, records = self.database.select(
+            "SELECT id, brand FROM bicycles ORDER BY id")
+
+        self.assertEqual(('id', 'brand'), column_names)
+        self.assertEqual([(1, 'Trek'), (2, 'Cannondale')], records)
+
+    # Covers server_variable.
+    def test_server_variable(self):
+        self.assertEqual(1, self.database.server_variable(
+            'auto_increment_increment'))
+
+        # Read only once.
+        with mock.patch.object(self.database, 'query') as query:
+            self.database.server_variable('auto_increment_increment')
+        self.assertFalse(query.called)
+
+    # Covers server_variable.
+    def test_server_variable_query_error(self):
+        with mock.patch.object(self.database, 'query', return_value=False):
+            self.assertIsNone(self.database.server_variable(
+                'max_allowed_packet'))
+
+        # The failure was not remembered.
+        self.assertEqual(64 * 1024 * 1024, self.database.server_variable(
+            'max_allowed_packet'))
+
+    # Covers server_variable.
+    def test_server_variable_invalid_name(self):
+        self.assertRaises(ValueError, self.database.server_variable,
+                          "version; DROP TABLE bicycles")
+
+
+class LazyConnectionTestCase(unittest.TestCase):
+
+    def setUp(self):
+        fixtures.reset()
+        self.patcher = mock.patch.object(
+            database_functions, 'db_connect',
+            wraps=database_functions.db_connect)
+        self.db_connect = self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    # Covers connection_db.
+    def test_connection_db(self):
+        database = ConnectionDB()
+        self.assertFalse(self.db_connect.called)
+
+        self.assertIs(database.connection_db, database.connection_db)
+        self.assertEqual(1, self.db_connect.call_count)
+
+    # Covers warm_up.
+    def test_warm_up(self):
+        database = ConnectionDB()
+        self.assertIsNone(database.warm_up(background=False))
+
+        self.assertEqual(1, self.db_connect.call_count)
+        database.query("SELECT 1")
+        self.assertEqual(1, self.db_connect.call_count)
+
+    # Covers warm_up.
+    def test_warm_up_background(self):
+        database = ConnectionDB()
+        database.warm_up().join()
+
+        self.assertEqual(1, self.db_connect.call_count)
+
+    # Covers warm_up.
+    def test_warm_up_pool(self):
+        fixtures.reset(DB_POOL_SIZE=3)
+        database = ConnectionDB()
+        database.warm_up(background=False)
+
+        stats = database.pool_stats()
+        self.assertEqual(1, stats['opened'])
+        self.assertEqual(1, stats['idle'])
+
+    # Covers warm_up.
+    def test_warm_up_error(self):
+        self.db_connect.side_effect = Exception("Refused.")
+        database = ConnectionDB()
+
+        # The error was shown by db_connect().
+        database.warm_up(background=False)
+        self.assertEqual(1, self.db_connect.call_count)
+
+    # Covers __init__.
+    def test_warm_up_setting(self):
+        fixtures.credentials.DB_WARM_UP = True
+        with mock.patch.object(ConnectionDB, 'warm_up') as warm_up:
+            ConnectionDB()
+
+        warm_up.assert_called_once_with()
+
+
+class ConnectionPoolTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.database = fixtures.reset(DB_POOL_SIZE=3, DB_POOL_TIMEOUT=0.1)
+
+    def tearDown(self):
+        pass
+
+    # Covers query.
+    def test_query_uses_the_pool(self):
+        self.database.query("SELECT 1")
+        self.database.query("SELECT 1")
+
+        stats = self.database.pool_stats()
+        self.assertEqual(1, stats['opened'])
+        self.assertEqual(0, stats['in_use'])
+
+    # Covers query.
+    def test_query_cursor_error(self):
+        error = SQLiteError("Connection lost.")
+        with mock.patch.object(SQLiteConnection, 'cursor', side_effect=error):
+            for _ in range(4):
+                self.assertFalse(self.database.query("SELECT 1"))
+
+        # The failed connections were closed, not kept idle.
+        stats = self.database.pool_stats()
+        self.assertEqual(0, stats['in_use'])
+        self.assertEqual(0, stats['opened'])
+        self.assertEqual([{'1': 1}], self.database.query("SELECT 1"))
+
+    # Covers query.
+    def test_query_unexpected_error(self):
+        with mock.patch.object(SQLiteConnection, 'cursor',
+                               side_effect=RuntimeError("Bug.")):
+            for _ in range(4):
+                self.assertRaises(RuntimeError, self.database.query,
+                                  "SELECT 1")
+
+        self.assertEqual(0, self.database.pool_stats()['in_use'])
+        self.assertTrue(self.database.query("SELECT 1"))
+
+    # Covers query.
+    def test_query_statement_error(self):
+        self.assertFalse(self.database.query("SELECT * FROM missing"))
+
+        # The server reported the error. The connection is still good.
+        stats = self.database.pool_stats()
+        self.assertEqual(1, stats['opened'])
+        self.assertEqual(1, stats['idle'])
+
+    # Covers select_iter.
+    def test_select_iter_cursor_error(self):
+        error = SQLiteError("Connection lost.")
+        with mock.patch.object(SQLiteConnection, 'cursor', side_effect=error):
+            for _ in range(4):
+                batches = self.database.select_iter("SELECT 1")
+                self.assertRaises(Exception, list, batches)
+
+        self.assertEqual(0, self.database.pool_stats()['in_use'])
+        self.assertEqual(1, len(list(self.database.select_iter("SELECT 1"))))
+
+    # Covers release.
+    def test_thread_checkout(self):
+        self.database = fixtures.reset(DB_POOL_SIZE=3,
+                                       DB_POOL_CHECKOUT='thread')
+        connections = []
+
+        def worker():
+            connections.append(self.database._acquire())
+            connections.append(self.database._acquire())
+            self.database.release()
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+
+        # The thread kept the same connection until release().
+        self.assertIs(connections[0], connections[1])
+        stats = self.database.pool_stats()
+        self.assertEqual(0, stats['in_use'])
+        self.assertEqual(1, stats['idle'])
+
+
+class PreparedStatementTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.database = fixtures.reset()
+        self.connection = FakeConnection()
+        self.patchers = [
+            mock.patch.object(self.database, '_acquire',
+                              return_value=self.connection),
+            mock.patch.object(self.database, '_release')
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+
+    # Covers query.
+    def test_query_prepared(self):
+        for _ in range(2):
+            result = self.database.query("SELECT id FROM bicycles WHERE id=%s",
+                                         (1, ), prepared=True)
+            self.assertEqual([{'id': 1}], result)
+
+        # The statement was prepared once and executed twice.
+        cursor, = self.connection.cursors
+        self.assertEqual(1, cursor.preparations)
+        self.assertEqual(2, cursor.executions)
+
+    # Covers _prepared_statement.
+    def test_query_prepared_cache_limit(self):
+        with mock.patch.object(self.database, '_max_statements', 1):
+            self.database.query("SELECT id FROM bicycles WHERE id=%s", (1, ),
+                                prepared=True)
+            self.database.query("SELECT id FROM admins WHERE id=%s", (1, ),
+                                prepared=True)
+
+        # The least recently used statement was closed.
+        self.assertEqual([True, False],
+                         [cursor.closed for cursor in self.connection.cursors])
+
+    # Covers _discard_prepared_statement.
+    def test_query_prepared_close(self):
+        self.database.query("SELECT id FROM bicycles WHERE id=%s", (1, ),
+                            prepared=True)
+        self.database._discard_prepared_statement(
+            self.connection, "SELECT id FROM bicycles WHERE id=%s")
+
+        self.assertTrue(self.connection.cursors[0].closed)
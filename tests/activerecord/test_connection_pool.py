@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+u'''Tests of activerecord.connection_pool, against the SQLite backend (see
+fixtures.py).
+'''
+import unittest
+import mock
+
+from . import fixtures
+
+from activerecord import database_functions
+from activerecord.connection_pool import ConnectionPool
+
+
+class ConnectionPoolTestCase(unittest.TestCase):
+
+    def setUp(self):
+        fixtures.reset()
+        self.pool = ConnectionPool(size=2, timeout=0.1)
+
+    def tearDown(self):
+        self.pool.close_idle()
+
+    # Covers checkout.
+    def test_checkout(self):
+        first = self.pool.checkout()
+        self.pool.checkin(first)
+
+        # The idle connection is reused.
+        self.assertIs(first, self.pool.checkout())
+        self.assertEqual(1, self.pool.stats()['opened'])
+
+    # Covers checkout.
+    def test_checkout_timeout(self):
+        self.pool.checkout()
+        self.pool.checkout()
+
+        self.assertRaises(Exception, self.pool.checkout)
+        self.assertEqual(2, self.pool.stats()['in_use'])
+
+    # Covers checkout.
+    def test_checkout_connection_error(self):
+        with mock.patch.object(database_functions, 'db_connect',
+                               side_effect=Exception("Refused.")):
+            self.assertRaises(Exception, self.pool.checkout)
+
+        # The slot was given back.
+        stats = self.pool.stats()
+        self.assertEqual(0, stats['opened'])
+        self.assertEqual(0, stats['in_use'])
+
+    # Covers checkin.
+    def test_checkin_discard(self):
+        first = self.pool.checkout()
+        self.pool.checkin(first, discard=True)
+
+        stats = self.pool.stats()
+        self.assertEqual(0, stats['opened'])
+        self.assertEqual(0, stats['idle'])
+        self.assertIsNot(first, self.pool.checkout())
+
+    # Covers shared.
+    def test_shared(self):
+        pool = ConnectionPool.shared(('test', ), size=2)
+
+        self.assertIs(pool, ConnectionPool.shared(('test', ), size=4))
+        self.assertEqual(4, pool.size)
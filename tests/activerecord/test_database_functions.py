@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+u'''Tests of activerecord.database_functions, against the SQLite backend (see
+fixtures.py).
+'''
+import unittest
+import mock
+
+from . import fixtures
+
+from activerecord import database_functions
+from activerecord.backends import MySQLBackend, SQLiteBackend
+
+
+class DatabaseFunctionsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        fixtures.reset()
+
+    def tearDown(self):
+        fixtures.reset()
+
+    # Covers get_backend.
+    def test_get_backend(self):
+        backend = database_functions.get_backend()
+
+        self.assertIsInstance(backend, SQLiteBackend)
+        self.assertIs(backend, database_functions.get_backend())
+
+    # Covers get_backend.
+    def test_get_backend_mysql(self):
+        fixtures.credentials.DB_BACKEND = 'mysql'
+        database_functions._backend = None
+
+        backend = database_functions.get_backend()
+
+        self.assertIsInstance(backend, MySQLBackend)
+        # Nothing is imported before the first connection.
+        self.assertIsNone(backend._driver)
+
+    # Covers get_backend.
+    def test_get_backend_unknown(self):
+        fixtures.credentials.DB_BACKEND = 'oracle'
+        database_functions._backend = None
+
+        self.assertRaises(ValueError, database_functions.get_backend)
+
+    # Covers load_driver.
+    def test_load_driver(self):
+        backend = MySQLBackend('username', 'userpassword', 'localhost',
+                               'chain_gang')
+        with mock.patch.object(database_functions, '_backend', backend):
+            driver = database_functions.load_driver()
+
+        self.assertEqual('mysql.connector', driver.__name__)
+        self.assertIs(driver, backend.load_driver())
+
+    # Covers db_setting.
+    def test_db_setting(self):
+        self.assertEqual('chain_gang', database_functions.db_setting('DB_NAME'))
+        self.assertEqual(7, database_functions.db_setting('DB_MISSING', 7))
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+u'''Tests of activerecord.database_object, with the Bicycle and Admin models,
+against the SQLite backend (see fixtures.py).
+'''
+import unittest
+import mock
+
+from . import fixtures
+
+from appclasses.access_database import Bicycle
+
+
+class DatabaseObjectTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.database = fixtures.reset()
+
+    def tearDown(self):
+        pass
+
+    # Covers save_many.
+    def test_save_many(self):
+        bikes = [fixtures.new_bicycle(model="Model {index}".format(index=index))
+                 for index in range(3)]
+
+        self.assertTrue(Bicycle.save_many(bikes))
+
+        # The table has IDs 1 and 2 already.
+        self.assertEqual([3, 4, 5], [bike.id for bike in bikes])
+        self.assertEqual("Model 1", Bicycle.find_by_id(4).model)
+
+    # Covers save_many.
+    def test_save_many_with_errors(self):
+        bikes = [fixtures.new_bicycle(), fixtures.new_bicycle(brand="")]
+
+        self.assertFalse(Bicycle.save_many(bikes))
+
+        self.assertEqual([], bikes[0].errors)
+        self.assertEqual(["Brand cannot be blank."], bikes[1].errors)
+        self.assertEqual(2, len(Bicycle.find_all()))
+
+    # Covers save_many.
+    def test_save_many_in_batches(self):
+        bikes = [fixtures.new_bicycle() for _ in range(5)]
+
+        with mock.patch.object(Bicycle, '_bulk_max_rows', 2), \
+                mock.patch.object(self.database, 'query',
+                                  wraps=self.database.query) as query:
+            self.assertTrue(Bicycle.save_many(bikes))
+
+        # 2 + 2 + 1 rows (the other queries read the server variables).
+        inserts = [call for call in query.call_args_list
+                   if call[0][0].startswith("INSERT")]
+        self.assertEqual(3, len(inserts))
+        self.assertEqual([3, 4, 5, 6, 7], [bike.id for bike in bikes])
+
+    # Covers save_many.
+    def test_save_many_server_variable_error(self):
+        bikes = [fixtures.new_bicycle()]
+
+        with mock.patch.object(self.database, 'server_variable',
+                               return_value=None):
+            self.assertFalse(Bicycle.save_many(bikes))
+
+        self.assertEqual(2, len(Bicycle.find_all()))
+
+    # Covers save_many.
+    def test_save_many_without_objects(self):
+        self.assertTrue(Bicycle.save_many([]))
+
+    # Covers find_in_batches.
+    def test_find_in_batches(self):
+        Bicycle.save_many([fixtures.new_bicycle() for _ in range(3)])
+
+        batches = list(Bicycle.find_in_batches(batch_size=2))
+
+        self.assertEqual([2, 2, 1], [len(batch) for batch in batches])
+        self.assertEqual([1, 2, 3, 4, 5],
+                         [bike.id for batch in batches for bike in batch])
+
+    # Covers find_each.
+    def test_find_each(self):
+        bikes = Bicycle.find_each(batch_size=1)
+
+        self.assertEqual("Trek", next(bikes).brand)
+        self.assertEqual("Cannondale", next(bikes).brand)
+        self.assertRaises(StopIteration, next, bikes)
+
+    # Covers find_each.
+    def test_find_each_stopped_early(self):
+        for bike in Bicycle.find_each(batch_size=1):
+            break
+
+        # The connection can be used again.
+        self.assertEqual(2, len(Bicycle.find_all()))
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+u'''Tests of the tracking of changed columns, with the Bicycle and Admin
+models, against the SQLite backend (see fixtures.py).
+'''
+import unittest
+import mock
+
+from . import fixtures
+
+from appclasses.access_database import Admin, Bicycle
+
+
+class DirtyTrackingTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.database = fixtures.reset()
+
+    def tearDown(self):
+        pass
+
+    def _updates(self, query):
+        return [call for call in query.call_args_list
+                if call[0][0].startswith("UPDATE")]
+
+    # Covers changes.
+    def test_changes(self):
+        bike = Bicycle.find_by_id(1)
+        self.assertEqual({}, bike.changes())
+
+        bike.model = "Domane"
+        self.assertEqual({'model': ("Emonda", "Domane")}, bike.changes())
+
+    # Covers changes.
+    def test_changes_new_object(self):
+        changes = fixtures.new_bicycle().changes()
+
+        self.assertEqual(set(Bicycle._db_columns) - set(['id']), set(changes))
+        self.assertEqual((None, "Brand"), changes['brand'])
+
+    # Covers changed_columns.
+    def test_changed_columns(self):
+        bike = Bicycle.find_by_id(1)
+        bike.year = 2020
+        bike.brand = "Specialized"
+
+        self.assertEqual(['brand', 'year'], bike.changed_columns())
+
+    # Covers _update.
+    def test_update_changed_columns(self):
+        bike = Bicycle.find_by_id(1)
+        bike.price = 1500
+
+        with mock.patch.object(self.database, 'query',
+                               wraps=self.database.query) as query:
+            self.assertTrue(bike.save())
+
+        updates = self._updates(query)
+        self.assertEqual(1, len(updates))
+        self.assertEqual("UPDATE bicycles SET price=%s WHERE id=%s LIMIT 1",
+                         updates[0][0][0])
+        self.assertEqual((1500, 1), updates[0][1]['values'])
+        self.assertEqual([], bike.changed_columns())
+        self.assertEqual(1500, Bicycle.find_by_id(1).price)
+
+    # Covers _update.
+    def test_update_unchanged(self):
+        bike = Bicycle.find_by_id(1)
+
+        with mock.patch.object(self.database, 'query') as query:
+            self.assertTrue(bike.save())
+
+        self.assertFalse(query.called)
+
+    # Covers _update.
+    def test_update_invalid(self):
+        bike = Bicycle.find_by_id(1)
+        bike.brand = ""
+
+        self.assertFalse(bike.save())
+        self.assertEqual(['brand'], bike.changed_columns())
+
+    # Covers _create.
+    def test_create_snapshot(self):
+        bike = fixtures.new_bicycle()
+        bike.save()
+
+        self.assertEqual([], bike.changed_columns())
+
+    # Covers save_many.
+    def test_save_many_snapshot(self):
+        bikes = [fixtures.new_bicycle()]
+        Bicycle.save_many(bikes)
+
+        self.assertEqual([], bikes[0].changed_columns())
+
+    # Covers Admin._update.
+    def test_admin_update_unchanged(self):
+        fixtures.new_admin().save()
+        admin = Admin.find_by_id(1)
+
+        # The password is None, so it is not being changed.
+        self.assertEqual([], admin.changed_columns())
+        with mock.patch.object(self.database, 'query') as query:
+            self.assertTrue(admin.save())
+        self.assertFalse(query.called)
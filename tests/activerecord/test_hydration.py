@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+u'''Tests of the hydration of the finder results (DatabaseObject._hydrate()
+and Record._hydrate()), with the Bicycle model, against the SQLite backend
+(see fixtures.py).
+'''
+import unittest
+
+from . import fixtures
+
+from appclasses.access_database import Bicycle
+
+
+class TaggedBicycle(Bicycle):
+
+    def __init__(self, **kwargs):
+        super(TaggedBicycle, self).__init__(**kwargs)
+        self.tags = []
+
+
+class HydrationTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.database = fixtures.reset()
+
+    def tearDown(self):
+        pass
+
+    # Covers _hydrate.
+    def test_hydrate_same_as_instantiate(self):
+        column_names, rows = self.database.select(
+            "SELECT * FROM bicycles ORDER BY id")
+        records = self.database.query("SELECT * FROM bicycles ORDER BY id")
+
+        hydrated = Bicycle._hydrate(column_names, rows)
+        instantiated = [Bicycle._instantiate(record) for record in records]
+
+        # _original may list the columns in another order.
+        for obj in instantiated + hydrated:
+            self.assertFalse(obj.changed_columns())
+            del obj._original
+        self.assertEqual([vars(obj) for obj in instantiated],
+                         [vars(obj) for obj in hydrated])
+
+    # Covers _hydrate.
+    def test_hydrate_unknown_columns(self):
+        bikes = Bicycle._hydrate(('id', 'unknown', 'brand'),
+                                 [(1, 'x', "Trek")])
+
+        self.assertEqual("Trek", bikes[0].brand)
+        self.assertFalse(hasattr(bikes[0], 'unknown'))
+
+    # Covers _hydrate.
+    def test_hydrate_repeated_columns(self):
+        bikes = Bicycle._hydrate(('brand', 'brand'), [("Trek", "Cannondale")])
+
+        # The last one wins, like a dictionary.
+        self.assertEqual("Cannondale", bikes[0].brand)
+
+    # Covers _hydrate.
+    def test_hydrate_one_column(self):
+        bikes = Bicycle._hydrate(('brand', ), [("Trek", ), ("Cannondale", )])
+
+        self.assertEqual(["Trek", "Cannondale"], [bike.brand for bike in bikes])
+        self.assertEqual(frozenset(['brand']), bikes[0]._loaded_columns)
+
+    # Covers _hydrate.
+    def test_hydrate_mutable_defaults(self):
+        first, second = TaggedBicycle._hydrate(('id', ), [(1, ), (2, )])
+        first.tags.append("road")
+
+        self.assertEqual([], second.tags)
+        self.assertEqual([], TaggedBicycle().tags)
+
+    # Covers _hydration_plan.
+    def test_hydration_plan_cached(self):
+        plan = Bicycle._hydration_plan(('id', 'brand'))
+
+        self.assertIs(plan, Bicycle._hydration_plan(('id', 'brand')))
+        self.assertIsNot(plan, Bicycle._hydration_plan(('brand', 'id')))
+
+    # Covers Record._hydrate.
+    def test_record_hydrate(self):
+        BicycleRecord = Bicycle.record_class()
+        bikes = BicycleRecord._hydrate(('brand', 'unknown'), [("Trek", 'x')])
+
+        self.assertEqual("Trek", bikes[0].brand)
+        self.assertIsNone(bikes[0].id)
+        self.assertEqual([], bikes[0].errors)
+
+    # Covers select_iter.
+    def test_select_iter(self):
+        batches = list(self.database.select_iter(
+            "SELECT id FROM bicycles ORDER BY id", batch_size=1))
+
+        self.assertEqual([(('id', ), [(1, )]), (('id', ), [(2, )])], batches)
+
+    # Covers query_iter.
+    def test_query_iter(self):
+        batches = list(self.database.query_iter(
+            "SELECT id FROM bicycles ORDER BY id", batch_size=1))
+
+        self.assertEqual([[{'id': 1}], [{'id': 2}]], batches)
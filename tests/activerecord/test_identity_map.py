@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+u'''Tests of activerecord.identity_map and of the identity map of
+DatabaseObject.find_by_id (see fixtures.py).
+'''
+import gc
+import unittest
+import mock
+
+from . import fixtures
+
+from activerecord.identity_map import IdentityMap
+from appclasses.access_database import Bicycle
+
+
+class Record(object):
+    pass
+
+
+class IdentityMapTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.identity_map = IdentityMap(miss_ttl=5.0)
+
+    def tearDown(self):
+        pass
+
+    # Covers add.
+    def test_add(self):
+        record = Record()
+        self.identity_map.add(('bicycles', 1), record)
+
+        self.assertIs(record, self.identity_map.get(('bicycles', 1)))
+
+    # Covers add.
+    def test_add_weak_reference(self):
+        self.identity_map.add(('bicycles', 1), Record())
+        gc.collect()
+
+        self.assertIsNone(self.identity_map.get(('bicycles', 1)))
+        self.assertEqual(0, len(self.identity_map))
+
+    # Covers is_known_miss.
+    def test_is_known_miss(self):
+        self.identity_map.add_miss(('bicycles', 9))
+
+        self.assertTrue(self.identity_map.is_known_miss(('bicycles', 9)))
+        with mock.patch('time.time', return_value=2 ** 40):
+            self.assertFalse(self.identity_map.is_known_miss(('bicycles', 9)))
+
+    # Covers evict.
+    def test_evict(self):
+        record = Record()
+        self.identity_map.add(('bicycles', 1), record)
+        self.identity_map.evict(('bicycles', 1))
+
+        self.assertIsNone(self.identity_map.get(('bicycles', 1)))
+
+
+class FindByIdTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.database = fixtures.reset()
+        self.patcher = mock.patch.object(Bicycle, '_identity_map_enabled',
+                                         True)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    # Covers find_by_id.
+    def test_find_by_id(self):
+        bike = Bicycle.find_by_id(1)
+
+        with mock.patch.object(self.database, 'select') as select:
+            self.assertIs(bike, Bicycle.find_by_id('1'))
+        select.assert_not_called()
+
+    # Covers find_by_id.
+    def test_find_by_id_miss(self):
+        self.assertFalse(Bicycle.find_by_id(99))
+
+        with mock.patch.object(self.database, 'select') as select:
+            self.assertFalse(Bicycle.find_by_id(99))
+        select.assert_not_called()
+
+    # Covers find_by_id.
+    def test_find_by_id_after_save(self):
+        bike = fixtures.new_bicycle()
+        bike.save()
+
+        self.assertIs(bike, Bicycle.find_by_id(bike.id))
+
+    # Covers find_by_id.
+    def test_find_by_id_after_delete(self):
+        bike = Bicycle.find_by_id(1)
+        bike.delete()
+
+        self.assertFalse(Bicycle.find_by_id(1))
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+u'''Tests of activerecord.instrumentation and of the listeners of
+ConnectionDB, against the SQLite backend (see fixtures.py).
+'''
+import unittest
+
+from . import fixtures
+
+from activerecord.instrumentation import (QueryEvent, QueryStats,
+                                          estimate_bytes, fingerprint)
+from appclasses.access_database import Bicycle
+
+
+def event(sql="SELECT 1", duration=0.002, error=None):
+    return QueryEvent(sql=sql, values=None, duration=duration,
+                      rows_returned=2, rows_affected=0, bytes_fetched=10,
+                      error=error)
+
+
+class FingerprintTestCase(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    # Covers fingerprint.
+    def test_fingerprint(self):
+        self.assertEqual(
+            "SELECT * FROM bicycles WHERE brand = ? AND price > ?",
+            fingerprint("SELECT *  FROM bicycles\nWHERE brand = 'O''Neil' "
+                        "AND price > -1.5e3"))
+
+    # Covers fingerprint.
+    def test_fingerprint_placeholders(self):
+        self.assertEqual(fingerprint("SELECT * FROM t2 WHERE id=%s"),
+                         fingerprint("SELECT * FROM t2 WHERE id=7"))
+
+    # Covers fingerprint.
+    def test_fingerprint_lists(self):
+        self.assertEqual("SELECT * FROM bicycles WHERE id IN (?+)",
+                         fingerprint("SELECT * FROM bicycles WHERE id IN "
+                                     "(1, 2, 3)"))
+        self.assertEqual("INSERT INTO t (a, b) VALUES (?+)",
+                         fingerprint("INSERT INTO t (a, b) VALUES "
+                                     "(%s, %s), (%s, %s), (%s, %s)"))
+
+    # Covers estimate_bytes.
+    def test_estimate_bytes(self):
+        self.assertEqual(8 + 4 + 1 + 3,
+                         estimate_bytes([(1, "Trek", None, b"abc")]))
+        self.assertEqual(8, estimate_bytes([{'id': 1}]))
+
+
+class QueryStatsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.stats = QueryStats(buckets=(0.001, 0.01))
+
+    def tearDown(self):
+        pass
+
+    # Covers __call__.
+    def test_call(self):
+        self.stats(event("SELECT 1", duration=0.0005))
+        self.stats(event("SELECT 2", duration=0.02, error=Exception()))
+
+        entry = self.stats.snapshot()["SELECT ?"]
+        self.assertEqual(2, entry['calls'])
+        self.assertEqual(1, entry['errors'])
+        self.assertEqual(0.0005, entry['min_time'])
+        self.assertEqual(0.02, entry['max_time'])
+        self.assertAlmostEqual(0.01025, entry['avg_time'])
+        self.assertEqual([(0.001, 1), (0.01, 0), (None, 1)],
+                         entry['histogram'])
+        self.assertEqual(4, entry['rows_returned'])
+        self.assertEqual(20, entry['bytes_fetched'])
+
+    # Covers snapshot.
+    def test_snapshot_copy(self):
+        self.stats(event())
+        self.stats.snapshot()["SELECT ?"]['calls'] = 10
+
+        self.assertEqual(1, self.stats.snapshot()["SELECT ?"]['calls'])
+
+    # Covers reset.
+    def test_reset(self):
+        self.stats(event())
+        self.stats.reset()
+
+        self.assertEqual({}, self.stats.snapshot())
+
+
+class ListenerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.database = fixtures.reset()
+        self.events = []
+        self.database.add_listener(self.events.append)
+
+    def tearDown(self):
+        self.database.remove_listener(self.events.append)
+
+    # Covers add_listener.
+    def test_add_listener(self):
+        Bicycle.find_all()
+
+        self.assertEqual(1, len(self.events))
+        self.assertEqual("SELECT * FROM bicycles", self.events[0].sql.strip())
+        self.assertEqual(2, self.events[0].rows_returned)
+        self.assertTrue(self.events[0].bytes_fetched > 0)
+        self.assertIsNone(self.events[0].error)
+
+    # Covers add_listener.
+    def test_add_listener_write(self):
+        Bicycle.patch_by_id(1, price=99)
+
+        self.assertEqual(1, self.events[-1].rows_affected)
+        self.assertEqual(0, self.events[-1].rows_returned)
+
+    # Covers add_listener.
+    def test_add_listener_error(self):
+        self.database.query("SELECT * FROM missing")
+
+        self.assertIsNotNone(self.events[-1].error)
+
+    # Covers add_listener.
+    def test_add_listener_select_iter(self):
+        list(self.database.select_iter("SELECT * FROM bicycles",
+                                       batch_size=1))
+
+        self.assertEqual(1, len(self.events))
+        self.assertEqual(2, self.events[0].rows_returned)
+
+    # Covers _notify.
+    def test_failing_listener(self):
+        def failing(event):
+            raise RuntimeError("Bug.")
+
+        self.database.add_listener(failing)
+        try:
+            # The query still works.
+            self.assertEqual(2, len(Bicycle.find_all()))
+        finally:
+            self.database.remove_listener(failing)
+
+    # Covers remove_listener.
+    def test_remove_listener(self):
+        self.database.remove_listener(self.events.append)
+        Bicycle.find_all()
+
+        self.assertEqual([], self.events)
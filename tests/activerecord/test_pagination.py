@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+u'''Tests of DatabaseObject.page_after(), with the Bicycle model, against the
+SQLite backend (see fixtures.py).
+'''
+import unittest
+
+from . import fixtures
+
+from appclasses.access_database import Bicycle
+
+
+class PageAfterTestCase(unittest.TestCase):
+
+    def setUp(self):
+        fixtures.reset()
+        # IDs 3 to 6, with prices 300, 100, 300 and 200. The seeded bicycles
+        # cost 1495 and 1999.
+        Bicycle.save_many([fixtures.new_bicycle(price=price)
+                           for price in (300, 100, 300, 200)])
+
+    def tearDown(self):
+        pass
+
+    def _pages(self, **kwargs):
+        pages = []
+        token = None
+        while True:
+            bikes, token = Bicycle.page_after(token, **kwargs)
+            pages.append([bike.id for bike in bikes])
+            if token is None:
+                return pages
+
+    # Covers page_after.
+    def test_page_after(self):
+        self.assertEqual([[1, 2, 3, 4], [5, 6]], self._pages(limit=4))
+
+    # Covers page_after.
+    def test_page_after_id(self):
+        bikes, token = Bicycle.page_after(4, limit=1)
+
+        self.assertEqual([5], [bike.id for bike in bikes])
+
+    # Covers page_after.
+    def test_page_after_order_by(self):
+        # Ties (300) are ordered by ID and none is repeated or skipped.
+        self.assertEqual([[4, 6], [3, 5], [1, 2]],
+                         self._pages(limit=2, order_by='price'))
+
+    # Covers page_after.
+    def test_page_after_descending(self):
+        self.assertEqual([[2, 1, 5], [3, 6, 4]],
+                         self._pages(limit=3, order_by='price',
+                                     descending=True))
+
+    # Covers page_after.
+    def test_page_after_last_page_full(self):
+        self.assertEqual([[1, 2, 3, 4, 5, 6]], self._pages(limit=6))
+
+    # Covers page_after.
+    def test_page_after_columns(self):
+        bikes, _ = Bicycle.page_after(limit=1, order_by='price',
+                                      columns=['brand'])
+
+        self.assertEqual(100, bikes[0].price)
+        self.assertFalse(hasattr(bikes[0], 'model'))
+
+    # Covers page_after.
+    def test_page_after_invalid_limit(self):
+        for limit in (0, -1):
+            self.assertRaises(ValueError, Bicycle.page_after, limit=limit)
+
+    # Covers page_after.
+    def test_page_after_unknown_column(self):
+        self.assertRaises(ValueError, Bicycle.page_after, order_by='unknown')
+
+    # Covers _decode_page_token.
+    def test_page_after_other_ordering(self):
+        _, token = Bicycle.page_after(limit=1, order_by='price')
+
+        self.assertRaises(ValueError, Bicycle.page_after, token,
+                          order_by='year')
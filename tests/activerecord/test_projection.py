@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+u'''Tests of the finders' columns argument, with the Bicycle model, against the
+SQLite backend (see fixtures.py).
+'''
+import unittest
+import mock
+
+from . import fixtures
+
+from appclasses.access_database import Bicycle
+
+
+class ProjectionTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.database = fixtures.reset()
+
+    def tearDown(self):
+        pass
+
+    # Covers find_all.
+    def test_find_all(self):
+        with mock.patch.object(self.database, 'select',
+                               wraps=self.database.select) as select:
+            bikes = Bicycle.find_all(columns=['brand'])
+
+        self.assertTrue(select.call_args[0][0].startswith(
+            "SELECT id, brand FROM bicycles"))
+        self.assertEqual([1, 2], [bike.id for bike in bikes])
+        self.assertEqual("Trek", bikes[0].brand)
+        self.assertEqual(frozenset(['id', 'brand']), bikes[0]._loaded_columns)
+
+    # Covers find_all.
+    def test_find_all_unknown_column(self):
+        self.assertRaises(ValueError, Bicycle.find_all, columns=['unknown'])
+
+    # Covers find_all.
+    def test_find_all_writable_record_class(self):
+        self.assertRaises(ValueError, Bicycle.find_all, columns=['brand'],
+                          record_class=Bicycle.record_class())
+
+    # Covers find_all.
+    def test_find_all_read_only_record_class(self):
+        bikes = Bicycle.find_all(
+            columns=['brand'],
+            record_class=Bicycle.record_class(read_only=True))
+
+        self.assertEqual("Trek", bikes[0].brand)
+        self.assertIsNone(bikes[0].model)
+
+    # Covers find_by_id.
+    def test_find_by_id(self):
+        bike = Bicycle.find_by_id(2, columns=['model'])
+
+        self.assertEqual(2, bike.id)
+        self.assertFalse(hasattr(bike, 'brand'))
+
+    # Covers find_each.
+    def test_find_each(self):
+        bikes = list(Bicycle.find_each(batch_size=1, columns=['brand']))
+
+        self.assertEqual(["Trek", "Cannondale"], [bike.brand for bike in bikes])
+
+    # Covers __getattr__.
+    def test_getattr_not_loaded(self):
+        bike = Bicycle.find_by_id(1, columns=['brand'])
+
+        with self.assertRaises(AttributeError) as context:
+            bike.model
+        self.assertIn("was not loaded", str(context.exception))
+
+    # Covers save.
+    def test_save(self):
+        bike = Bicycle.find_by_id(1, columns=['brand'])
+        bike.brand = "Specialized"
+
+        self.assertTrue(bike.save())
+        saved = Bicycle.find_by_id(1)
+        self.assertEqual("Specialized", saved.brand)
+        self.assertEqual("Emonda", saved.model)
+
+    # Covers save.
+    def test_save_column_not_loaded(self):
+        bike = Bicycle.find_by_id(1, columns=['brand'])
+        bike.model = "Domane"
+
+        self.assertFalse(bike.save())
+        self.assertEqual(["model was not loaded and cannot be saved."],
+                         bike.errors)
+        self.assertEqual("Emonda", Bicycle.find_by_id(1).model)
+
+    # Covers save.
+    def test_save_validates_missing_columns(self):
+        bike = Bicycle.find_by_id(1, columns=['brand'])
+        bike.brand = ""
+
+        self.assertFalse(bike.save())
+        self.assertEqual(["Brand cannot be blank."], bike.errors)
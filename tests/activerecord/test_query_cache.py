@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+u'''Tests of activerecord.query_cache and of the cache used by
+DatabaseObject.find_by_sql(), against the SQLite backend (see fixtures.py).
+'''
+import unittest
+import mock
+
+from . import fixtures
+
+from activerecord.query_cache import QueryCache
+from appclasses.access_database import Bicycle
+
+
+class QueryCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = QueryCache(max_entries=2)
+
+    def tearDown(self):
+        pass
+
+    # Covers get and set.
+    def test_get(self):
+        self.cache.set('bicycles', "SELECT  *\n FROM bicycles", None, [1], 30)
+
+        self.assertEqual((True, [1]),
+                         self.cache.get('bicycles', "SELECT * FROM bicycles"))
+        self.assertEqual((False, None),
+                         self.cache.get('bicycles', "SELECT 1"))
+        self.assertEqual(1, self.cache.stats()['hits'])
+        self.assertEqual(1, self.cache.stats()['misses'])
+
+    # Covers normalize.
+    def test_normalize(self):
+        self.assertEqual(
+            "SELECT * FROM bicycles WHERE brand = 'A  B' AND model = \"C\tD\"",
+            QueryCache.normalize(" SELECT *\n FROM bicycles  WHERE brand = "
+                                 "'A  B' AND model = \"C\tD\" "))
+        self.assertEqual(
+            "SELECT 'It''s  ok', 'a\\'  b'",
+            QueryCache.normalize("SELECT  'It''s  ok',  'a\\'  b'"))
+
+    # Covers get.
+    def test_get_string_literal(self):
+        self.cache.set('bicycles',
+                       "SELECT * FROM bicycles WHERE brand = 'A  B'", None,
+                       [1], 30)
+
+        self.assertFalse(self.cache.get(
+            'bicycles', "SELECT * FROM bicycles WHERE brand = 'A B'")[0])
+        self.assertTrue(self.cache.get(
+            'bicycles', "SELECT *  FROM bicycles WHERE brand = 'A  B'")[0])
+
+    # Covers get.
+    def test_get_expired(self):
+        self.cache.set('bicycles', "SELECT 1", None, [1], 0)
+
+        self.assertEqual((False, None), self.cache.get('bicycles', "SELECT 1"))
+        self.assertEqual(0, self.cache.stats()['entries'])
+
+    # Covers set.
+    def test_set_evicts_least_recently_used(self):
+        self.cache.set('bicycles', "SELECT 1", None, [1], 30)
+        self.cache.set('bicycles', "SELECT 2", None, [2], 30)
+        self.cache.get('bicycles', "SELECT 1")
+        self.cache.set('bicycles', "SELECT 3", None, [3], 30)
+
+        self.assertTrue(self.cache.get('bicycles', "SELECT 1")[0])
+        self.assertFalse(self.cache.get('bicycles', "SELECT 2")[0])
+        self.assertEqual(1, self.cache.stats()['evictions'])
+
+    # Covers set.
+    def test_set_too_big(self):
+        cache = QueryCache(max_bytes=10)
+        cache.set('bicycles', "SELECT 1", None, [1], 30)
+
+        self.assertEqual(0, cache.stats()['entries'])
+
+    # Covers invalidate_table.
+    def test_invalidate_table(self):
+        self.cache.set('bicycles', "SELECT 1", None, [1], 30)
+        self.cache.set('admins', "SELECT 2", None, [2], 30)
+        self.cache.invalidate_table('bicycles')
+
+        self.assertFalse(self.cache.get('bicycles', "SELECT 1")[0])
+        self.assertTrue(self.cache.get('admins', "SELECT 2")[0])
+        self.assertEqual(1, self.cache.stats()['invalidations'])
+
+
+class FindBySqlCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.database = fixtures.reset()
+        self.patcher = mock.patch.object(Bicycle, '_cache_ttl', 30)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    # Covers find_by_sql.
+    def test_find_by_sql_cached(self):
+        Bicycle.find_all()
+
+        with mock.patch.object(self.database, 'select') as select:
+            bikes = Bicycle.find_all()
+
+        self.assertFalse(select.called)
+        self.assertEqual(["Trek", "Cannondale"],
+                         [bike.brand for bike in bikes])
+
+    # Covers find_by_sql.
+    def test_find_by_sql_failed_query_not_cached(self):
+        with mock.patch.object(self.database, 'select', return_value=False):
+            self.assertFalse(Bicycle.find_all())
+
+        # The query is sent again, now that the database answers.
+        self.assertEqual(2, len(Bicycle.find_all()))
+
+    # Covers find_by_sql.
+    def test_find_by_sql_invalidated_on_save(self):
+        Bicycle.find_all()
+        fixtures.new_bicycle().save()
+
+        self.assertEqual(3, len(Bicycle.find_all()))
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+u'''Tests of activerecord.records, with the Bicycle and Admin models, against
+the SQLite backend (see fixtures.py).
+'''
+import unittest
+
+from . import fixtures
+
+from activerecord.records import ReadOnlyRecord, Record, record_class
+from appclasses.access_database import Admin, Bicycle
+
+
+class RecordsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.database = fixtures.reset()
+
+    def tearDown(self):
+        pass
+
+    # Covers record_class.
+    def test_record_class(self):
+        BicycleRecord = record_class(Bicycle)
+
+        self.assertTrue(issubclass(BicycleRecord, Record))
+        self.assertEqual('BicycleRecord', BicycleRecord.__name__)
+        self.assertEqual(tuple(Bicycle._db_columns), BicycleRecord._columns)
+
+        bike = BicycleRecord(brand="Trek")
+        self.assertEqual("Trek", bike.brand)
+        self.assertIsNone(bike.model)
+        self.assertFalse(hasattr(bike, '__dict__'))
+
+    # Covers record_class.
+    def test_record_class_cached(self):
+        self.assertIs(Bicycle.record_class(), Bicycle.record_class())
+        self.assertIsNot(Bicycle.record_class(),
+                         Bicycle.record_class(read_only=True))
+        self.assertIsNot(Bicycle.record_class(), Admin.record_class())
+
+    # Covers find_all.
+    def test_find_all(self):
+        bikes = Bicycle.find_all(record_class=Bicycle.record_class())
+
+        self.assertIsInstance(bikes[0], Bicycle.record_class())
+        self.assertEqual(["Trek", "Cannondale"], [bike.brand for bike in bikes])
+        self.assertEqual([], bikes[0].errors)
+
+    # Covers find_each.
+    def test_find_each(self):
+        bikes = list(Bicycle.find_each(
+            batch_size=1, record_class=Bicycle.record_class(read_only=True)))
+
+        self.assertEqual([1, 2], [bike.id for bike in bikes])
+
+    # Covers as_dict.
+    def test_as_dict(self):
+        bike = Bicycle.find_all(record_class=Bicycle.record_class())[0]
+
+        self.assertEqual(set(Bicycle._db_columns), set(bike.as_dict()))
+        self.assertEqual("Trek", bike.as_dict()['brand'])
+
+    # Covers to_model.
+    def test_to_model(self):
+        bike = Bicycle.find_all(record_class=Bicycle.record_class())[0]
+        model = bike.to_model(color="red")
+
+        self.assertIsInstance(model, Bicycle)
+        self.assertEqual(1, model.id)
+        self.assertEqual("red", model.color)
+
+    # Covers validate.
+    def test_validate(self):
+        bike = Bicycle.record_class()(brand="")
+
+        self.assertIn("Brand cannot be blank.", bike.validate())
+        self.assertEqual(bike.errors, bike.validate())
+
+    # Covers save.
+    def test_save(self):
+        values = fixtures.new_bicycle().attributes()
+        bike = Bicycle.record_class()(**values)
+
+        self.assertTrue(bike.save())
+        self.assertEqual(3, bike.id)
+        self.assertEqual("Brand", Bicycle.find_by_id(3).brand)
+
+    # Covers save.
+    def test_save_admin(self):
+        values = fixtures.new_admin().attributes()
+        admin = Admin.record_class()(**values)
+
+        self.assertTrue(admin.save(password=fixtures.VALID_PASSWORD,
+                                   confirm_password=fixtures.VALID_PASSWORD))
+        self.assertEqual(1, admin.id)
+        self.assertTrue(admin.hashed_password)
+
+    # Covers delete.
+    def test_delete(self):
+        bike = Bicycle.find_all(record_class=Bicycle.record_class())[0]
+        bike.delete()
+
+        self.assertEqual(1, len(Bicycle.find_all()))
+
+
+class ReadOnlyRecordTestCase(unittest.TestCase):
+
+    def setUp(self):
+        fixtures.reset()
+        self.bike = Bicycle.find_all(
+            record_class=Bicycle.record_class(read_only=True))[0]
+
+    def tearDown(self):
+        pass
+
+    # Covers __setattr__.
+    def test_setattr(self):
+        self.assertIsInstance(self.bike, ReadOnlyRecord)
+        self.assertRaises(AttributeError, setattr, self.bike, 'brand', "")
+        self.assertEqual("Trek", self.bike.brand)
+
+    # Covers __delattr__.
+    def test_delattr(self):
+        self.assertRaises(AttributeError, delattr, self.bike, 'brand')
+
+    # Covers to_model.
+    def test_to_model(self):
+        model = self.bike.to_model()
+        model.brand = "Specialized"
+
+        self.assertEqual("Trek", self.bike.brand)
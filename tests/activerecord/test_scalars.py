@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+u'''Tests of DatabaseObject.count(), exists() and pluck(), with the Bicycle
+model, against the SQLite backend (see fixtures.py).
+'''
+import unittest
+import mock
+
+from . import fixtures
+
+from appclasses.access_database import Bicycle
+
+
+class ScalarsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.database = fixtures.reset()
+
+    def tearDown(self):
+        pass
+
+    # Covers count.
+    def test_count(self):
+        self.assertEqual(2, Bicycle.count())
+        self.assertEqual(1, Bicycle.count(category='Road'))
+        self.assertEqual(0, Bicycle.count(category=[]))
+
+    # Covers count.
+    def test_count_query_error(self):
+        with mock.patch.object(self.database, 'select', return_value=False):
+            self.assertFalse(Bicycle.count())
+
+    # Covers exists.
+    def test_exists(self):
+        self.assertTrue(Bicycle.exists(brand="Trek"))
+        self.assertFalse(Bicycle.exists(brand="Specialized"))
+
+    # Covers exists.
+    def test_exists_no_hydration(self):
+        with mock.patch.object(Bicycle, '_hydrate') as hydrate:
+            Bicycle.exists(brand="Trek")
+            Bicycle.count()
+            Bicycle.pluck('id')
+
+        self.assertFalse(hydrate.called)
+
+    # Covers pluck.
+    def test_pluck(self):
+        self.assertEqual(["Trek"], Bicycle.pluck('brand', category='Hybrid'))
+        self.assertEqual([(1, "Trek"), (2, "Cannondale")],
+                         Bicycle.pluck('id', 'brand'))
+        self.assertEqual([], Bicycle.pluck('id', brand="Specialized"))
+
+    # Covers pluck.
+    def test_pluck_invalid_columns(self):
+        self.assertRaises(ValueError, Bicycle.pluck)
+        self.assertRaises(ValueError, Bicycle.pluck, 'unknown')
+
+    # Covers pluck.
+    def test_pluck_query_error(self):
+        with mock.patch.object(self.database, 'select', return_value=False):
+            self.assertFalse(Bicycle.pluck('id'))
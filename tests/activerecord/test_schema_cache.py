@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+u'''Tests of activerecord.schema_cache and of DatabaseObject.verify_columns()
+and derive_columns(), with the Bicycle model, against the SQLite backend (see
+fixtures.py).
+'''
+import json
+import unittest
+import mock
+
+from . import fixtures
+
+from activerecord import database_functions
+from activerecord.backends import MySQLBackend
+from activerecord.schema_cache import SchemaCache
+from appclasses.access_database import Bicycle
+
+# In the table order, which is not the order of Bicycle._db_columns.
+COLUMNS = ['id', 'brand', 'model', 'year', 'category', 'gender', 'color',
+           'price', 'weight_kg', 'condition_id', 'description']
+
+
+class SchemaCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.database = fixtures.reset()
+        self.path = fixtures.credentials.DB_SCHEMA_CACHE
+        self.backend = database_functions.get_backend()
+
+    def tearDown(self):
+        pass
+
+    # Covers columns.
+    def test_columns(self):
+        cache = SchemaCache(self.database)
+
+        self.assertEqual(COLUMNS, cache.columns('bicycles'))
+        self.assertIsNone(cache.columns('missing'))
+
+    # Covers table.
+    def test_table(self):
+        table = SchemaCache(self.database).table('bicycles')
+
+        column = table['columns'][0]
+        self.assertEqual('id', column['name'])
+        self.assertFalse(column['nullable'])
+
+    # Covers _load.
+    def test_load_from_file(self):
+        SchemaCache(self.database).columns('bicycles')
+
+        with open(self.path) as cache_file:
+            self.assertEqual('chain_gang', json.load(cache_file)['database'])
+
+        # The next session reads the file.
+        with mock.patch.object(self.backend, 'introspect') as introspect:
+            columns = SchemaCache(self.database).columns('bicycles')
+        self.assertFalse(introspect.called)
+        self.assertEqual(COLUMNS, columns)
+
+    # Covers _read_file.
+    def test_load_other_version(self):
+        SchemaCache(self.database, version='1').columns('bicycles')
+
+        with mock.patch.object(self.backend, 'introspect',
+                               wraps=self.backend.introspect) as introspect:
+            SchemaCache(self.database, version='2').columns('bicycles')
+        self.assertEqual(1, introspect.call_count)
+
+    # Covers _read_file.
+    def test_load_invalid_file(self):
+        with open(self.path, 'w') as cache_file:
+            cache_file.write("{")
+
+        self.assertEqual(COLUMNS,
+                         SchemaCache(self.database).columns('bicycles'))
+
+    # Covers refresh.
+    def test_refresh(self):
+        cache = SchemaCache(self.database)
+        cache.columns('bicycles')
+        self.database.query("ALTER TABLE bicycles ADD COLUMN frame TEXT")
+
+        self.assertNotIn('frame', cache.columns('bicycles'))
+        cache.refresh()
+        self.assertIn('frame', cache.columns('bicycles'))
+        self.assertIn('frame', SchemaCache(self.database).columns('bicycles'))
+
+    # Covers _load.
+    def test_load_query_error(self):
+        cache = SchemaCache(self.database)
+        with mock.patch.object(self.database, 'select', return_value=False):
+            self.assertIsNone(cache.columns('bicycles'))
+
+        # Nothing was written or kept. The next call asks the server again.
+        self.assertFalse(fixtures.os.path.exists(self.path))
+        self.assertEqual(COLUMNS, cache.columns('bicycles'))
+
+    # Covers refresh.
+    def test_refresh_query_error(self):
+        cache = SchemaCache(self.database)
+        cache.columns('bicycles')
+        with open(self.path) as cache_file:
+            saved = cache_file.read()
+
+        with mock.patch.object(self.database, 'select', return_value=False):
+            self.assertFalse(cache.refresh())
+
+        self.assertEqual(COLUMNS, cache.columns('bicycles'))
+        with open(self.path) as cache_file:
+            self.assertEqual(saved, cache_file.read())
+
+    # Covers introspect.
+    def test_introspect_query_error(self):
+        for backend in (self.backend,
+                        MySQLBackend("username", "userpassword", "localhost",
+                                     "chain_gang")):
+            with mock.patch.object(self.database, 'select',
+                                   return_value=False):
+                self.assertIsNone(backend.introspect(self.database,
+                                                     'chain_gang'))
+
+    # Covers _save.
+    def test_save_error(self):
+        cache = SchemaCache(self.database, path="/missing/schema.json")
+
+        # The schema stays in memory.
+        self.assertEqual(COLUMNS, cache.columns('bicycles'))
+
+
+class ColumnsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.database = fixtures.reset()
+        self.patcher = mock.patch.object(Bicycle, '_db_columns',
+                                         list(Bicycle._db_columns))
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    # Covers verify_columns.
+    def test_verify_columns(self):
+        self.assertEqual([], Bicycle.verify_columns())
+
+    # Covers verify_columns.
+    def test_verify_columns_drift(self):
+        Bicycle._db_columns = Bicycle._db_columns[:-1] + ['frame']
+
+        self.assertEqual(
+            ["Column frame is not in table bicycles.",
+             "Column description of table bicycles is not in "
+             "Bicycle._db_columns."],
+            Bicycle.verify_columns())
+
+    # Covers verify_columns.
+    def test_verify_columns_missing_table(self):
+        with mock.patch.object(Bicycle, '_table_name', 'missing'):
+            self.assertEqual(["Table missing does not exist."],
+                             Bicycle.verify_columns())
+
+    # Covers derive_columns.
+    def test_derive_columns(self):
+        Bicycle.find_all(record_class=Bicycle.record_class())
+        self.database.query("ALTER TABLE bicycles ADD COLUMN frame TEXT")
+        Bicycle.schema_cache().refresh()
+
+        self.assertEqual('frame', Bicycle.derive_columns()[-1])
+        self.assertIn('frame', Bicycle.record_class()._columns)
+        self.assertNotIn('_hydration_plans', Bicycle.__dict__)
+
+    # Covers derive_columns.
+    def test_derive_columns_missing_table(self):
+        with mock.patch.object(Bicycle, '_table_name', 'missing'):
+            self.assertRaises(Exception, Bicycle.derive_columns)
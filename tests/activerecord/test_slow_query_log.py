@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+u'''Tests of activerecord.slow_query_log, with the Bicycle model, against the
+SQLite backend (see fixtures.py).
+'''
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import mock
+
+from . import fixtures
+
+from activerecord.instrumentation import QueryEvent
+from activerecord.slow_query_log import SlowQueryLog
+from appclasses.access_database import Admin, Bicycle
+
+
+class SlowQueryLogTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "logs", "slow.log")
+        self.database = fixtures.reset(DB_SLOW_QUERY_LOG=self.path,
+                                       DB_SLOW_QUERY_THRESHOLD=0)
+        self.log = self.database._listeners[0]
+
+    def tearDown(self):
+        self.log.close()
+        shutil.rmtree(self.directory)
+
+    def _entries(self):
+        self.log.flush()
+        with open(self.path) as log_file:
+            return [json.loads(line) for line in log_file]
+
+    # Covers __call__.
+    def test_call(self):
+        Bicycle.find_by_id(1)
+
+        entry = self._entries()[0]
+        self.assertIsInstance(self.log, SlowQueryLog)
+        self.assertEqual([1], entry['values'])
+        self.assertEqual(1, entry['rows_returned'])
+        self.assertEqual('Bicycle', entry['model'])
+        self.assertEqual('find_by_id', entry['method'])
+        self.assertIn("test_slow_query_log.py", entry['caller'])
+        self.assertIn("in test_call", entry['caller'])
+        self.assertIsNone(entry['error'])
+        # SQLite has its own EXPLAIN output.
+        self.assertTrue(entry['explain'])
+
+    # Covers __call__.
+    def test_call_threshold(self):
+        self.log.threshold = 10
+        Bicycle.find_by_id(1)
+        self.log.threshold = 0
+        Bicycle.find_all()
+
+        self.assertEqual(["SELECT * FROM bicycles"],
+                         [entry['sql'].strip() for entry in self._entries()])
+
+    # Covers __call__.
+    def test_call_write(self):
+        Bicycle.patch_by_id(1, price=99)
+        Bicycle.find_by_id(1)
+
+        # Only the SELECT statement was logged.
+        self.assertEqual(['find_by_id'],
+                         [entry['method'] for entry in self._entries()])
+
+    # Covers __call__.
+    def test_call_admin_password(self):
+        admin = fixtures.new_admin()
+        admin.save()
+        admin.password = admin.confirm_password = fixtures.VALID_PASSWORD + "2"
+        admin.save()
+        Admin.find_all()
+
+        self.log.flush()
+        with open(self.path) as log_file:
+            text = log_file.read()
+        self.assertIn("admins", text)
+        self.assertNotIn(fixtures.VALID_PASSWORD, text)
+
+    # Covers __call__.
+    def test_call_error(self):
+        self.database.query("SELECT * FROM missing")
+
+        entry = self._entries()[0]
+        self.assertTrue(entry['error'])
+        self.assertIn('error', entry['explain'])
+
+    # Covers __call__.
+    def test_call_queue_full(self):
+        log = SlowQueryLog(self.path, threshold=0, max_pending=1)
+        event = QueryEvent(sql="SELECT * FROM bicycles", values=None,
+                           duration=1.0, rows_returned=2, rows_affected=0,
+                           bytes_fetched=0, error=None)
+
+        # The background thread is not running, so the queue is not emptied.
+        with mock.patch.object(log, '_start'):
+            log(event)
+            log(event)
+
+        self.assertEqual(1, log.dropped)
+
+    # Covers close.
+    def test_close(self):
+        Bicycle.find_all()
+        self.log.close()
+
+        self.assertEqual(1, len(self._entries()))
+        self.assertIsNone(self.log._thread)
+        # Closing again does nothing.
+        self.log.close()
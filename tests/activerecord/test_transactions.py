@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+u'''Tests of ConnectionDB.transaction() and run_in_transaction(), with the
+Bicycle model, against the SQLite backend (see fixtures.py).
+'''
+import unittest
+import mock
+
+from . import fixtures
+
+from activerecord.connection_db import QueryError
+from appclasses.access_database import Bicycle
+
+
+class TransactionTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.database = fixtures.reset(DB_POOL_SIZE=3)
+
+    def tearDown(self):
+        pass
+
+    # Covers transaction.
+    def test_transaction(self):
+        with self.database.transaction():
+            self.assertTrue(self.database.in_transaction)
+            fixtures.new_bicycle().save()
+            fixtures.new_bicycle().save()
+
+        self.assertFalse(self.database.in_transaction)
+        self.assertEqual(4, len(Bicycle.find_all()))
+        self.assertEqual(0, self.database.pool_stats()['in_use'])
+
+    # Covers transaction.
+    def test_transaction_single_commit(self):
+        connection = self.database._acquire()
+        self.database._release(connection)
+
+        with mock.patch.object(type(connection), 'commit',
+                               wraps=connection.commit) as commit:
+            with self.database.transaction():
+                fixtures.new_bicycle().save()
+                fixtures.new_bicycle().save()
+
+        self.assertEqual(1, commit.call_count)
+
+    # Covers transaction.
+    def test_transaction_rollback(self):
+        with self.assertRaises(RuntimeError):
+            with self.database.transaction():
+                fixtures.new_bicycle().save()
+                raise RuntimeError("Abort.")
+
+        self.assertEqual(2, len(Bicycle.find_all()))
+
+    # Covers transaction.
+    def test_transaction_query_error(self):
+        with self.assertRaises(QueryError):
+            with self.database.transaction():
+                fixtures.new_bicycle().save()
+                self.database.query("SELECT * FROM missing")
+
+        self.assertEqual(2, len(Bicycle.find_all()))
+        self.assertEqual(0, self.database.pool_stats()['in_use'])
+
+    # Covers transaction.
+    def test_transaction_nested(self):
+        with self.assertRaises(RuntimeError):
+            with Bicycle.transaction():
+                fixtures.new_bicycle().save()
+                with Bicycle.transaction():
+                    fixtures.new_bicycle().save()
+                # The inner transaction did not commit.
+                raise RuntimeError("Abort.")
+
+        self.assertEqual(2, len(Bicycle.find_all()))
+
+
+class RunInTransactionTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.database = fixtures.reset(DB_POOL_SIZE=3)
+        self.patcher = mock.patch('time.sleep')
+        self.sleep = self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    def _failing(self, errno, failures):
+        calls = []
+
+        def func():
+            calls.append(None)
+            fixtures.new_bicycle().save()
+            if len(calls) <= failures:
+                raise QueryError("Deadlock found.", errno=errno)
+            return len(calls)
+
+        return func
+
+    # Covers run_in_transaction.
+    def test_run_in_transaction(self):
+        self.assertEqual(1, Bicycle.run_in_transaction(self._failing(1213, 0)))
+        self.assertEqual(3, len(Bicycle.find_all()))
+
+    # Covers run_in_transaction.
+    def test_run_in_transaction_deadlock(self):
+        result = self.database.run_in_transaction(self._failing(1213, 2))
+
+        self.assertEqual(3, result)
+        # The failed attempts were rolled back.
+        self.assertEqual(3, len(Bicycle.find_all()))
+        self.assertEqual(2, self.sleep.call_count)
+
+    # Covers run_in_transaction.
+    def test_run_in_transaction_lock_wait_timeout(self):
+        self.assertEqual(2, self.database.run_in_transaction(
+            self._failing(1205, 1)))
+
+    # Covers run_in_transaction.
+    def test_run_in_transaction_retries(self):
+        func = self._failing(1213, 5)
+
+        self.assertRaises(QueryError, self.database.run_in_transaction, func,
+                          retries=2)
+        self.assertEqual(2, len(Bicycle.find_all()))
+        self.assertEqual(2, self.sleep.call_count)
+
+    # Covers run_in_transaction.
+    def test_run_in_transaction_other_error(self):
+        func = self._failing(1146, 1)
+
+        self.assertRaises(QueryError, self.database.run_in_transaction, func)
+        self.assertFalse(self.sleep.called)
+
+    # Covers run_in_transaction.
+    def test_run_in_transaction_nested(self):
+        func = self._failing(1213, 1)
+
+        with self.assertRaises(QueryError):
+            with self.database.transaction():
+                # The outermost transaction decides.
+                self.database.run_in_transaction(func)
+        self.assertFalse(self.sleep.called)
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+u'''Tests of DatabaseObject.upsert(), with the Bicycle model, against the
+SQLite backend (see fixtures.py).
+'''
+import unittest
+import mock
+
+from . import fixtures
+
+from activerecord.database_object import QueryError
+from appclasses.access_database import Bicycle
+
+
+class UpsertTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.database = fixtures.reset()
+
+    def tearDown(self):
+        pass
+
+    # Covers upsert.
+    def test_upsert(self):
+        bikes = [fixtures.new_bicycle(id=1, model="Domane"),
+                 fixtures.new_bicycle(model="Madone")]
+
+        result = Bicycle.upsert(bikes)
+
+        self.assertEqual([bikes[1]], result['inserted'])
+        self.assertEqual([bikes[0]], result['updated'])
+        self.assertEqual(3, bikes[1].id)
+        self.assertEqual("Domane", Bicycle.find_by_id(1).model)
+        self.assertEqual(3, len(Bicycle.find_all()))
+
+    # Covers upsert.
+    def test_upsert_not_unique_keys(self):
+        bikes = [fixtures.new_bicycle(brand="TREK", model="Domane"),
+                 fixtures.new_bicycle(brand="Specialized", model="Tarmac")]
+
+        result = Bicycle.upsert(bikes, conflict_keys=('brand', ))
+
+        # The existing record is updated through the ID found first.
+        self.assertEqual([bikes[0]], result['updated'])
+        self.assertEqual(1, bikes[0].id)
+        self.assertEqual("Domane", Bicycle.find_by_id(1).model)
+        self.assertEqual(3, len(Bicycle.find_all()))
+
+    # Covers upsert.
+    def test_upsert_with_errors(self):
+        bikes = [fixtures.new_bicycle(brand="Trek", model="Domane"),
+                 fixtures.new_bicycle(model="")]
+
+        self.assertFalse(Bicycle.upsert(bikes, conflict_keys=('brand', )))
+
+        # The ID of the existing record was not kept.
+        self.assertEqual([0, 0], [bike.id for bike in bikes])
+        self.assertEqual(["Model cannot be blank."], bikes[1].errors)
+        self.assertEqual("Emonda", Bicycle.find_by_id(1).model)
+
+    # Covers upsert.
+    def test_upsert_query_error(self):
+        bikes = [fixtures.new_bicycle(brand="Trek", model="Domane"),
+                 fixtures.new_bicycle(model="Madone")]
+
+        with mock.patch.object(Bicycle, '_upsert_rows',
+                               side_effect=QueryError("Failed.")):
+            self.assertFalse(Bicycle.upsert(bikes, conflict_keys=('brand', )))
+
+        self.assertEqual([0, 0], [bike.id for bike in bikes])
+        self.assertEqual(2, len(Bicycle.find_all()))
+
+    # Covers upsert.
+    def test_upsert_same_keys(self):
+        bikes = [fixtures.new_bicycle(brand="Trek"),
+                 fixtures.new_bicycle(brand="trek")]
+
+        self.assertRaises(ValueError, Bicycle.upsert, bikes,
+                          conflict_keys=('brand', ))
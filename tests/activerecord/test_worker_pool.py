@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+u'''Tests of activerecord.worker_pool and of the asynchronous finders, with
+the Bicycle model, against the SQLite backend (see fixtures.py).
+'''
+import threading
+import unittest
+
+from . import fixtures
+
+from activerecord.worker_pool import AsyncResult, WorkerPool
+from appclasses.access_database import Bicycle
+
+
+class AsyncResultTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.result = AsyncResult()
+
+    def tearDown(self):
+        pass
+
+    # Covers result.
+    def test_result(self):
+        self.assertFalse(self.result.done())
+        self.result._finish(result=5)
+
+        self.assertTrue(self.result.done())
+        self.assertEqual(5, self.result.result())
+        self.assertIsNone(self.result.exception())
+
+    # Covers result.
+    def test_result_error(self):
+        error = ValueError("Invalid.")
+        self.result._finish(error=error)
+
+        self.assertRaises(ValueError, self.result.result)
+        self.assertIs(error, self.result.exception())
+
+    # Covers result.
+    def test_result_timeout(self):
+        self.assertRaises(Exception, self.result.result, timeout=0.01)
+        self.assertRaises(Exception, self.result.exception, timeout=0.01)
+
+    # Covers add_done_callback.
+    def test_add_done_callback(self):
+        calls = []
+        self.result.add_done_callback(calls.append)
+        self.assertEqual([], calls)
+
+        self.result._finish(result=5)
+        self.assertEqual([self.result], calls)
+
+        # Called at once when the result is available.
+        self.result.add_done_callback(calls.append)
+        self.assertEqual([self.result, self.result], calls)
+
+    # Covers add_done_callback.
+    def test_add_done_callback_error(self):
+        calls = []
+
+        def failing(result):
+            raise RuntimeError("Bug.")
+
+        self.result.add_done_callback(failing)
+        self.result.add_done_callback(calls.append)
+        self.result._finish(result=5)
+
+        # The other callbacks are still called.
+        self.assertEqual([self.result], calls)
+
+
+class WorkerPoolTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.workers = WorkerPool(size=2, name='Test')
+
+    def tearDown(self):
+        pass
+
+    # Covers submit.
+    def test_submit(self):
+        result = self.workers.submit(lambda x, y=0: x + y, 2, y=3)
+
+        self.assertEqual(5, result.result(timeout=5))
+
+    # Covers submit.
+    def test_submit_error(self):
+        def failing():
+            raise RuntimeError("Bug.")
+
+        result = self.workers.submit(failing)
+
+        self.assertIsInstance(result.exception(timeout=5), RuntimeError)
+        # The thread keeps working.
+        self.assertEqual(1, self.workers.submit(int, 1).result(timeout=5))
+
+    # Covers submit.
+    def test_submit_threads(self):
+        started = threading.Semaphore(0)
+        release = threading.Event()
+        names = []
+
+        def blocking():
+            names.append(threading.current_thread().name)
+            started.release()
+            release.wait(5)
+
+        results = [self.workers.submit(blocking) for _ in range(2)]
+        # Both calls run at the same time, each in one thread.
+        started.acquire()
+        started.acquire()
+        release.set()
+        for result in results:
+            result.result(timeout=5)
+
+        self.assertEqual(set(['Test-1', 'Test-2']), set(names))
+        self.assertEqual(2, len(self.workers._threads))
+
+
+class AsyncFinderTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.database = fixtures.reset(DB_POOL_SIZE=2,
+                                       DB_POOL_CHECKOUT='thread')
+
+    def tearDown(self):
+        pass
+
+    # Covers afind_all.
+    def test_afind_all(self):
+        first = Bicycle.afind_all()
+        second = Bicycle.afind_all(columns=['brand'])
+
+        self.assertEqual(["Trek", "Cannondale"],
+                         [bike.brand for bike in first.result(timeout=5)])
+        self.assertEqual(2, len(second.result(timeout=5)))
+
+    # Covers afind_by_id.
+    def test_afind_by_id(self):
+        self.assertEqual("Cannondale",
+                         Bicycle.afind_by_id(2).result(timeout=5).brand)
+        self.assertFalse(Bicycle.afind_by_id(99).result(timeout=5))
+
+    # Covers asave.
+    def test_asave(self):
+        bike = fixtures.new_bicycle()
+
+        self.assertTrue(bike.asave().result(timeout=5))
+        self.assertEqual(3, bike.id)
+        self.assertEqual("Brand", Bicycle.find_by_id(3).brand)
+
+    # Covers run_async.
+    def test_run_async(self):
+        result = self.database.run_async(Bicycle.find_by_id, 1)
+        result.result(timeout=5)
+
+        # The worker gave its connection back.
+        self.assertEqual(0, self.database.pool_stats()['in_use'])
+        self.assertEqual(2, self.database._get_workers().size)
+
+    # Covers run_async.
+    def test_run_async_error(self):
+        result = self.database.run_async(Bicycle.find_all, columns=['unknown'])
+
+        self.assertIsInstance(result.exception(timeout=5), ValueError)
+
+    # Covers run_async.
+    def test_run_async_with_sync_query(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def in_flight():
+            # Holds the worker's connection until the sync query is done.
+            self.database._acquire()
+            started.set()
+            release.wait(5)
+
+        result = self.database.run_async(in_flight)
+        started.wait(5)
+        try:
+            self.assertEqual(2, len(Bicycle.find_all()))
+
+            # The caller used its own connection.
+            self.assertEqual(2, self.database.pool_stats()['opened'])
+        finally:
+            release.set()
+        result.result(timeout=5)
+
+    # Covers run_async.
+    def test_run_async_without_pool(self):
+        fixtures.reset()
+
+        self.assertRaises(Exception, Bicycle.afind_all)
+        self.assertIsNone(Bicycle._database._workers)
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+u'''Tests of appclasses.access_database, against the SQLite backend (see
+tests/activerecord/fixtures.py).
+'''
+import unittest
+import mock
+
+from ..activerecord import fixtures
+
+from appclasses.access_database import Admin
+
+
+class HasUniqueUsernameTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.database = fixtures.reset()
+        fixtures.new_admin().save()
+
+    def tearDown(self):
+        pass
+
+    # Covers has_unique_username.
+    def test_has_unique_username(self):
+        self.assertTrue(Admin.has_unique_username('username001'))
+        self.assertFalse(Admin.has_unique_username('username000'))
+
+    # Covers has_unique_username.
+    def test_has_unique_username_owner(self):
+        self.assertTrue(Admin.has_unique_username('username000', 1))
+        self.assertFalse(Admin.has_unique_username('username000', 2))
+
+    # Covers has_unique_username.
+    def test_has_unique_username_query_error(self):
+        with mock.patch.object(self.database, 'select', return_value=False):
+            self.assertTrue(Admin.has_unique_username('username000'))
+
+
+class ValidateManyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.database = fixtures.reset()
+        fixtures.new_admin().save()
+
+    def tearDown(self):
+        pass
+
+    # Covers validate_many.
+    def test_validate_many(self):
+        admins = [fixtures.new_admin(username='username001'),
+                  fixtures.new_admin(username='username002')]
+
+        self.assertTrue(Admin.validate_many(admins))
+        self.assertEqual([[], []], [admin.errors for admin in admins])
+
+    # Covers validate_many.
+    def test_validate_many_taken_username(self):
+        admins = [fixtures.new_admin(username='USERNAME000'),
+                  fixtures.new_admin(username='username001')]
+
+        self.assertFalse(Admin.validate_many(admins))
+        self.assertEqual(['Username not allowed. Try another.'],
+                         admins[0].errors)
+        self.assertEqual([], admins[1].errors)
+
+    # Covers validate_many.
+    def test_validate_many_repeated_username(self):
+        admins = [fixtures.new_admin(username='username001'),
+                  fixtures.new_admin(username='Username001')]
+
+        self.assertFalse(Admin.validate_many(admins))
+        self.assertEqual([], admins[0].errors)
+        self.assertEqual(['Username not allowed. Try another.'],
+                         admins[1].errors)
+
+    # Covers validate_many.
+    def test_validate_many_own_username(self):
+        admin = Admin.find_by_id(1)
+        admin.password = fixtures.VALID_PASSWORD
+        admin.confirm_password = fixtures.VALID_PASSWORD
+
+        self.assertTrue(Admin.validate_many([admin]))
+
+    # Covers validate_many.
+    def test_validate_many_other_errors(self):
+        admins = [fixtures.new_admin(username='username001', first_name="")]
+
+        self.assertFalse(Admin.validate_many(admins))
+        self.assertEqual(['First name cannot be blank.'], admins[0].errors)
+        # The owners found for the batch are not kept.
+        self.assertIsNone(admins[0]._username_owners)
+
+    # Covers _find_username_owners.
+    def test_find_username_owners_in_chunks(self):
+        admins = [fixtures.new_admin(username='username00{number}'.format(
+            number=number)) for number in range(1, 6)]
+
+        with mock.patch.object(Admin, '_username_chunk_size', 2), \
+                mock.patch.object(self.database, 'select',
+                                  wraps=self.database.select) as select:
+            self.assertTrue(Admin.validate_many(admins))
+
+        # 2 + 2 + 1 usernames, and no query per admin.
+        self.assertEqual(3, select.call_count)
+
+    # Covers save_many.
+    def test_save_many(self):
+        admins = [fixtures.new_admin(username='username001'),
+                  fixtures.new_admin(username='username000')]
+
+        self.assertFalse(Admin.save_many(admins))
+        self.assertEqual(1, Admin.count())
+
+
+class UpsertTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.database = fixtures.reset()
+        fixtures.new_admin().save()
+
+    def tearDown(self):
+        pass
+
+    # Covers _before_upsert.
+    def test_upsert_without_password(self):
+        admin = fixtures.new_admin(first_name="Other", password="",
+                                   confirm_password="")
+
+        result = Admin.upsert([admin], conflict_keys=('username', ))
+
+        self.assertEqual([admin], result['updated'])
+        found = Admin.find_by_id(1)
+        self.assertEqual("Other", found.first_name)
+        # set_hashed_password() stores the value as it is (see Admin).
+        self.assertEqual(fixtures.VALID_PASSWORD, found.hashed_password)
+
+    # Covers _before_upsert.
+    def test_upsert_with_password(self):
+        password = fixtures.VALID_PASSWORD + "2"
+        admin = fixtures.new_admin(password=password,
+                                   confirm_password=password)
+
+        self.assertTrue(Admin.upsert([admin], conflict_keys=('username', )))
+
+        self.assertEqual(password, Admin.find_by_id(1).hashed_password)
+
+    # Covers _before_upsert.
+    def test_upsert_with_errors(self):
+        admins = [fixtures.new_admin(password="", confirm_password=""),
+                  fixtures.new_admin(username='username001', email="")]
+
+        self.assertFalse(Admin.upsert(admins, conflict_keys=('username', )))
+
+        # The values set by upsert() were not kept.
+        self.assertEqual([0, 0], [admin.id for admin in admins])
+        self.assertEqual([None, None],
+                         [admin.hashed_password for admin in admins])
+        self.assertTrue(admins[0]._password_required)
+        self.assertNotEqual([], admins[1].errors)
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+u'''Tests of benchmarks/bench_activerecord.py: the reports, and the
+benchmarks with a tiny table against the SQLite backend (see
+tests/activerecord/fixtures.py).
+'''
+import os
+import sys
+import unittest
+import mock
+
+# If Python 2 (io.StringIO only accepts unicode):
+try:
+    from StringIO import StringIO
+# If Python 3:
+except ImportError:
+    from io import StringIO
+
+from ..activerecord import fixtures
+
+# Adds the benchmarks directory to sys.path if it is not already there:
+benchmarks_dir = os.path.join(fixtures.root_dir, "benchmarks")
+if benchmarks_dir not in sys.path:
+    sys.path.append(benchmarks_dir)
+
+import bench_activerecord
+
+
+class PrintResultsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.result = {
+            'benchmark': 'find_by_id',
+            'size': 1000,
+            'ops': 10,
+            'throughput': 100.0,
+            'p50': 0.01,
+            'p99': 0.02,
+            'peak_memory': None,
+            'process_peak_memory': 50 * 1048576
+        }
+
+    def tearDown(self):
+        pass
+
+    def printed(self, results):
+        u'''Returns the lines printed by print_results().
+        '''
+
+        with mock.patch('sys.stdout', new_callable=StringIO) as stdout:
+            bench_activerecord.print_results(results)
+        return stdout.getvalue().splitlines()
+
+    # Covers print_results.
+    def test_print_results_process_peak(self):
+        lines = self.printed([self.result])
+
+        # Python 2 (no tracemalloc): the column is the process peak.
+        self.assertIn("proc peak (MB)", lines[0])
+        self.assertTrue(lines[1].endswith("50.0"))
+        self.assertIn("whole process", lines[-1])
+
+    # Covers print_results.
+    def test_print_results_peak(self):
+        self.result['peak_memory'] = 2 * 1048576
+        lines = self.printed([self.result])
+
+        self.assertNotIn("proc peak", lines[0])
+        self.assertTrue(lines[1].endswith("2.0"))
+        self.assertEqual(2, len(lines))
+
+
+class MeasurementTestCase(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    # Covers Measurement.
+    def test_measurement(self):
+        with bench_activerecord.Measurement('validate', 10) as measurement:
+            measurement.time(sum, [1, 2])
+
+        result = measurement.result()
+        self.assertEqual(1, result['ops'])
+        if bench_activerecord.resource is not None:
+            self.assertGreater(result['process_peak_memory'], 0)
+        if bench_activerecord.tracemalloc is None:
+            self.assertIsNone(result['peak_memory'])
+
+
+class RunSizeTestCase(unittest.TestCase):
+
+    def setUp(self):
+        fixtures.reset()
+
+    def tearDown(self):
+        fixtures.reset()
+
+    # Covers run_size.
+    def test_run_size(self):
+        results = bench_activerecord.run_size(20, 5, 1)
+        by_name = dict((result['benchmark'], result) for result in results)
+
+        # The finders create the objects with _hydrate().
+        self.assertEqual(20, by_name['hydrate']['rows'])
+        self.assertEqual(20, by_name['instantiate']['ops'])
+        self.assertEqual(5, by_name['find_by_id']['ops'])
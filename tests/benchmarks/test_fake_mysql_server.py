@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+u'''Tests of benchmarks/fake_mysql_server.py, with ConnectionDB and the
+pure Python mysql.connector (see the warning of the module). They use the
+settings of tests/activerecord/fixtures.py, not db_credentials.py.
+'''
+import os
+import sys
+import time
+import unittest
+
+from ..activerecord import fixtures
+
+# Adds the benchmarks directory to sys.path if it is not already there:
+benchmarks_dir = os.path.join(fixtures.root_dir, "benchmarks")
+if benchmarks_dir not in sys.path:
+    sys.path.append(benchmarks_dir)
+
+try:
+    import mysql.connector
+except ImportError:
+    mysql = None
+
+import fake_mysql_server
+from fake_mysql_server import FakeMySQLServer
+
+from activerecord import database_functions
+from activerecord.connection_db import ConnectionDB
+from activerecord.database_object import DatabaseObject
+from appclasses.access_database import Bicycle
+
+
+@unittest.skipIf(mysql is None, "mysql.connector is not installed.")
+class FakeMySQLServerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeMySQLServer(password="userpassword").start()
+        fixtures.reset()
+        self.database = self.connect()
+        self.previous_database = DatabaseObject._database
+        DatabaseObject._database = self.database
+
+    def tearDown(self):
+        DatabaseObject._database = self.previous_database
+        database_functions.db_disconnect(self.database._connection)
+        fixtures.reset()
+        self.server.stop()
+
+    def connect(self, password="userpassword"):
+        u'''Creates a ConnectionDB for the server.
+        '''
+
+        for name, value in (('DB_BACKEND', 'mysql'),
+                            ('DB_SERVER', self.server.host),
+                            ('DB_PORT', self.server.port),
+                            ('DB_PASS', password)):
+            setattr(fixtures.credentials, name, value)
+        database_functions._backend = None
+        database_functions.get_backend()._credentials['use_pure'] = True
+        return ConnectionDB()
+
+    # Covers _query.
+    def test_query(self):
+        result = self.database.query("SELECT brand FROM bicycles WHERE id=%s",
+                                     (2, ))
+
+        self.assertEqual([{'brand': 'Cannondale'}], result)
+
+    # Covers _execute_statement.
+    def test_query_prepared(self):
+        Bicycle._prepared_statements = True
+        try:
+            bikes = [Bicycle.find_by_id(id) for id in (1, 2, 1)]
+        finally:
+            del Bicycle._prepared_statements
+
+        self.assertEqual(["Trek", "Cannondale", "Trek"],
+                         [bike.brand for bike in bikes])
+        self.assertEqual(2016, bikes[1].year)
+
+    # Covers _run.
+    def test_save(self):
+        bike = fixtures.new_bicycle(brand="Specialized")
+
+        self.assertTrue(bike.save())
+        self.assertEqual(3, bike.id)
+        self.assertEqual("Specialized", Bicycle.find_by_id(3).brand)
+
+    # Covers _send_error.
+    def test_query_error(self):
+        self.assertFalse(self.database.query("SELECT * FROM missing"))
+
+    # Covers check_password.
+    def test_wrong_password(self):
+        database = self.connect(password="wrong")
+
+        # The error was shown by db_connect().
+        self.assertRaises(Exception, database.query, "SELECT 1")
+
+    # Covers delay.
+    def test_latency(self):
+        self.database.query("SELECT 1")
+        self.server.latency = 0.05
+
+        start = time.time()
+        self.database.query("SELECT 1")
+
+        self.assertGreaterEqual(time.time() - start, 0.05)
+
+    # Covers stop.
+    def test_stop(self):
+        self.server.stop()
+
+        self.assertFalse(os.path.exists(self.server.path))
+        self.server = FakeMySQLServer(
+            sql_files=fake_mysql_server.DEFAULT_SQL_FILES[:1]).start()